@@ -1,12 +1,17 @@
 # backend/app/__init__.py
 from flask import Flask, jsonify
 from loguru import logger
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os  # 添加os导入，因为下面会用到
 
 # 从同级目录的configs.py导入配置映射和获取当前配置实例的函数
 from .configs import config_by_name, get_current_config
 # 从同级目录的extensions.py导入我们创建的扩展实例
-from .extensions import db, jwt, cors, configure_logging
+from .extensions import (db, async_db, jwt, cors, revocation_index, revocation_writer, shared_revocations, password_hasher, principal_cache, session_revocations,
+                         request_metrics, query_profiler, compressor, replica_router, username_filter, signing_keys, rate_limiter, role_permissions,
+                         configure_logging)
+from .services.db_routing import replica_reads
+from .services.metrics import span
 
 
 # 由于不使用Flask-Migrate，从extensions.py移除了migrate的导入
@@ -48,11 +53,32 @@ def create_app(config_object=None) -> Flask:
     logger.debug(f"数据库URI: {app.config.get('SQLALCHEMY_DATABASE_URI', '未设置')}")
     logger.debug(f"JWT密钥已设置: {'是的' if app.config.get('JWT_SECRET_KEY') else '否，请检查.env文件！'}")
 
+    # 部署在反向代理之后时，按配置的可信代理层数从X-Forwarded-*还原客户端地址 (登录限流按客户端地址计数)
+    if app.config.get("PROXY_FIX_X_FOR") or app.config.get("PROXY_FIX_X_PROTO"):
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config.get("PROXY_FIX_X_FOR", 0),
+                                x_proto=app.config.get("PROXY_FIX_X_PROTO", 0))
+
     # 3. 初始化Flask扩展
+    async_db.prepare_config(app.config)  # 测试配置下的异步模式改用临时文件数据库 (内存SQLite无法在两个Engine间共享)
     db.init_app(app)  # 初始化SQLAlchemy
+    replica_router.init_app(app)  # 初始化只读副本 (SQLALCHEMY_REPLICA_URIS)
+    async_db.init_app(app)  # AUTH_ASYNC_ENABLED=True 时启用异步数据库和async认证视图
     # migrate.init_app(app, db) # 由于不使用Flask-Migrate，此行移除或注释掉
     jwt.init_app(app)  # 初始化Flask-JWT-Extended
+    signing_keys.init_app(app)  # JWT_ALGORITHM为RS256/EdDSA时加载签名密钥环
     cors.init_app(app, resources={r"/api/*": {"origins": "*"}})  # 初始化CORS
+    revocation_index.init_app(app)  # 初始化进程内Token吊销索引
+    revocation_writer.init_app(app)  # 初始化吊销记录写后缓冲
+    shared_revocations.init_app(app)  # SHARED_REVOCATION_ENABLED=True 时映射主机共享的吊销表
+    password_hasher.init_app(app)  # 初始化密码哈希执行器 (进程池在首次使用时创建)
+    principal_cache.init_app(app)  # 初始化Principal缓存
+    role_permissions.init_app(app)  # 初始化角色权限编译表
+    rate_limiter.init_app(app)  # 初始化登录限流 (RATE_LIMIT_BACKEND 默认为进程内存)
+    session_revocations.init_app(app)  # 初始化按用户的会话吊销时间戳映射
+    username_filter.init_app(app)  # USERNAME_FILTER_ENABLED=True 时启用已占用用户名过滤器
+    request_metrics.init_app(app)  # METRICS_ENABLED=True 时注册请求计时钩子和 /metrics 端点
+    query_profiler.init_app(app)  # QUERY_PROFILER_ENABLED=True 时统计SQL指纹、记录慢查询并检查查询预算
+    compressor.init_app(app)  # COMPRESSION_ENABLED=True 时压缩不小于COMPRESSION_MIN_SIZE的文本响应
 
     # 4. 导入数据模型
     # 这一步确保SQLAlchemy在运行时能"感知"到这些模型。
@@ -60,9 +86,23 @@ def create_app(config_object=None) -> Flask:
     # 使用app.app_context()确保在导入模型时应用上下文是激活的，
     # 这对于某些依赖app.config的模型定义或SQLAlchemy操作是必要的。
     with app.app_context():
-        from .models import user_model, token_model  # 从app.models包 (models/__init__.py) 导入
+        from .models import user_model, token_model, role_model  # 从app.models包 (models/__init__.py) 导入
         # 确保 User 和 TokenBlocklist 在 models/__init__.py 中被导入或定义
 
+        # 启动时预加载吊销索引。如果表尚未创建(例如测试环境在create_all之前)，则推迟到首次校验时加载。
+        try:
+            if shared_revocations.enabled:
+                # 预加载模式下在主进程中加载一次，fork出的Worker直接共享
+                shared_revocations.maybe_sync(token_model.TokenBlocklist)
+            if revocation_index.enabled:
+                revocation_index.load(token_model.TokenBlocklist)
+            session_revocations.sync(user_model.User)
+            if username_filter.enabled:
+                username_filter.load(user_model.User)
+        except Exception as e:
+            db.session.rollback()
+            logger.warning("吊销索引预加载失败，将在首次校验Token时重试: {}", e)
+
     # 5. 注册JWT相关的回调函数 (例如Token黑名单检查)
     @jwt.token_in_blocklist_loader
     def check_if_jti_in_blocklist(jwt_header: dict, jwt_payload: dict) -> bool:
@@ -71,16 +111,54 @@ def create_app(config_object=None) -> Flask:
         用于检查Token的JTI是否已存在于数据库的TokenBlocklist表中。
         """
         jti = jwt_payload["jti"]
-        # 使用正确的模型引用 (token_model.TokenBlocklist)
-        # .one_or_none() 是一个安全的查询方式，如果记录不存在返回None，存在多个则报错
-        token_entry = token_model.TokenBlocklist.query.filter_by(jti=jti).one_or_none()
-        is_revoked = token_entry is not None
+
+        # 先检查该用户的会话吊销时间戳 (纯内存)：签发时间早于时间戳的Token一律拒绝
+        if session_revocations.is_revoked(jwt_payload.get("sub"), jwt_payload.get("iat"), user_model.User):
+            logger.debug("Token JTI '{}' 签发于用户会话吊销时间之前 (已吊销).", jti)
+            return True
+
+        # 写后缓冲中尚未写入数据库的吊销记录，在本进程内立即生效
+        if revocation_writer.is_pending(jti):
+            return True
+
+        # 主机共享吊销表：无锁查询，命中与否都可直接作为结论 (表已溢出、或Token签发于已完全同步的时间点之后时返回None，继续走下面的路径)
+        if shared_revocations.enabled:
+            try:
+                shared_revocations.maybe_sync(token_model.TokenBlocklist)
+            except Exception as e:
+                db.session.rollback()
+                logger.warning("共享吊销表同步失败，暂时使用表中已有的数据: {}", e)
+            verdict = shared_revocations.is_revoked(jti, jwt_payload.get("iat"))
+            if verdict is not None:
+                if verdict:
+                    logger.debug("Token JTI '{}' 存在于共享吊销表中 (已吊销).", jti)
+                return verdict
+
+        def lookup_blocklist(target_jti: str) -> bool:
+            if async_db.enabled:
+                # 异步模式下回查交给异步连接池，大量并发回查在同一个事件循环上进行
+                from .apis.auth_async_api import is_jti_blocklisted
+                return async_db.run(is_jti_blocklisted, target_jti)
+            # 使用正确的模型引用 (token_model.TokenBlocklist)
+            # .one_or_none() 是一个安全的查询方式，如果记录不存在返回None，存在多个则报错
+            with replica_reads():  # 只读查询，可路由到只读副本
+                return token_model.TokenBlocklist.query.filter_by(jti=target_jti).one_or_none() is not None
+
+        # 先查询进程内吊销索引：布隆过滤器判定"一定不在"时直接放行，只有"可能在"时才访问数据库
+        with span("blocklist_check"):
+            if revocation_index.enabled:
+                is_revoked = revocation_index.is_revoked(jti, token_model.TokenBlocklist, lookup_blocklist)
+            else:
+                is_revoked = lookup_blocklist(jti)
         if is_revoked:
-            logger.debug(f"Token JTI '{jti}' 存在于数据库黑名单中 (已吊销).")
+            logger.debug("Token JTI '{}' 存在于数据库黑名单中 (已吊销).", jti)
         return is_revoked
 
     # 6. 注册API蓝图 (将在后续章节定义蓝图文件后取消注释)
-    from .apis.auth_api import auth_bp
+    if async_db.enabled:
+        from .apis.auth_async_api import auth_async_bp as auth_bp  # 异步版本，URL与响应格式相同
+    else:
+        from .apis.auth_api import auth_bp
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
 
 
@@ -88,7 +166,17 @@ def create_app(config_object=None) -> Flask:
     from .apis.user_api import user_bp
     app.register_blueprint(user_bp, url_prefix='/api')  # user_api中的/me路由将是 /api/me
 
+    from .apis.jwks_api import jwks_bp
+    app.register_blueprint(jwks_bp)  # /.well-known/jwks.json
+
+
+
+    # 7. 注册CLI命令并启动后台维护任务
+    from .commands import register_commands
+    register_commands(app)  # 例如: flask prune-blocklist --batch-size 1000
 
+    from .services.blocklist_pruner import start_blocklist_pruner
+    start_blocklist_pruner(app)  # BLOCKLIST_PRUNE_INTERVAL > 0 时才会启动
 
-    logger.info(f"应用 '{app.name}' 已成功配置并初始化。蓝图和JWT回调已设置。")
+    logger.info("应用 '{}' 已成功配置并初始化。蓝图和JWT回调已设置。", app.name)
     return app
\ No newline at end of file
@@ -1,19 +1,58 @@
 # backend/app/apis/auth_api.py
-from flask import Blueprint, request, jsonify
+import hmac
+
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import (
     create_access_token, create_refresh_token, jwt_required,
     get_jwt_identity, get_jwt
 )
 from loguru import logger
 from pyexpat.errors import messages
+from datetime import datetime, timezone
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
 
-from ..extensions import db  # 从 app.extensions 导入共享的db实例
-from ..models.user_model import User  # 导入User模型
+# 从 app.extensions 导入共享的db实例和各类缓存/索引
+from ..extensions import (db, revocation_index, revocation_writer, principal_cache, session_revocations, rate_limiter,
+                          username_filter, shared_revocations, role_permissions)
+from ..services.db_routing import replica_reads
+from ..services.password_hasher import HashingOverloaded
+from ..services.rate_limiter import RateLimited
+from ..models.user_model import LOGIN_COLUMNS, User, username_taken  # 导入User模型
+from ..services.principal_resolver import resolve_principal
+from ..services.token_introspection import introspect_tokens
 from ..models.token_model import TokenBlocklist  # 导入TokenBlocklist模型
+from ..models.role_model import Role, role_names_for_user
+from ..services.permissions import Permission, require_permissions
 
 # 创建名为'auth_api'的蓝图实例 (已在5.3.2节定义)
 auth_bp = Blueprint('auth_api', __name__)
 
+# 高频的成功日志绑定采样键，可通过LOG_SAMPLE_RATES按比例采样
+login_success_logger = logger.bind(sample="auth.login_success")
+refresh_success_logger = logger.bind(sample="auth.refresh_success")
+
+
+@auth_bp.errorhandler(HashingOverloaded)
+def handle_hashing_overloaded(e: HashingOverloaded):
+    """
+    密码哈希执行器繁忙时快速失败 (负载削减)，而不是让请求线程无限排队。
+    客户端应在Retry-After秒后重试。
+    """
+    logger.warning("密码哈希任务繁忙，拒绝请求 {}。", request.path)
+    response = jsonify(message="服务繁忙，请稍后再试。")
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response, 503
+
+
+@auth_bp.errorhandler(RateLimited)
+def handle_rate_limited(e: RateLimited):
+    """登录尝试过于频繁 (同一用户名或同一客户端)，返回429并告知客户端何时可以重试。"""
+    logger.warning("请求 {} 被限流，{} 秒后可重试。", request.path, e.retry_after)
+    response = jsonify(message="尝试次数过多，请稍后再试。")
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response, 429
+
 
 @auth_bp.route('/register', methods=['POST'])
 def register() -> tuple[jsonify, int]:
@@ -34,12 +73,12 @@ def register() -> tuple[jsonify, int]:
         logger.warning("注册请求中的username为空。")
         return jsonify(message="用户名不能为空"), 400
     if len(password) < 6:
-        logger.warning(f"用户 '{username}' 尝试使用过短的密码注册。")
+        logger.warning("用户 '{}' 尝试使用过短的密码注册。", username)
         return jsonify(message="密码长度不能少于6个字符"), 400
 
-    # 使用User模型查询数据库，检查用户名是否已存在
-    if User.query.filter_by(username=username).first():
-        logger.info(f"注册尝试失败：用户名 '{username}' 已在数据库中存在。")
+    # 在计算密码哈希之前做一次廉价的可用性检查 (通常只查内存中的用户名过滤器)，避免为注定失败的请求消耗哈希CPU
+    if username_taken(username):
+        logger.info("注册尝试失败：用户名 '{}' 已在数据库中存在。", username)
         return jsonify(message=f"用户名 '{username}' 已被注册"), 409  # HTTP 409 Conflict
 
     # 创建User模型实例
@@ -48,13 +87,34 @@ def register() -> tuple[jsonify, int]:
 
     try:
         db.session.add(new_user)  # 将新用户对象添加到SQLAlchemy的数据库会话中
+        db.session.flush()  # 在同一事务内执行INSERT并取得自增ID
+        user_id = new_user.id  # 提交后对象会过期，此时读取ID可避免提交后再查询一次
         db.session.commit()  # 提交会话，将更改实际写入数据库
-        logger.info(f"用户 '{username}' (ID: {new_user.id}) 注册成功并存入数据库。")
-        return jsonify(message=f"用户 '{username}' 注册成功，请登录。"), 201  # HTTP 201 Created
+    except IntegrityError:
+        # 并发注册同一用户名 (或过滤器尚未同步到其他进程刚注册的用户名)：由唯一索引兜底
+        db.session.rollback()
+        username_filter.add(username)
+        logger.info("注册尝试失败：用户名 '{}' 已在数据库中存在。", username)
+        return jsonify(message=f"用户名 '{username}' 已被注册"), 409
     except Exception as e:
         db.session.rollback()  # 如果在提交过程中发生任何数据库错误，回滚事务
-        logger.error(f"注册用户 '{username}' 时数据库操作失败: {e}")
+        logger.error("注册用户 '{}' 时数据库操作失败: {}", username, e)
         return jsonify(message="注册服务内部错误，请稍后再试。"), 500
+    username_filter.add(username)
+    logger.info("用户 '{}' (ID: {}) 注册成功并存入数据库。", username, user_id)
+    return jsonify(message=f"用户 '{username}' 注册成功，请登录。"), 201  # HTTP 201 Created
+
+
+@auth_bp.route('/username-available', methods=['GET'])
+def username_available() -> tuple[jsonify, int]:
+    """
+    用户名可用性检查，供前端注册表单实时校验。
+    例如: GET /api/auth/username-available?username=alice -> {"username": "alice", "available": false}
+    """
+    username: str = (request.args.get('username') or '').strip()
+    if not username:
+        return jsonify(message="缺少username参数"), 400
+    return jsonify(username=username, available=not username_taken(username)), 200
 
 
 @auth_bp.route('/login', methods=['POST'])
@@ -70,15 +130,31 @@ def login() -> tuple[jsonify, int]:
     username: str = data['username'].strip()
     password: str = data['password']
 
-    user: User | None = User.query.filter_by(username=username).first()
+    # 在查询数据库和计算密码哈希之前先做限流检查，撞库流量无法消耗哈希CPU
+    rate_limiter.check_login(username, request.remote_addr)
+
+    with replica_reads():  # 登录时的用户查询是只读的，可路由到只读副本
+        # 只加载登录需要的列 (含password_hash)，其余列延迟加载，登录流程不会访问
+        user: User | None = User.query.options(load_only(*LOGIN_COLUMNS)).filter_by(username=username).first()
 
     if user and user.check_password(password):  # 使用User模型内部定义的check_password方法进行密码验证
         if not user.is_active:
-            logger.warning(f"已禁用账户尝试登录: '{username}' (ID: {user.id})")
+            logger.warning("已禁用账户尝试登录: '{}' (ID: {})", username, user.id)
             return jsonify(message="账户已被禁用，请联系管理员"), 403
 
-        user_roles = ["user"]  # 简化示例，实际应从数据库获取
-        additional_claims_data = {"roles": user_roles}
+        # 存储的哈希与当前哈希策略不一致时 (例如调整了代价参数)，借这次登录的明文密码透明地重新哈希
+        try:
+            if user.upgrade_password_hash(password):
+                logger.info("用户 '{}' 的密码哈希已升级为当前策略。", username)
+        except HashingOverloaded:
+            pass  # 哈希执行器繁忙时下次登录再升级，不影响本次登录
+        except Exception as e:
+            db.session.rollback()
+            logger.warning("用户 '{}' 的密码哈希升级失败: {}", username, e)
+
+        # 角色在签发时编译为 "perms" 权限位掩码；uid和ver (安全版本号) 使受保护视图可以只凭Token声明完成鉴权，无需查询数据库
+        additional_claims_data = role_permissions.token_claims(user, role_names_for_user(user.id), Role)
+        user_roles = additional_claims_data["roles"]
         # 生成Access Token和Refresh Token
 
         # 回顾：create_access_token:
@@ -96,34 +172,37 @@ def login() -> tuple[jsonify, int]:
             additional_claims=additional_claims_data
         )
 
-        logger.info(f"用户 '{username}' (ID: {user.id}) 登录成功。")
+        rate_limiter.reset_login(username)  # 登录成功后清零该用户名的失败计数
+        principal_cache.put(user.to_principal())  # 登录必须读取密码哈希，顺便预热后续/me和refresh要用的缓存
+        login_success_logger.info("用户 '{}' (ID: {}) 登录成功。", username, user.id)
         return jsonify(
             message=f"用户 '{username}' 登录成功。",
             access_token=access_token,
             refresh_token=refresh_token,
             user={"id": user.id, "username": user.username, "roles": user_roles}
         ), 200
-    logger.warning(f"用户 '{username}' 尝试登录失败：用户名或密码无效。")
+    logger.warning("用户 '{}' 尝试登录失败：用户名或密码无效。", username)
     return jsonify(message="用户名或密码无效。"), 401
 
 
 @auth_bp.route('/refresh', methods=['POST'])
 @jwt_required(refresh=True)
 def refresh_token_api() -> tuple[jsonify, int]:
-    current_user_id: int = get_jwt_identity()
-    user: User | None = User.query.filter_by(id=current_user_id, is_active=True).first()
+    current_user_id: str = get_jwt_identity()  # 登录时以用户名作为identity签发
+    # 刷新是重新确认账户状态的时机：无论AUTH_PRINCIPAL_MODE如何都校验账户状态和安全版本号
+    user, _ = resolve_principal(get_jwt(), force_check=True)
     if not user:
-        logger.warning(f"Refresh Token无效或用户(ID: {current_user_id})不存在/已禁用。")
+        logger.warning("Refresh Token无效或用户(ID: {})不存在/已禁用。", current_user_id)
         return jsonify(message="Refresh Token无效或用户状态异常。"), 401
 
-    user_roles = ["user"]
-    additional_claims_data = {"roles": user_roles}
+    # 刷新时重新读取角色，角色变更在下一次刷新后生效
+    additional_claims_data = role_permissions.token_claims(user, role_names_for_user(user.id), Role)
     new_access_token: str = create_access_token(
         identity=current_user_id,
         fresh=False,
         additional_claims=additional_claims_data
     )
-    logger.info(f"用户ID '{current_user_id}' 的Access Token已刷新。")
+    refresh_success_logger.info("用户ID '{}' 的Access Token已刷新。", current_user_id)
     return jsonify(access_token=new_access_token), 200
 
 
@@ -135,18 +214,90 @@ def logout_access_api() -> tuple[jsonify, int]:
     token_type: str = jwt_payload.get("type", "access")
     user_identity: str = str(get_jwt_identity())
 
-    if TokenBlocklist.query.filter_by(jti=jti).one_or_none():
-        logger.info(f"Access Token JTI '{jti}' 已在黑名单中。")
+    # 同时记录Token自身的过期时间，便于后续清理任务删除已无意义的过期记录
+    expires_at = datetime.fromtimestamp(jwt_payload["exp"], timezone.utc) if "exp" in jwt_payload else None
+    try:
+        if revocation_writer.enabled:
+            # 写后缓冲：立即在本进程内生效，由后台线程批量写库
+            newly_revoked = revocation_writer.submit(jti, token_type, user_identity, expires_at)
+        else:
+            # 一条 INSERT ... IGNORE 完成吊销，重复/并发登出由jti唯一约束去重
+            newly_revoked = TokenBlocklist.revoke_many([{"jti": jti, "token_type": token_type,
+                                                         "user_identity": user_identity,
+                                                         "expires_at": expires_at}]) == 1
+    except Exception as e:
+        db.session.rollback()
+        logger.error("吊销Access Token JTI '{}' 时数据库操作失败: {}", jti, e)
+        return jsonify(message="登出过程中发生服务器内部错误。"), 500
+    revocation_index.add(jti)  # 立即在本进程内生效，其他进程通过增量同步获知
+    if shared_revocations.enabled:
+        shared_revocations.add(jti, jwt_payload.get("exp"))  # 同一主机的其他Worker立即可见
+    if not newly_revoked:
+        logger.info("Access Token JTI '{}' 已在黑名单中。", jti)
         return jsonify(message="您已登出。"), 200
+    logger.info("Access Token JTI '{}' for user '{}' 已加入数据库黑名单。", jti, user_identity)
+    return jsonify(message="Access Token已成功吊销，安全登出。"), 200
 
+
+@auth_bp.route('/sessions', methods=['DELETE'])
+@require_permissions(Permission.SESSIONS_REVOKE)
+def logout_all_sessions_api() -> tuple[jsonify, int]:
+    """
+    注销当前用户在所有设备上的会话 ("退出所有设备")。
+    只写入一次会话吊销时间戳，此前签发的全部Access/Refresh Token随即失效，无需逐个写入黑名单。
+    """
+    user_identity: str = str(get_jwt_identity())
     try:
-        blocked_token = TokenBlocklist(jti=jti, token_type=token_type, user_identity=user_identity)
-        db.session.add(blocked_token)
-        db.session.commit()
-        logger.info(f"Access Token JTI '{jti}' for user '{user_identity}' 已加入数据库黑名单。")
-        return jsonify(message="Access Token已成功吊销，安全登出。"), 200
+        session_revocations.revoke_users(User, [user_identity])
+        logger.info("用户 '{}' 的所有会话已被吊销。", user_identity)
+        return jsonify(message="已退出所有设备，请重新登录。"), 200
     except Exception as e:
         db.session.rollback()
-        logger.error(f"吊销Access Token JTI '{jti}' 时数据库操作失败: {e}")
+        logger.error("吊销用户 '{}' 的所有会话时数据库操作失败: {}", user_identity, e)
         return jsonify(message="登出过程中发生服务器内部错误。"), 500
 
+
+def _introspection_client() -> str | None:
+    """校验内省调用方的HTTP Basic凭证，返回client_id；未配置凭证或校验失败时返回None。"""
+    clients = dict(item.strip().split(":", 1) for item in current_app.config.get("INTROSPECTION_CLIENTS", "").split(",")
+                   if ":" in item)
+    auth = request.authorization
+    if not clients or auth is None or auth.type != "basic" or auth.username not in clients:
+        return None
+    if not hmac.compare_digest(clients[auth.username].encode(), (auth.password or "").encode()):
+        return None
+    return auth.username
+
+
+@auth_bp.route('/introspect', methods=['POST'])
+def introspect() -> tuple[jsonify, int]:
+    """
+    Token内省端点 (RFC 7662)，供API网关等下游服务批量校验本服务签发的Token。
+    - 单个: 表单 token=... 或 JSON {"token": "..."}，返回 {"active": true, ...声明} 或 {"active": false}；
+    - 批量: JSON {"tokens": ["...", "..."]}，返回 {"results": [...]}，顺序与请求一致。
+    整批Token的黑名单检查合并为一条 jti IN (...) 查询，而不是每个Token各查一次。
+    """
+    client_id = _introspection_client()
+    if client_id is None:
+        response = jsonify(message="内省调用方认证失败。")
+        response.headers["WWW-Authenticate"] = 'Basic realm="introspect"'
+        return response, 401
+
+    data: dict = request.get_json(silent=True) or {}
+    if isinstance(data.get('tokens'), list):
+        tokens, batch = data['tokens'], True
+    else:
+        token = data.get('token') or request.form.get('token')
+        if not token:
+            return jsonify(message="请求必须包含'token'或'tokens'字段"), 400
+        tokens, batch = [token], False
+    max_batch: int = current_app.config.get("INTROSPECTION_MAX_BATCH", 500)
+    if len(tokens) > max_batch:
+        return jsonify(message=f"单次最多内省 {max_batch} 个Token"), 400
+
+    results = introspect_tokens(tokens)
+    logger.debug("调用方 '{}' 内省了 {} 个Token，其中 {} 个有效。", client_id, len(tokens),
+                 sum(result["active"] for result in results))
+    if batch:
+        return jsonify(results=results), 200
+    return jsonify(results[0]), 200
@@ -0,0 +1,178 @@
+# backend/app/apis/auth_async_api.py
+"""
+认证API的异步版本 (AUTH_ASYNC_ENABLED=True 时代替 auth_api 注册在 /api/auth 下)。
+注册、登录、登出这些以数据库I/O为主的端点使用async视图和异步驱动，等待数据库期间不阻塞事件循环；
+密码哈希仍交给执行器完成。刷新和"退出所有设备"沿用同步视图，URL和响应格式与同步版本完全一致。
+"""
+from datetime import datetime, timezone
+
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
+
+from ..extensions import (async_db, revocation_index, revocation_writer, principal_cache, rate_limiter, username_filter,
+                          shared_revocations, role_permissions)
+from ..models.role_model import Role, user_roles
+from ..models.token_model import TokenBlocklist
+from ..models.user_model import LOGIN_COLUMNS, User
+from ..services.password_hasher import HashingOverloaded
+from ..services.rate_limiter import RateLimited
+from ..services.sql_dialects import insert_ignore
+from . import auth_api
+
+auth_async_bp = Blueprint('auth_async_api', __name__)
+auth_async_bp.register_error_handler(HashingOverloaded, auth_api.handle_hashing_overloaded)
+auth_async_bp.register_error_handler(RateLimited, auth_api.handle_rate_limited)
+
+
+@auth_async_bp.route('/register', methods=['POST'])
+async def register() -> tuple[jsonify, int]:
+    """用户注册 (异步)。"""
+    data: dict | None = request.get_json()
+    if not data or not data.get('username') or not data.get('password'):
+        logger.warning("注册请求缺少username或password字段。")
+        return jsonify(message="请求体必须包含'username'和'password'字段"), 400
+
+    username: str = data['username'].strip()
+    password: str = data['password']
+
+    if not username:
+        logger.warning("注册请求中的username为空。")
+        return jsonify(message="用户名不能为空"), 400
+    if len(password) < 6:
+        logger.warning("用户 '{}' 尝试使用过短的密码注册。", username)
+        return jsonify(message="密码长度不能少于6个字符"), 400
+
+    async with async_db.session() as session:
+        # 过滤器判定"一定未占用"时跳过查询 (过滤器可能需要同步数据库，放到线程中执行)
+        if await async_db.run_in_executor(username_filter.might_be_taken, username, User) and \
+                (await session.execute(select(User.id).where(User.username == username).limit(1))).first():
+            logger.info("注册尝试失败：用户名 '{}' 已在数据库中存在。", username)
+            return jsonify(message=f"用户名 '{username}' 已被注册"), 409
+
+        new_user = User(username=username)
+        await async_db.run_in_executor(new_user.set_password, password)  # 哈希计算不占用事件循环
+        session.add(new_user)
+        try:
+            await session.commit()
+        except IntegrityError:
+            # 两个请求同时注册同一用户名：由唯一索引兜底
+            await session.rollback()
+            username_filter.add(username)
+            logger.info("注册尝试失败：用户名 '{}' 已在数据库中存在。", username)
+            return jsonify(message=f"用户名 '{username}' 已被注册"), 409
+        except Exception as e:
+            await session.rollback()
+            logger.error("注册用户 '{}' 时数据库操作失败: {}", username, e)
+            return jsonify(message="注册服务内部错误，请稍后再试。"), 500
+    username_filter.add(username)
+    logger.info("用户 '{}' (ID: {}) 注册成功并存入数据库。", username, new_user.id)
+    return jsonify(message=f"用户 '{username}' 注册成功，请登录。"), 201
+
+
+@auth_async_bp.route('/login', methods=['POST'])
+async def login() -> tuple[jsonify, int]:
+    """用户登录 (异步)。"""
+    data: dict | None = request.get_json()
+    if not data or not data.get('username') or not data.get('password'):
+        logger.warning("登录请求缺少username或password字段。")
+        return jsonify(message="请求体必须包含'username'和'password'字段"), 400
+    username: str = data['username'].strip()
+    password: str = data['password']
+
+    rate_limiter.check_login(username, request.remote_addr)
+
+    async with async_db.session() as session:
+        user: User | None = (await session.execute(
+            select(User).options(load_only(*LOGIN_COLUMNS)).where(User.username == username)
+        )).scalar()
+
+    if user and await async_db.run_in_executor(user.check_password, password):
+        if not user.is_active:
+            logger.warning("已禁用账户尝试登录: '{}' (ID: {})", username, user.id)
+            return jsonify(message="账户已被禁用，请联系管理员"), 403
+
+        try:
+            if await async_db.run_in_executor(user.upgrade_password_hash, password):
+                logger.info("用户 '{}' 的密码哈希已升级为当前策略。", username)
+        except HashingOverloaded:
+            pass
+        except Exception as e:
+            logger.warning("用户 '{}' 的密码哈希升级失败: {}", username, e)
+
+        async with async_db.session() as session:
+            role_names = list((await session.execute(
+                select(Role.name).join(user_roles, user_roles.c.role_id == Role.id)
+                .where(user_roles.c.user_id == user.id)
+            )).scalars())
+        if role_permissions.stale:
+            # 编译表过期时的重新加载是同步查询，交给线程池执行，不阻塞事件循环
+            await async_db.run_in_executor(role_permissions.reload, Role)
+        additional_claims_data = role_permissions.token_claims(user, role_names, Role)
+        access_token = create_access_token(identity=user.username, fresh=True,
+                                           additional_claims=additional_claims_data)
+        refresh_token: str = create_refresh_token(identity=user.username, additional_claims=additional_claims_data)
+
+        rate_limiter.reset_login(username)
+        principal_cache.put(user.to_principal())
+        auth_api.login_success_logger.info("用户 '{}' (ID: {}) 登录成功。", username, user.id)
+        return jsonify(
+            message=f"用户 '{username}' 登录成功。",
+            access_token=access_token,
+            refresh_token=refresh_token,
+            user={"id": user.id, "username": user.username, "roles": additional_claims_data["roles"]}
+        ), 200
+    logger.warning("用户 '{}' 尝试登录失败：用户名或密码无效。", username)
+    return jsonify(message="用户名或密码无效。"), 401
+
+
+@auth_async_bp.route('/logout', methods=['DELETE'])
+@jwt_required()
+async def logout_access_api() -> tuple[jsonify, int]:
+    """登出 (异步)：将当前Token的JTI写入黑名单。"""
+    jwt_payload: dict = get_jwt()
+    jti: str = jwt_payload["jti"]
+    token_type: str = jwt_payload.get("type", "access")
+    user_identity: str = str(get_jwt_identity())
+
+    expires_at = datetime.fromtimestamp(jwt_payload["exp"], timezone.utc) if "exp" in jwt_payload else None
+    if revocation_writer.enabled:
+        newly_revoked = revocation_writer.submit(jti, token_type, user_identity, expires_at)
+    else:
+        async with async_db.session() as session:
+            try:
+                # 一条 INSERT ... IGNORE 完成吊销，重复/并发登出由jti唯一约束去重
+                statement = insert_ignore(TokenBlocklist.__table__, async_db.engine.dialect.name)
+                result = await session.execute(statement, [{"jti": jti, "token_type": token_type,
+                                                            "user_identity": user_identity,
+                                                            "expires_at": expires_at}])
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                logger.error("吊销Access Token JTI '{}' 时数据库操作失败: {}", jti, e)
+                return jsonify(message="登出过程中发生服务器内部错误。"), 500
+        newly_revoked = result.rowcount == 1
+    revocation_index.add(jti)
+    if shared_revocations.enabled:
+        shared_revocations.add(jti, jwt_payload.get("exp"))
+    if not newly_revoked:
+        logger.info("Access Token JTI '{}' 已在黑名单中。", jti)
+        return jsonify(message="您已登出。"), 200
+    logger.info("Access Token JTI '{}' for user '{}' 已加入数据库黑名单。", jti, user_identity)
+    return jsonify(message="Access Token已成功吊销，安全登出。"), 200
+
+
+# 刷新主要命中Principal缓存，"退出所有设备"只有一条UPDATE，直接沿用同步视图
+auth_async_bp.add_url_rule('/refresh', view_func=auth_api.refresh_token_api, methods=['POST'])
+auth_async_bp.add_url_rule('/sessions', view_func=auth_api.logout_all_sessions_api, methods=['DELETE'])
+auth_async_bp.add_url_rule('/username-available', view_func=auth_api.username_available, methods=['GET'])
+auth_async_bp.add_url_rule('/introspect', view_func=auth_api.introspect, methods=['POST'])
+
+
+async def is_jti_blocklisted(jti: str) -> bool:
+    """黑名单回查 (异步)：吊销索引无法直接判定时，由Token校验回调通过 async_db.run() 调用。"""
+    async with async_db.session() as session:
+        return (await session.execute(select(TokenBlocklist.id).where(TokenBlocklist.jti == jti))).first() is not None
@@ -0,0 +1,23 @@
+# backend/app/apis/jwks_api.py
+from flask import Blueprint, Response, current_app, request
+
+from ..extensions import signing_keys
+
+# 发布JWT公钥的蓝图，注册在根路径下 (/.well-known/jwks.json)
+jwks_bp = Blueprint('jwks_api', __name__)
+
+
+@jwks_bp.route('/.well-known/jwks.json', methods=['GET'])
+def get_jwks() -> Response:
+    """
+    以JWKS格式发布当前所有有效的JWT签名公钥，供下游服务在本地校验Token。
+    文档在启动时预先序列化，响应带有ETag和Cache-Control，客户端可缓存并用If-None-Match条件请求。
+    """
+    max_age: int = current_app.config.get("JWKS_MAX_AGE", 300)
+    headers = {
+        "Cache-Control": f"public, max-age={max_age}",
+        "ETag": f'"{signing_keys.jwks_etag}"',
+    }
+    if request.if_none_match.contains_weak(signing_keys.jwks_etag):  # 压缩后的响应带弱ETag，按弱比较
+        return Response(status=304, headers=headers)
+    return Response(signing_keys.jwks_json, mimetype="application/json", headers=headers)
@@ -1,19 +1,52 @@
 # backend/app/apis/user_api.py
-from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+import hashlib
+
+from flask import Blueprint, Response, jsonify, request
+from flask_jwt_extended import get_jwt_identity, get_jwt
 from loguru import logger
 from datetime import datetime, timezone
 
-from ..models.user_model import User # 导入User模型
+from ..services.permissions import Permission, require_permissions
+from ..services.principal_cache import Principal
+from ..services.principal_resolver import resolve_principal # 按AUTH_PRINCIPAL_MODE解析当前用户
 
 user_bp = Blueprint('user_api', __name__) # 创建蓝图实例
 
+# 读取类端点的缓存策略：浏览器可以缓存，但每次使用前都必须带If-None-Match重新验证 (登出等变化需立即生效)
+_READ_CACHE_CONTROL = "private, no-cache"
+# 响应格式变化时递增，使客户端已缓存的旧格式响应失效
+_PROFILE_REPRESENTATION = 1
+
+
+def _user_etag(claims: dict, user: Principal, *parts) -> str:
+    """
+    读取类端点的ETag：由Token的jti和用户的安全版本号派生 (可附加端点自己的部分)。
+    响应内容只取决于Token与用户状态，校验器不变即内容不变，无需先构造响应体再计算哈希。
+    """
+    key = ":".join(str(part) for part in (claims["jti"], user.security_version, *parts))
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _not_modified(etag: str) -> Response | None:
+    """客户端缓存仍然有效时返回304响应 (不含响应体)，否则返回None。"""
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        _set_cache_headers(response, etag)
+        return response
+    return None
+
+
+def _set_cache_headers(response: Response, etag: str) -> None:
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = _READ_CACHE_CONTROL
+    response.vary.add("Authorization")  # 同一URL的内容随Token而变
+
 @user_bp.route('/me', methods=['GET']) # 当蓝图以 url_prefix='/api' 注册时，此路由是 /api/me
-@jwt_required() 
-def get_my_profile() -> tuple[jsonify, int]:
+@require_permissions(Permission.PROFILE_READ)  # 包含jwt_required的校验，只对Token中的权限位做位运算
+def get_my_profile() -> tuple[Response, int]:
     """
     获取当前认证用户的个人资料。
-    需要有效的Access Token。
+    需要有效的Access Token。支持条件请求：If-None-Match与ETag一致时返回304，不再构造响应体。
     """
     # 获取通过Token传递的identity (即登录时create_access_token的identity参数)
     current_user_identity: str = get_jwt_identity()
@@ -22,13 +55,21 @@ def get_my_profile() -> tuple[jsonify, int]:
     # (可选) 获取Token 中的所有声明，包括自定义声明
     jwt_claims: dict = get_jwt()
 
-    # 从数据库中获取用户信息
-    user: User | None = User.query.filter_by(username=current_user_identity).first()
-    
+    # 获取用户信息：stateless模式下直接由Token声明构造；否则经Principal缓存加载并校验安全版本号
+    user, failure = resolve_principal(jwt_claims)
+
+    if failure == "stale":
+        logger.warning("受保护API /me：用户 '{}' 的Token版本已过期（修改过密码或账户已禁用）。", current_user_identity)
+        return jsonify(message="Token已失效，请重新登录。"), 401
     if not user:
-        logger.warning(f"受保护API /me：找不到用户ID为 '{current_user_identity}' 的用户（Token有效但用户可能已被删除）。")
+        logger.warning("受保护API /me：找不到用户ID为 '{}' 的用户（Token有效但用户可能已被删除）。", current_user_identity)
         return jsonify(message="找不到用户资料。"), 404
 
+    etag = _user_etag(jwt_claims, user, _PROFILE_REPRESENTATION)
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified, 304
+
     # 为了安全，不要直接返回存储中的哈希密码
     # 此处可以构建一个包含安全信息的用户对象返回给前端
     user_profile_data = {
@@ -38,4 +79,6 @@ def get_my_profile() -> tuple[jsonify, int]:
         "token_type": jwt_claims.get("type")
     }
 
-    return jsonify(user_profile_data), 200
\ No newline at end of file
+    response = jsonify(user_profile_data)
+    _set_cache_headers(response, etag)
+    return response, 200
\ No newline at end of file
@@ -0,0 +1,148 @@
+# backend/app/commands.py
+from datetime import datetime, timezone
+from pathlib import Path
+
+import click
+from flask import Flask
+
+from .services.permissions import Permission
+
+
+def register_commands(app: Flask) -> None:
+    """向应用注册自定义的 `flask` 命令行命令。"""
+
+    @app.cli.command("prune-blocklist")
+    @click.option("--batch-size", default=None, type=int, help="每批删除的最大行数 (默认读取BLOCKLIST_PRUNE_BATCH_SIZE)")
+    @click.option("--max-batches", default=None, type=int, help="最多执行的批次数，不指定则删到没有过期记录为止")
+    def prune_blocklist_command(batch_size: int | None, max_batches: int | None) -> None:
+        """分批删除已过期的Token黑名单记录。"""
+        from .services.blocklist_pruner import prune_blocklist
+
+        batch_size = batch_size or app.config.get("BLOCKLIST_PRUNE_BATCH_SIZE", 1000)
+        deleted = prune_blocklist(batch_size, max_batches)
+        click.echo(f"已删除 {deleted} 条过期的黑名单记录。")
+
+    @app.cli.command("revoke-sessions")
+    @click.argument("usernames", nargs=-1)
+    @click.option("--file", "usernames_file", type=click.File("r", encoding="utf-8"), default=None,
+                  help="从文件读取用户名，每行一个 (用于批量强制下线)")
+    @click.option("--chunk-size", default=1000, type=int, help="每条UPDATE语句包含的最大用户数")
+    def revoke_sessions_command(usernames: tuple[str, ...], usernames_file, chunk_size: int) -> None:
+        """强制下线指定用户：吊销其此前签发的所有Token。"""
+        from .extensions import session_revocations
+        from .models.user_model import User
+
+        targets = list(usernames)
+        if usernames_file is not None:
+            targets.extend(line.strip() for line in usernames_file if line.strip())
+        affected = 0
+        for start in range(0, len(targets), chunk_size):
+            affected += session_revocations.revoke_users(User, targets[start:start + chunk_size])
+        click.echo(f"已吊销 {affected} 个用户的全部会话。")
+
+    @app.cli.command("generate-signing-key")
+    @click.option("--kid", default=None, help="密钥ID，默认使用当前UTC时间，例如 20240101T000000")
+    @click.option("--algorithm", type=click.Choice(["RS256", "EdDSA"]), default=None,
+                  help="签名算法，默认读取JWT_ALGORITHM")
+    def generate_signing_key_command(kid: str | None, algorithm: str | None) -> None:
+        """生成新的JWT签名私钥，写入JWT_KEYS_DIR/<kid>.pem。"""
+        from .services.signing_keys import generate_private_key_pem
+
+        algorithm = algorithm or app.config.get("JWT_ALGORITHM")
+        if algorithm not in ("RS256", "EdDSA"):
+            algorithm = "RS256"
+        kid = kid or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        keys_dir = Path(app.config["JWT_KEYS_DIR"])
+        keys_dir.mkdir(parents=True, exist_ok=True)
+        key_path = keys_dir / f"{kid}.pem"
+        if key_path.exists():
+            raise click.ClickException(f"密钥文件 {key_path} 已存在。")
+        key_path.write_bytes(generate_private_key_pem(algorithm))
+        key_path.chmod(0o600)
+        click.echo(f"已生成 {algorithm} 私钥: {key_path}。设置 JWT_ACTIVE_KID={kid} 以启用该密钥签名。")
+
+    @app.cli.command("import-users")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+    @click.option("--format", "file_format", type=click.Choice(["csv", "jsonl"]), default=None,
+                  help="输入文件格式，默认根据扩展名判断")
+    @click.option("--batch-size", default=1000, type=int, help="每条多行INSERT包含的用户数")
+    @click.option("--workers", default=None, type=int, help="哈希进程数，默认为CPU核数")
+    @click.option("--checkpoint", "checkpoint_path", default=None, type=click.Path(path_type=Path),
+                  help="检查点文件，导入中断后使用相同参数重新运行即可从断点继续")
+    def import_users_command(path: Path, file_format: str | None, batch_size: int, workers: int | None,
+                             checkpoint_path: Path | None) -> None:
+        """从CSV或JSON Lines文件流式批量导入用户。"""
+        from .services.user_import import import_users
+
+        file_format = file_format or ("csv" if path.suffix.lower() == ".csv" else "jsonl")
+        stats = import_users(path, file_format, batch_size=batch_size, workers=workers,
+                             checkpoint_path=checkpoint_path)
+        click.echo(f"导入完成: 处理 {stats.processed} 条，插入 {stats.inserted} 个用户，"
+                   f"重复 {stats.duplicates} 条，无效 {stats.invalid} 条。")
+
+    @app.cli.command("calibrate-password-hash")
+    @click.option("--target-ms", default=250.0, type=float, help="单次密码哈希的目标耗时(毫秒)，决定登录延迟下限")
+    @click.option("--method", type=click.Choice(["scrypt", "pbkdf2"]), default=None,
+                  help="哈希算法，默认读取PASSWORD_HASH_METHOD")
+    @click.option("--samples", default=5, type=int, help="每组参数的测量次数 (取中位数)")
+    def calibrate_password_hash_command(target_ms: float, method: str | None, samples: int) -> None:
+        """测量本机性能，为目标耗时选择密码哈希参数，并输出对应的环境变量配置。"""
+        from .extensions import password_hasher
+        from .services.password_policy import calibrate, measure
+
+        current = password_hasher.policy
+        click.echo(f"当前策略 {current.method_string}: {measure(current, samples):.1f} ms")
+        policy, elapsed_ms = calibrate(target_ms, method or current.method, samples)
+        click.echo(f"推荐策略 {policy.method_string}: {elapsed_ms:.1f} ms (目标 {target_ms:.0f} ms)")
+        if elapsed_ms > target_ms:
+            click.echo("注意: 已达到安全下限，本机无法在目标耗时内完成更低代价的哈希。")
+        click.echo("将以下配置写入 .env (旧哈希会在用户下次登录时自动升级):")
+        for key, value in policy.to_env().items():
+            click.echo(f"{key}={value}")
+
+    @app.cli.command("set-role")
+    @click.argument("name")
+    @click.option("--permission", "-p", "permission_names", multiple=True,
+                  type=click.Choice([permission.name for permission in Permission], case_sensitive=False),
+                  help="授予该角色的权限，可重复指定；不指定时沿用内置角色的权限 (若有)")
+    @click.option("--description", default=None, help="角色说明")
+    def set_role_command(name: str, permission_names: tuple[str, ...], description: str | None) -> None:
+        """创建或更新角色及其权限 (已签发的Token在刷新后按新权限编译)。"""
+        from .extensions import db
+        from .models.role_model import Role
+        from .services.permissions import BUILTIN_ROLES
+
+        if permission_names:
+            mask = 0
+            for permission_name in permission_names:
+                mask |= Permission[permission_name.upper()]
+        else:
+            mask = BUILTIN_ROLES.get(name, 0)
+        role = Role.query.filter_by(name=name).one_or_none() or Role(name=name)
+        role.permissions = int(mask)
+        if description is not None:
+            role.description = description
+        db.session.add(role)
+        db.session.commit()
+        click.echo(f"角色 '{name}' 的权限: {Permission(mask)!r}")
+
+    @app.cli.command("assign-role")
+    @click.argument("username")
+    @click.argument("role_name")
+    @click.option("--remove", is_flag=True, help="移除而不是分配该角色")
+    def assign_role_command(username: str, role_name: str, remove: bool) -> None:
+        """为用户分配 (或移除) 角色，用户下次登录或刷新Token时生效。"""
+        from .extensions import db
+        from .models.role_model import Role, user_roles
+        from .models.user_model import User
+
+        user = User.query.filter_by(username=username).one_or_none()
+        role = Role.query.filter_by(name=role_name).one_or_none()
+        if user is None or role is None:
+            raise click.ClickException(f"用户 '{username}' 或角色 '{role_name}' 不存在 (角色可用 set-role 创建)。")
+        link = user_roles.c.user_id == user.id, user_roles.c.role_id == role.id
+        db.session.execute(db.delete(user_roles).where(*link))
+        if not remove:
+            db.session.execute(db.insert(user_roles).values(user_id=user.id, role_id=role.id))
+        db.session.commit()
+        click.echo(f"已{'移除' if remove else '分配'}用户 '{username}' 的角色 '{role_name}'。")
@@ -13,13 +13,78 @@ env_path = Path(__file__).parent.parent.parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
 
+def engine_options_from_env() -> dict:
+    """
+    从环境变量读取SQLAlchemy连接池参数 (用于MySQL等服务端数据库)。
+    pool_pre_ping 在借出连接前探活，避免使用已被服务端断开的连接；
+    pool_recycle 应小于MySQL的 wait_timeout，定期回收长时间存活的连接。
+    """
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),  # 连接池常驻连接数
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),  # 高峰期允许额外创建的连接数
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "5")),  # 等待空闲连接的最长时间(秒)
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),  # 连接最长存活时间(秒)
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+    }
+
+
+def replica_uris_from_env() -> list[str]:
+    """只读副本连接串，多个副本用逗号分隔，例如 DB_REPLICA_URIS=mysql+pymysql://...,mysql+pymysql://..."""
+    return [uri.strip() for uri in os.getenv("DB_REPLICA_URIS", "").split(",") if uri.strip()]
+
+
 class Config:
     """基础配置类，包含所有环境通用的配置"""
     SECRET_KEY = os.getenv("SECRET_KEY", "a_very_default_and_insecure_secret_key")  # Flask应用本身的密钥
 
+    # 日志配置 (见 extensions.configure_logging)
+    LOG_LEVEL = os.getenv("LOG_LEVEL")  # 未设置时DEBUG模式为DEBUG，否则为INFO
+    LOG_TO_CONSOLE = os.getenv("LOG_TO_CONSOLE", "true").lower() == "true"
+    LOG_FILE = os.getenv("LOG_FILE")  # 日志文件路径，例如 logs/app.log；未设置则不写文件
+    LOG_JSON = os.getenv("LOG_JSON", "false").lower() == "true"  # 文件日志是否使用JSON Lines格式
+    LOG_ROTATION = os.getenv("LOG_ROTATION", "50 MB")  # 单个日志文件达到该大小后轮转
+    LOG_RETENTION = os.getenv("LOG_RETENTION", "14 days")  # 归档日志保留时长
+    LOG_COMPRESSION = os.getenv("LOG_COMPRESSION", "gz")  # 归档日志的压缩格式
+    LOG_BUFFER_SIZE = int(os.getenv("LOG_BUFFER_SIZE", str(64 * 1024)))  # 文件写缓冲区大小(字节)，用于批量写入
+    # 按采样键或日志级别配置采样率，例如只记录10%的登录成功日志
+    LOG_SAMPLE_RATES = {"auth.login_success": float(os.getenv("LOG_SAMPLE_LOGIN_SUCCESS", "1.0")),
+                        "auth.refresh_success": float(os.getenv("LOG_SAMPLE_REFRESH_SUCCESS", "1.0"))}
+
+    # 请求指标配置：启用后注册请求计时钩子，并在METRICS_PATH以Prometheus文本格式输出
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+    METRICS_PATH = os.getenv("METRICS_PATH", "/metrics")  # 应只在内网/抓取端可访问的网络中暴露
+
+    # 响应压缩：客户端支持gzip且响应体不小于COMPRESSION_MIN_SIZE字节时压缩 (由反向代理负责压缩时可关闭)
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "6"))  # gzip压缩级别 1-9，级别越高越慢
+
+    # SQL查询分析器：按语句指纹统计查询、记录慢查询及其EXPLAIN，并检查每个端点的查询次数预算
+    QUERY_PROFILER_ENABLED = os.getenv("QUERY_PROFILER_ENABLED", "false").lower() == "true"
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))  # 超过该耗时(毫秒)的查询记为慢查询
+    SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"  # 慢查询是否附带执行计划
+    SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "300"))  # 同一语句两次EXPLAIN的最小间隔(秒)
+    # 端点 (完整端点名或视图函数名) -> 每个请求允许的最多查询次数 (按最坏情况)，
+    # 不含吊销索引/会话吊销/角色编译表等按间隔执行的同步和重新加载查询。
+    # 校验JWT时的黑名单回查：吊销索引关闭时每个请求都会执行，开启时只在布隆过滤器误判时执行，因此计入预算
+    QUERY_BUDGETS = {
+        "get_my_profile": 2,  # /api/me: 黑名单回查 + Principal加载 (缓存命中时均为0)
+        "refresh_token_api": 3,  # 黑名单回查 + Principal加载 + 角色查询
+        "login": 3,  # 用户查询 + 角色查询 + 偶尔的密码哈希升级
+        "register": 2,  # 可用性检查 + 插入
+        "logout_access_api": 2,  # 黑名单回查 + 单条 INSERT ... IGNORE
+        "username_available": 1,
+        "introspect": 2,  # 一条 jti IN (...) 黑名单查询 + 缓存未命中用户的一条 username IN (...) 查询
+    }
+    QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "false").lower() == "true"  # 超出预算时直接报错 (用于测试)
+
     # SQLAlchemy 配置
     SQLALCHEMY_TRACK_MODIFICATIONS = False  # 关闭Flask-SQLAlchemy的事件通知系统，以减少开销
     SQLALCHEMY_ECHO = False  # 默认情况下，不打印SQLAlchemy执行的SQL语句
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options_from_env()  # 连接池参数 (主库与只读副本共用)
+    SQLALCHEMY_REPLICA_URIS = replica_uris_from_env()  # 只读副本，未配置时所有查询都发往主库
+    DB_REPLICA_HEALTHCHECK_INTERVAL = float(os.getenv("DB_REPLICA_HEALTHCHECK_INTERVAL", "5"))  # 副本探活间隔(秒)
+    DB_REPLICA_RETRY_INTERVAL = float(os.getenv("DB_REPLICA_RETRY_INTERVAL", "30"))  # 探活失败的副本暂停使用的时长(秒)
 
     # JWT (JSON Web Token) 配置
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "another_default_and_insecure_jwt_secret_key")  # 用于签名JWT的密钥
@@ -27,6 +92,96 @@ class Config:
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.getenv("JWT_REFRESH_TOKEN_DAYS", "14")))  # Refresh Token有效期
     JWT_BLACKLIST_ENABLED = True  # 启用Token黑名单功能 (用于Token吊销)
     JWT_BLACKLIST_TOKEN_CHECKS = ["access", "refresh"]  # 指定哪些类型的Token需要检查黑名单
+    # 非对称签名 (RS256/EdDSA)：其他服务可通过 /.well-known/jwks.json 获取公钥在本地校验Token，无需共享密钥
+    JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")  # 设置为RS256或EdDSA后启用密钥环
+    JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR", str(Path(__file__).parent.parent / "keys"))  # 存放 <kid>.pem 的目录
+    JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID")  # 当前用于签名的kid，未设置时使用目录中按名称排序的最后一把私钥
+    JWKS_MAX_AGE = int(os.getenv("JWKS_MAX_AGE", "300"))  # JWKS响应的缓存时间(秒)，密钥轮换时需等待超过此时间
+    # Token内省 (POST /api/auth/introspect) 的调用方凭证，格式 "client_id:secret,client_id2:secret2"，
+    # 调用方以HTTP Basic认证。未配置时内省端点不可用
+    INTROSPECTION_CLIENTS = os.getenv("INTROSPECTION_CLIENTS", "")
+    INTROSPECTION_MAX_BATCH = int(os.getenv("INTROSPECTION_MAX_BATCH", "500"))  # 单次请求最多内省的Token数
+
+    # Token吊销索引配置 (布隆过滤器 + LRU，位于TokenBlocklist查询之前)
+    REVOCATION_INDEX_ENABLED = os.getenv("REVOCATION_INDEX_ENABLED", "true").lower() == "true"
+    REVOCATION_INDEX_CAPACITY = int(os.getenv("REVOCATION_INDEX_CAPACITY", "1000000"))  # 布隆过滤器预估容量
+    REVOCATION_INDEX_ERROR_RATE = float(os.getenv("REVOCATION_INDEX_ERROR_RATE", "0.001"))  # 可接受的误判率
+    REVOCATION_INDEX_LRU_SIZE = int(os.getenv("REVOCATION_INDEX_LRU_SIZE", "10000"))  # 缓存的数据库确认结果数量
+    REVOCATION_INDEX_SYNC_INTERVAL = float(os.getenv("REVOCATION_INDEX_SYNC_INTERVAL", "1.0"))  # 跨进程增量同步间隔(秒)
+    SESSION_REVOCATION_SYNC_INTERVAL = float(os.getenv("SESSION_REVOCATION_SYNC_INTERVAL", "1.0"))  # 会话吊销时间戳同步间隔(秒)
+
+    # 主机共享吊销表：同一主机的所有Worker共享一个内存映射的JTI哈希表，登出立即对所有Worker可见
+    SHARED_REVOCATION_ENABLED = os.getenv("SHARED_REVOCATION_ENABLED", "false").lower() == "true"
+    SHARED_REVOCATION_PATH = os.getenv("SHARED_REVOCATION_PATH")  # 映射文件路径，默认 /dev/shm 下按数据库命名
+    SHARED_REVOCATION_CAPACITY = int(os.getenv("SHARED_REVOCATION_CAPACITY", str(1 << 20)))  # 槽位数 (每个24字节)
+    SHARED_REVOCATION_SYNC_INTERVAL = float(os.getenv("SHARED_REVOCATION_SYNC_INTERVAL", "1.0"))  # 从数据库增量同步的间隔(秒)
+
+    # 吊销记录写后缓冲：登出只写入内存队列，后台线程每隔几毫秒批量写库 (进程崩溃时可能丢失最近一个周期的记录)
+    REVOCATION_WRITE_BEHIND = os.getenv("REVOCATION_WRITE_BEHIND", "false").lower() == "true"
+    REVOCATION_FLUSH_INTERVAL = float(os.getenv("REVOCATION_FLUSH_INTERVAL", "0.005"))  # 批量写库间隔(秒)
+    REVOCATION_FLUSH_MAX_BATCH = int(os.getenv("REVOCATION_FLUSH_MAX_BATCH", "1000"))  # 每条INSERT最多写入的记录数
+    REVOCATION_FLUSH_MAX_BACKOFF = float(os.getenv("REVOCATION_FLUSH_MAX_BACKOFF", "5"))  # 写库失败时指数退避的最长间隔(秒)
+
+    # 过期黑名单记录清理配置
+    BLOCKLIST_PRUNE_INTERVAL = float(os.getenv("BLOCKLIST_PRUNE_INTERVAL", "0"))  # 后台清理间隔(秒)，0表示不启动后台线程
+    BLOCKLIST_PRUNE_BATCH_SIZE = int(os.getenv("BLOCKLIST_PRUNE_BATCH_SIZE", "1000"))  # 每批删除的最大行数
+
+    # 密码哈希执行器配置 (登录/注册时的哈希计算放到独立进程池中执行)
+    # 进程池属于每个Worker进程，以下两项均为单个Worker的值；gunicorn.conf.py 未显式配置时按 CPU核数 // Worker数 设置
+    HASHING_POOL_WORKERS = int(os.getenv("HASHING_POOL_WORKERS", str(os.cpu_count() or 1)))  # 进程数，0表示在请求线程内计算
+    HASHING_MAX_PENDING = int(os.getenv("HASHING_MAX_PENDING", "0"))  # 在途任务上限，超过即返回503；0表示进程数的4倍
+    HASHING_RETRY_AFTER = int(os.getenv("HASHING_RETRY_AFTER", "1"))  # 503响应中Retry-After头的秒数
+    HASHING_TIMEOUT = float(os.getenv("HASHING_TIMEOUT", "10"))  # 等待单个哈希任务的最长时间(秒)
+    # 密码哈希策略，可用 `flask calibrate-password-hash --target-ms 250` 按本机性能选择参数。
+    # 修改后，旧参数的哈希会在用户下次登录成功时自动按新参数重新计算
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt")  # "scrypt" 或 "pbkdf2"
+    PASSWORD_SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", str(2 ** 15)))  # CPU/内存代价，必须是2的幂
+    PASSWORD_SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", "8"))  # 块大小
+    PASSWORD_SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", "1"))  # 并行度
+    PASSWORD_PBKDF2_ITERATIONS = int(os.getenv("PASSWORD_PBKDF2_ITERATIONS", "1000000"))  # pbkdf2:sha256 迭代次数
+
+    # 登录限流配置 ("次数/秒数")，超限请求在查询数据库和计算哈希之前即返回429
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    LOGIN_RATE_LIMIT_PER_USERNAME = os.getenv("LOGIN_RATE_LIMIT_PER_USERNAME", "5/60")  # 同一用户名
+    LOGIN_RATE_LIMIT_PER_CLIENT = os.getenv("LOGIN_RATE_LIMIT_PER_CLIENT", "20/60")  # 同一客户端地址
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # "memory" 或 redis://... (多进程/多主机共享计数)
+    # 反向代理 (Nginx/负载均衡) 之后部署时，客户端地址取自 X-Forwarded-For，否则所有请求的 remote_addr 都是代理地址，
+    # 按客户端地址的限流会变成全局限流。值为可信代理的层数 (只信任最右侧这么多个代理追加的值)，0表示不信任该请求头。
+    # 直接对外暴露时必须保持为0，否则客户端可以伪造 X-Forwarded-For 绕过限流
+    PROXY_FIX_X_FOR = int(os.getenv("PROXY_FIX_X_FOR", "0"))
+    PROXY_FIX_X_PROTO = int(os.getenv("PROXY_FIX_X_PROTO", "0"))  # 信任 X-Forwarded-Proto 的代理层数 (影响生成的URL协议)
+
+    # Principal缓存配置 (用户名 -> id/username/is_active)
+    PRINCIPAL_CACHE_ENABLED = os.getenv("PRINCIPAL_CACHE_ENABLED", "true").lower() == "true"
+    PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))  # 缓存有效期(秒)，跨进程的修改依赖它兜底
+    PRINCIPAL_CACHE_MAXSIZE = int(os.getenv("PRINCIPAL_CACHE_MAXSIZE", "10000"))  # 最多缓存的用户数
+
+    # 已占用用户名过滤器 (布隆过滤器)：注册前检查和 /api/auth/username-available 大多无需访问数据库
+    USERNAME_FILTER_ENABLED = os.getenv("USERNAME_FILTER_ENABLED", "false").lower() == "true"
+    USERNAME_FILTER_CAPACITY = int(os.getenv("USERNAME_FILTER_CAPACITY", "1000000"))  # 预估用户数
+    USERNAME_FILTER_ERROR_RATE = float(os.getenv("USERNAME_FILTER_ERROR_RATE", "0.001"))  # 误判率 (误判时回查数据库)
+    USERNAME_FILTER_SYNC_INTERVAL = float(os.getenv("USERNAME_FILTER_SYNC_INTERVAL", "5"))  # 跨进程增量同步间隔(秒)
+
+    # 受保护视图的用户解析方式："version" 经缓存校验安全版本号；"stateless" 只凭Token声明，不访问数据库
+    AUTH_PRINCIPAL_MODE = os.getenv("AUTH_PRINCIPAL_MODE", "version")
+
+    # 角色与权限：签发Token时把用户角色编译为 "perms" 权限位掩码声明，受保护端点只做位运算
+    DEFAULT_ROLES = [role.strip() for role in os.getenv("DEFAULT_ROLES", "user").split(",") if role.strip()]  # 未分配角色的用户
+    ROLE_CACHE_TTL = float(os.getenv("ROLE_CACHE_TTL", "60"))  # 角色编译表有效期(秒)，其他进程修改角色依赖它兜底
+
+    # 异步认证模式：注册/登录/登出使用async视图和异步数据库驱动 (aiomysql，测试用aiosqlite)，黑名单回查也走异步连接池
+    AUTH_ASYNC_ENABLED = os.getenv("AUTH_ASYNC_ENABLED", "false").lower() == "true"
+    ASYNC_DATABASE_URI = os.getenv("ASYNC_DATABASE_URI")  # 未设置时由 SQLALCHEMY_DATABASE_URI 自动改写驱动名得到
+    ASYNC_ENGINE_OPTIONS = {
+        "pool_size": int(os.getenv("ASYNC_DB_POOL_SIZE", "20")),  # 异步连接池大小，决定同时进行的数据库操作数
+        "max_overflow": int(os.getenv("ASYNC_DB_MAX_OVERFLOW", "10")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": True,
+    }
+
+    # 生产部署预热配置 (见 backend/gunicorn.conf.py)：Worker在开始接收流量之前建立连接、执行热点查询并加载缓存
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    WARMUP_PRINCIPALS = int(os.getenv("WARMUP_PRINCIPALS", "1000"))  # 预先载入Principal缓存的最近注册 (ID最大) 的活跃用户数，0表示不预热
 
 
 class DevelopmentConfig(Config):
@@ -48,8 +203,14 @@ class TestingConfig(Config):
     """测试环境特定配置"""
     TESTING = True  # 开启Flask的测试模式
     SQLALCHEMY_DATABASE_URI = os.getenv('TEST_DATABASE_URI', 'sqlite:///:memory:')  # 测试通常使用内存中的SQLite数据库
+    SQLALCHEMY_ENGINE_OPTIONS = {}  # 内存SQLite使用单连接池，不支持pool_size等参数
+    SQLALCHEMY_REPLICA_URIS = []
+    ASYNC_ENGINE_OPTIONS = {}
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(seconds=5)  # 测试时Token有效期设置得很短，方便测试过期逻辑
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(seconds=10)
+    REVOCATION_INDEX_CAPACITY = 10000  # 测试数据量很小，无需预分配大容量的布隆过滤器
+    HASHING_POOL_WORKERS = 0  # 测试时在请求线程内直接计算哈希，避免创建子进程
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING")  # 测试时只输出警告及以上级别，减少噪音
     # 在测试配置中，通常会禁用CSRF保护（如果使用了Flask-WTF等）
 
 
@@ -57,6 +218,8 @@ class ProductionConfig(Config):
     """生产环境特定配置"""
     DEBUG = False  # 生产环境必须关闭调试模式
     SQLALCHEMY_ECHO = False  # 生产环境不打印SQL语句
+    LOG_FILE = os.getenv("LOG_FILE", "logs/production.log")  # 生产环境默认写入轮转的日志文件
+    LOG_JSON = os.getenv("LOG_JSON", "true").lower() == "true"  # 生产环境默认使用JSON Lines，便于日志平台采集
 
     # 生产数据库凭证必须通过环境变量配置，不应有默认值或硬编码
     DB_USER = os.getenv("PROD_DB_USER")
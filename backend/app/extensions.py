@@ -1,56 +1,118 @@
 # backend/app/extensions.py
+import random
+import sys
+
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from loguru import logger
 
+from .services.async_db import AsyncDatabase
+from .services.compression import ResponseCompressor
+from .services.db_routing import ReplicaRouter, RoutingSession
+from .services.metrics import RequestMetrics
+from .services.password_hasher import PasswordHasher
+from .services.permissions import RolePermissionCache
+from .services.principal_cache import PrincipalCache
+from .services.query_profiler import QueryProfiler
+from .services.rate_limiter import RateLimiter
+from .services.revocation_index import RevocationIndex
+from .services.revocation_writer import RevocationWriter
+from .services.session_revocation import SessionRevocationMap
+from .services.shared_revocations import SharedRevocationTable
+from .services.signing_keys import SigningKeyRing
+from .services.username_filter import UsernameFilter
+
 # 1. 创建扩展实例，但不进行初始化 (不传入app参数)
 # 这些实例将在应用工厂函数中通过调用各自的 .init_app(app) 方法进行初始化。
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})  # 支持读写分离的Session，见 services/db_routing.py
+replica_router = ReplicaRouter()  # 只读副本管理 (轮询 + 探活故障转移)
+async_db = AsyncDatabase()  # 可选的异步数据库访问 (AUTH_ASYNC_ENABLED=True 时供async认证视图使用)
 jwt = JWTManager()
 cors = CORS()  # 初始化CORS实例，后续在工厂中用init_app进一步配置
+revocation_index = RevocationIndex()  # 进程内Token吊销索引 (布隆过滤器 + LRU)，位于黑名单查询之前
+shared_revocations = SharedRevocationTable()  # 同一主机所有Worker共享的内存映射吊销表 (无锁读取)
+revocation_writer = RevocationWriter()  # 吊销记录的写后缓冲 (REVOCATION_WRITE_BEHIND=True 时批量写库)
+password_hasher = PasswordHasher()  # 密码哈希执行器 (独立进程池 + 在途任务上限)
+rate_limiter = RateLimiter()  # 登录限流 (按用户名和客户端地址)，在哈希计算前拒绝超限请求
+principal_cache = PrincipalCache()  # 用户名 -> Principal 缓存 (TTL + LRU)，减少认证路径上的User查询
+role_permissions = RolePermissionCache()  # 角色名 -> 权限位掩码 编译表，签发Token时编译 "perms" 声明
+request_metrics = RequestMetrics()  # 请求耗时与各阶段耗时统计，通过/metrics以Prometheus格式输出
+compressor = ResponseCompressor()  # 较大的文本响应按gzip压缩 (客户端支持时)
+query_profiler = QueryProfiler()  # SQL查询分析器 (语句指纹统计、慢查询EXPLAIN、每请求查询预算)
+session_revocations = SessionRevocationMap()  # 用户名 -> 会话吊销时间戳，实现O(1)的"注销该用户所有会话"
+username_filter = UsernameFilter()  # 已占用用户名的布隆过滤器，用户名可用性检查大多无需访问数据库
+signing_keys = SigningKeyRing()  # JWT非对称签名密钥环 (RS256/EdDSA + kid)，并生成JWKS文档
+
+
+# 2. 定义通用的日志配置函数
+def _build_sampling_filter(sample_rates: dict[str, float]):
+    """
+    构造按比例采样的日志过滤器。
+    采样键优先取 logger.bind(sample="...") 绑定的键 (例如 "auth.login_success")，否则取日志级别名 (例如 "INFO")。
+    未配置采样率的日志全部保留。
+    """
+    if not sample_rates:
+        return None
+
+    def sampling_filter(record) -> bool:
+        rate = sample_rates.get(record["extra"].get("sample") or record["level"].name)
+        return rate is None or rate >= 1.0 or random.random() < rate
+
+    return sampling_filter
 
 
-# 2. (可选) 定义一个通用的日志配置函数
 def configure_logging(current_app_config):
     """
     根据应用配置来设置Loguru日志。
+    - 低于LOG_LEVEL的日志在调用处就被丢弃，不会进行消息格式化
+      (调用时请使用 logger.info("用户 '{}' 登录成功", username) 这样的参数形式，而不是f-string)。
+    - LOG_SAMPLE_RATES 可以对高频日志 (如登录成功) 按比例采样。
+    - 配置了LOG_FILE时写入按大小轮转、压缩归档的文件，可选JSON Lines格式，并使用缓冲区批量写入。
     :param current_app_config: 当前加载的Flask配置对象 (例如 DevelopmentConfig实例)
     """
     # 安全地获取DEBUG标志，如果不存在则默认为False
     is_debug = current_app_config.get('DEBUG', False)
-    log_level = "DEBUG" if is_debug else "INFO"
-    
+    log_level = current_app_config.get('LOG_LEVEL') or ("DEBUG" if is_debug else "INFO")
+    sampling_filter = _build_sampling_filter(current_app_config.get('LOG_SAMPLE_RATES') or {})
+
     # 移除旧的日志处理器，以防重复添加 (尤其是在热重载时)
     logger.remove()
 
-    # 为开发环境添加彩色控制台输出
-    if is_debug or current_app_config.get('TESTING', False):
+    if current_app_config.get('LOG_TO_CONSOLE', True):
+        if is_debug or current_app_config.get('TESTING', False):
+            # 开发环境: 彩色控制台输出
+            console_format = ("<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
+                              "<level>{level: <8}</level> | "
+                              "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>")
+        else:
+            console_format = "{time} {level} {message}"
         logger.add(
-            lambda _: None,  # 空sink，因为我们只想格式化输出到stderr
-            format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
-                   "<level>{level: <8}</level> | "
-                   "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
+            sys.stderr,
+            format=console_format,
             level=log_level,
-            colorize=True,
-            enqueue=True  # 异步写入，提高性能
+            filter=sampling_filter,
+            colorize=is_debug,
+            backtrace=is_debug,
+            diagnose=is_debug,  # diagnose会在异常中输出变量值，生产环境关闭以免泄露敏感信息并节省开销
         )
-    else:
-        # 生产环境的日志配置 (可以配置输出到文件、syslog、ELK等)
-        # logger.add(
-        #     "logs/production.log",
-        #     rotation="10 MB", # 每个日志文件最大10MB
-        #     retention="1 week", # 日志保留1周
-        #     compression="zip", # 压缩旧日志
-        #     level="INFO",
-        #     format="{time} {level} {message}",
-        #     enqueue=True
-        # )
-        # 为简洁，生产环境也暂时输出到控制台，但格式不同
+
+    log_file = current_app_config.get('LOG_FILE')
+    if log_file:
+        # 生产环境的文件日志：轮转 + 压缩归档 + (可选)JSON Lines；
+        # enqueue=True 由后台线程写文件，buffering 让多条日志合并为一次系统调用写入
         logger.add(
-            lambda _: None,
-            format="{time} {level} {message}",
-            level="INFO",
-            enqueue=True
+            log_file,
+            format="{time} {level} {name}:{function}:{line} {message}",
+            level=log_level,
+            filter=sampling_filter,
+            rotation=current_app_config.get('LOG_ROTATION', "50 MB"),
+            retention=current_app_config.get('LOG_RETENTION', "14 days"),
+            compression=current_app_config.get('LOG_COMPRESSION', "gz"),
+            serialize=current_app_config.get('LOG_JSON', False),
+            enqueue=current_app_config.get('LOG_ENQUEUE', True),
+            buffering=current_app_config.get('LOG_BUFFER_SIZE', 64 * 1024),
+            backtrace=False,
+            diagnose=False,
         )
-    logger.info(f"Loguru日志已配置，级别: {log_level}")
+    logger.info("Loguru日志已配置，级别: {}，文件: {}", log_level, log_file or "无")
@@ -0,0 +1,59 @@
+# backend/app/models/role_model.py
+from datetime import datetime, timezone
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Mapped, Session, mapped_column, object_session
+
+from ..extensions import db, role_permissions
+from ..services.db_routing import replica_reads
+
+# 用户与角色的多对多关联表
+user_roles = db.Table(
+    "user_roles",
+    db.Column("user_id", db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    db.Column("role_id", db.ForeignKey("roles.id", ondelete="CASCADE"), primary_key=True, index=True),
+)
+
+
+class Role(db.Model):
+    __tablename__ = 'roles'
+
+    id: Mapped[int] = mapped_column(primary_key=True, doc="角色唯一ID")
+    name: Mapped[str] = mapped_column(db.String(50), unique=True, nullable=False, doc="角色名，例如 user、admin")
+    # 该角色拥有的权限位掩码 (services/permissions.py 中 Permission 各位按位或)
+    permissions: Mapped[int] = mapped_column(db.BigInteger, default=0, server_default="0", nullable=False,
+                                             doc="权限位掩码")
+    description: Mapped[str] = mapped_column(db.String(255), nullable=True, doc="角色说明")
+    updated_at: Mapped[datetime] = mapped_column(nullable=False, default=lambda: datetime.now(timezone.utc),
+                                                 onupdate=lambda: datetime.now(timezone.utc), doc="记录最后更新时间")
+
+    def __repr__(self) -> str:
+        return f"<Role name='{self.name}', permissions={self.permissions}>"
+
+
+def role_names_for_user(user_id: int) -> list[str]:
+    """查询用户被分配的角色名 (一条按 user_roles 主键的查询)，只在签发Token时调用。"""
+    with replica_reads():
+        return list(db.session.execute(
+            select(Role.name).join(user_roles, user_roles.c.role_id == Role.id).where(user_roles.c.user_id == user_id)
+        ).scalars())
+
+
+# --- 角色编译表失效 ---
+# 角色被新增、修改或删除时立即让本进程的编译表失效；事务提交后再失效一次，防止提交前被重新加载了旧数据。
+def _invalidate_role_permissions(mapper, connection, target: Role) -> None:
+    role_permissions.invalidate()
+    session = object_session(target)
+    if session is not None:
+        session.info["role_permissions_invalidate"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_role_permissions_after_commit(session: Session) -> None:
+    if session.info.pop("role_permissions_invalidate", False):
+        role_permissions.invalidate()
+
+
+event.listen(Role, "after_insert", _invalidate_role_permissions)
+event.listen(Role, "after_update", _invalidate_role_permissions)
+event.listen(Role, "after_delete", _invalidate_role_permissions)
@@ -1,7 +1,9 @@
 # backend/app/models/token_model.py
+from sqlalchemy import select
 from sqlalchemy.orm import Mapped, mapped_column
 
 from ..extensions import db
+from ..services.sql_dialects import insert_ignore
 from datetime import datetime, timezone
 
 
@@ -9,7 +11,9 @@ class TokenBlocklist(db.Model):
     __tablename__ = 'token_blocklist'  # 数据库中的表名
 
     id: Mapped[int] = mapped_column(primary_key=True, doc="令牌唯一ID")
-    jti: Mapped[str] = mapped_column(db.String(36), nullable=False, index=True, doc="JWT的唯一标识符")
+    # JTI唯一：重复登出由唯一约束去重，无需先查询。旧表需先删除重复记录再执行:
+    # ALTER TABLE token_blocklist DROP INDEX ix_token_blocklist_jti, ADD UNIQUE INDEX ix_token_blocklist_jti (jti)
+    jti: Mapped[str] = mapped_column(db.String(36), nullable=False, unique=True, index=True, doc="JWT的唯一标识符")
     token_type: Mapped[str] = mapped_column(db.String(10), nullable=False, doc="被吊销Token的类型 (access或refresh)")
     user_identity: Mapped[str] = mapped_column(db.String(120), nullable=False, doc="与此JTI关联的用户身份")
     revoked_at: Mapped[datetime] = mapped_column(db.DateTime, nullable=True,
@@ -17,6 +21,60 @@ class TokenBlocklist(db.Model):
                                                  default=lambda: datetime.now(timezone.utc),
 
                                                  )
+    # Token自身的过期时间(exp)。过期的Token即使不在黑名单中也会被拒绝，因此过期后的记录可以安全删除。
+    # 允许为空以兼容旧数据；旧表需手动执行: ALTER TABLE token_blocklist ADD COLUMN expires_at DATETIME NULL, ADD INDEX ...
+    expires_at: Mapped[datetime] = mapped_column(db.DateTime, nullable=True, index=True,
+                                                 doc="被吊销Token的过期时间，过期后该记录可被清理")
+
+    @classmethod
+    def revoke_many(cls, rows: list[dict]) -> int:
+        """
+        用一条 INSERT ... IGNORE 写入一批吊销记录 (一次往返)，已存在的JTI由唯一约束跳过，并发重复登出不会报错。
+        :param rows: 每项包含 jti、token_type、user_identity、expires_at。
+        :return: 实际新写入的行数 (0表示这些JTI此前均已吊销)。
+        """
+        if not rows:
+            return 0
+        statement = insert_ignore(cls.__table__, db.engine.dialect.name)
+        result = db.session.connection().execute(statement, rows)
+        db.session.commit()
+        return max(result.rowcount, 0)
+
+    @classmethod
+    def revoked_among(cls, jtis: list[str]) -> set[str]:
+        """
+        用一条 SELECT jti ... WHERE jti IN (...) 找出一批JTI中已被吊销的部分 (走jti唯一索引)，代替逐个查询。
+        :return: 已吊销的JTI集合。
+        """
+        if not jtis:
+            return set()
+        return set(db.session.execute(select(cls.jti).where(cls.jti.in_(set(jtis)))).scalars())
+
+    @classmethod
+    def prune_expired(cls, batch_size: int = 1000, max_batches: int | None = None) -> int:
+        """
+        分批删除已过期的黑名单记录。
+        每批先按expires_at索引选出最多batch_size个ID再按主键删除，单个事务短小，避免长时间锁表。
+        :param batch_size: 每批删除的最大行数。
+        :param max_batches: (可选) 最多执行的批次数，None表示删到没有过期记录为止。
+        :return: 删除的总行数。
+        """
+        now = datetime.now(timezone.utc)
+        total_deleted = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            expired_ids = db.session.execute(
+                select(cls.id).where(cls.expires_at < now).limit(batch_size)
+            ).scalars().all()
+            if not expired_ids:
+                break
+            db.session.execute(db.delete(cls).where(cls.id.in_(expired_ids)))
+            db.session.commit()
+            total_deleted += len(expired_ids)
+            batches += 1
+            if len(expired_ids) < batch_size:
+                break
+        return total_deleted
 
     def __repr__(self) -> str:
         return f"<TokenBlocklist jti='{self.jti}', user='{self.user_identity}'>"
@@ -1,8 +1,10 @@
 # backend/app/models/user_model.py
-from sqlalchemy.orm import Mapped, mapped_column
-from ..extensions import db  # 导入db实例
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Mapped, Session, mapped_column, object_session
+from ..extensions import db, password_hasher, principal_cache, username_filter  # 导入db实例、密码哈希执行器、Principal缓存和用户名过滤器
+from ..services.db_routing import replica_reads
+from ..services.principal_cache import Principal
 from datetime import datetime, timezone
-from werkzeug.security import generate_password_hash, check_password_hash  # 用于密码操作
 
 
 class User(db.Model):
@@ -19,14 +21,22 @@ class User(db.Model):
     updated_at: Mapped[datetime] = mapped_column(nullable=False, default=lambda: datetime.now(timezone.utc),
                                                  onupdate=lambda: datetime.now(timezone.utc), doc="记录最后更新时间")
     is_active: Mapped[bool] = mapped_column(default=True, nullable=False, doc="用户是否激活状态")
+    # 安全版本号：禁用账户或修改密码时自动递增 (见下方before_update事件)，登录时写入Token的 "ver" 声明。
+    # Token中的版本与数据库不一致即说明签发后账户安全状态已变化，该Token应被视为无效。
+    security_version: Mapped[int] = mapped_column(default=1, server_default="1", nullable=False,
+                                                  doc="用户安全版本号")
+    # 会话吊销时间戳：签发时间早于此时间的所有Token均被拒绝 ("注销所有设备"/管理员强制下线)
+    tokens_valid_after: Mapped[datetime] = mapped_column(db.DateTime, nullable=True, index=True,
+                                                         doc="此时间之前签发的Token全部失效")
 
     # (可选) 定义模型方法
     def set_password(self, password: str) -> None:
         """
         设置用户密码，自动进行哈希处理。
+        哈希计算交由密码哈希执行器完成，繁忙时抛出 HashingOverloaded。
         :param password: 明文密码字符串。
         """
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password: str) -> bool:
         """
@@ -34,10 +44,100 @@ class User(db.Model):
         :param password: 需要验证的明文密码。
         :return: 如果密码匹配则为True，否则为False。
         """
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def upgrade_password_hash(self, password: str) -> bool:
+        """
+        登录验证成功后调用：如果存储的哈希与当前哈希策略不一致，则用明文密码按新策略重新哈希。
+        使用条件UPDATE直接写库 (只在哈希仍是旧值时更新)，不经过ORM事件：重新哈希不是修改密码，不应递增安全版本号。
+        :return: 是否进行了重新哈希。
+        """
+        if not password_hasher.needs_rehash(self.password_hash):
+            return False
+        old_hash, new_hash = self.password_hash, password_hasher.hash(password)
+        result = db.session.execute(
+            db.update(User).where(User.id == self.id, User.password_hash == old_hash).values(password_hash=new_hash)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount == 1
 
 
     def __repr__(self) -> str:
         # 对象的字符串表示，方便调试
         return f"<User id={self.id}, username='{self.username}'>"
 
+    def to_principal(self) -> Principal:
+        """转换为认证路径使用的轻量Principal。"""
+        return Principal(id=self.id, username=self.username, is_active=self.is_active,
+                         security_version=self.security_version)
+
+
+# 认证路径所需的列 (顺序与Principal字段一致)。按列查询得到的是普通Row而不是ORM实体:
+# 不经过identity map和属性状态跟踪，也不传输password_hash、时间戳等用不到的列。
+PRINCIPAL_COLUMNS = (User.id, User.username, User.is_active, User.security_version)
+# 登录还需要校验 (并可能升级) 密码哈希，只有登录会读取password_hash
+LOGIN_COLUMNS = (*PRINCIPAL_COLUMNS, User.password_hash)
+
+
+def load_principal(username: str) -> Principal | None:
+    """按用户名从数据库加载Principal (只选取认证所需的列)，作为principal_cache未命中时的加载函数。"""
+    with replica_reads():
+        row = db.session.execute(
+            db.select(*PRINCIPAL_COLUMNS).where(User.username == username).limit(1)
+        ).first()
+    return Principal(*row) if row else None
+
+
+def load_principals(usernames: list[str]) -> dict[str, Principal]:
+    """按用户名批量加载Principal (一条IN查询，只选取认证所需的列)，作为principal_cache.get_many的加载函数。"""
+    if not usernames:
+        return {}
+    with replica_reads():
+        rows = db.session.execute(db.select(*PRINCIPAL_COLUMNS).where(User.username.in_(set(usernames)))).all()
+    return {row.username: Principal(*row) for row in rows}
+
+
+def username_taken(username: str) -> bool:
+    """
+    用户名是否已被占用。用户名过滤器判定"一定未占用"时不访问数据库，否则只按唯一索引查询id列确认。
+    只用于注册前的快速检查和前端实时校验，最终以插入时的唯一约束为准。
+    """
+    if not username_filter.might_be_taken(username, User):
+        return False
+    with replica_reads():
+        return db.session.execute(db.select(User.id).where(User.username == username).limit(1)).first() is not None
+
+
+# --- 安全版本号维护 ---
+# 修改密码或禁用账户时递增security_version，使此前签发的所有Token在版本校验时失效。
+@event.listens_for(User, "before_update")
+def _bump_security_version(mapper, connection, target: User) -> None:
+    state = inspect(target)
+    password_changed = state.attrs.password_hash.history.has_changes()
+    deactivated = state.attrs.is_active.history.has_changes() and not target.is_active
+    if password_changed or deactivated:
+        target.security_version = (target.security_version or 1) + 1
+
+
+# --- Principal缓存失效 ---
+# User行被更新(如禁用、改名)或删除时，立即让本进程缓存中的对应条目失效；
+# 事务提交后再失效一次，防止提交前被其他请求重新加载了旧数据。
+def _invalidate_principal(mapper, connection, target: User) -> None:
+    usernames = {target.username}
+    usernames.update(inspect(target).attrs.username.history.deleted or ())  # 改名时旧用户名也需要失效
+    for username in usernames:
+        principal_cache.invalidate(username)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("principal_cache_invalidate", set()).update(usernames)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_principals_after_commit(session: Session) -> None:
+    for username in session.info.pop("principal_cache_invalidate", ()):
+        principal_cache.invalidate(username)
+
+
+event.listen(User, "after_update", _invalidate_principal)
+event.listen(User, "after_delete", _invalidate_principal)
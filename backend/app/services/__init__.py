@@ -0,0 +1 @@
+# backend/app/services/__init__.py
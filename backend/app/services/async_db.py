@@ -0,0 +1,156 @@
+# backend/app/services/async_db.py
+import asyncio
+import atexit
+import contextlib
+import contextvars
+import os
+import tempfile
+import threading
+from concurrent.futures import Future
+
+from loguru import logger
+from sqlalchemy.engine import make_url
+
+# 同步驱动 -> 对应的异步驱动
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def async_database_uri(uri: str) -> str:
+    """把同步连接串改写为异步驱动的连接串，例如 mysql+pymysql://... -> mysql+aiomysql://..."""
+    url = make_url(uri)
+    driver = ASYNC_DRIVERS.get(url.drivername)
+    if driver is None:
+        return uri  # 已经是异步驱动 (或无法识别)，原样使用
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def is_memory_sqlite(uri: str) -> bool:
+    """是否为内存SQLite：每个Engine (每个连接池) 各自得到一个独立的空数据库。"""
+    url = make_url(uri)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+class AsyncDatabase:
+    """
+    可选的异步数据库访问 (AUTH_ASYNC_ENABLED=True 时启用)。
+    - 每个Worker进程内运行一个常驻事件循环线程，所有async视图和异步查询都在这个循环上执行，
+      异步Engine的连接池因此可以跨请求复用 (Flask默认为每个请求新建事件循环，连接无法复用)。
+    - 请求线程只负责提交协程并等待结果，等待数据库期间不占用任何连接池以外的资源；
+      大量慢查询可以在同一个事件循环上并发进行，连接数由 ASYNC_DB_POOL_SIZE 控制。
+    - 与密码哈希执行器一样按进程ID检测fork，fork出的Worker会重建自己的事件循环和Engine。
+    """
+
+    def __init__(self):
+        self.enabled: bool = False
+        self.uri: str | None = None
+        self.engine_options: dict = {}
+        self._engine = None
+        self._sessionmaker = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_pid: int | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def prepare_config(config) -> None:
+        """
+        在初始化SQLAlchemy之前调用：测试配置 (TESTING=True) 启用异步模式且使用内存SQLite时，
+        改用一个进程退出时删除的临时文件数据库，让同步和异步Engine连接同一个数据库。
+        """
+        if not (config.get("AUTH_ASYNC_ENABLED") and config.get("TESTING")
+                and is_memory_sqlite(config["SQLALCHEMY_DATABASE_URI"]) and not config.get("ASYNC_DATABASE_URI")):
+            return
+        fd, path = tempfile.mkstemp(prefix="auth_async_test_", suffix=".db")
+        os.close(fd)
+
+        def remove() -> None:
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
+        atexit.register(remove)
+        config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{path}"
+        logger.info("异步模式不能使用内存SQLite，测试数据库改为临时文件: {}", path)
+
+    def init_app(self, app) -> None:
+        self.shutdown()
+        self.enabled = app.config.get("AUTH_ASYNC_ENABLED", False)
+        if not self.enabled:
+            return
+        self.uri = app.config.get("ASYNC_DATABASE_URI") or async_database_uri(app.config["SQLALCHEMY_DATABASE_URI"])
+        if is_memory_sqlite(app.config["SQLALCHEMY_DATABASE_URI"]) or is_memory_sqlite(self.uri):
+            # 同步Engine (Flask-SQLAlchemy) 和异步Engine会各自得到一个空的内存数据库，写入互不可见
+            raise ValueError("异步认证模式 (AUTH_ASYNC_ENABLED=True) 不支持内存SQLite，请改用文件或服务器数据库。")
+        self.engine_options = dict(app.config.get("ASYNC_ENGINE_OPTIONS") or {})
+        # 让Flask把async视图交给常驻事件循环执行，而不是每个请求新建一个事件循环
+        app.async_to_sync = self.async_to_sync
+        logger.info("异步认证模式已启用，异步数据库: {}", make_url(self.uri).render_as_string(hide_password=True))
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop_pid != os.getpid():
+                from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="async-db-loop", daemon=True).start()
+                self._engine = create_async_engine(self.uri, **self.engine_options)
+                self._sessionmaker = async_sessionmaker(self._engine, expire_on_commit=False)
+                self._loop, self._loop_pid = loop, os.getpid()
+            return self._loop
+
+    @property
+    def engine(self):
+        self._ensure_started()
+        return self._engine
+
+    def session(self):
+        """创建一个AsyncSession (在事件循环中使用: `async with async_db.session() as session:`)。"""
+        self._ensure_started()
+        return self._sessionmaker()
+
+    def run(self, func, *args, **kwargs):
+        """
+        在常驻事件循环上执行协程函数并阻塞等待结果。
+        会复制当前线程的上下文变量，协程中可以照常使用 request、current_app、get_jwt() 等。
+        """
+        loop = self._ensure_started()
+        context = contextvars.copy_context()
+        result: Future = Future()
+
+        def done(task: asyncio.Task) -> None:
+            if task.cancelled():
+                result.cancel()
+            elif task.exception() is not None:
+                result.set_exception(task.exception())
+            else:
+                result.set_result(task.result())
+
+        def start() -> None:
+            loop.create_task(func(*args, **kwargs), context=context).add_done_callback(done)
+
+        loop.call_soon_threadsafe(start)
+        return result.result()
+
+    def async_to_sync(self, func):
+        """替换 Flask.async_to_sync，供Flask执行async视图。"""
+        def wrapper(*args, **kwargs):
+            return self.run(func, *args, **kwargs)
+        return wrapper
+
+    async def run_in_executor(self, func, *args):
+        """把阻塞调用 (例如密码哈希) 交给线程池执行，期间事件循环继续处理其他请求。上下文变量 (应用上下文等) 随之传递。"""
+        return await asyncio.to_thread(func, *args)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._loop is not None and self._loop_pid == os.getpid():
+                loop, engine = self._loop, self._engine
+                if engine is not None:
+                    asyncio.run_coroutine_threadsafe(engine.dispose(), loop).result(timeout=5)
+                loop.call_soon_threadsafe(loop.stop)
+            self._loop = self._loop_pid = self._engine = self._sessionmaker = None
@@ -0,0 +1,44 @@
+# backend/app/services/blocklist_pruner.py
+import threading
+
+from flask import Flask
+from loguru import logger
+
+
+def prune_blocklist(batch_size: int, max_batches: int | None = None) -> int:
+    """在当前应用上下文中执行一次过期黑名单记录的清理。"""
+    from ..models.token_model import TokenBlocklist
+
+    deleted = TokenBlocklist.prune_expired(batch_size=batch_size, max_batches=max_batches)
+    if deleted:
+        logger.info("已清理 {} 条过期的Token黑名单记录。", deleted)
+    return deleted
+
+
+def start_blocklist_pruner(app: Flask) -> threading.Thread | None:
+    """
+    启动后台守护线程，按 BLOCKLIST_PRUNE_INTERVAL 秒的间隔定期清理过期黑名单记录。
+    间隔为0时不启动 (可改用 `flask prune-blocklist` 命令由cron等外部调度)。
+    """
+    interval: float = app.config.get("BLOCKLIST_PRUNE_INTERVAL", 0)
+    if not interval or interval <= 0:
+        return None
+    batch_size: int = app.config.get("BLOCKLIST_PRUNE_BATCH_SIZE", 1000)
+    max_batches: int | None = app.config.get("BLOCKLIST_PRUNE_MAX_BATCHES")
+    stop_event = threading.Event()
+
+    def run() -> None:
+        while not stop_event.wait(interval):
+            with app.app_context():
+                try:
+                    prune_blocklist(batch_size, max_batches)
+                except Exception as e:
+                    from ..extensions import db
+                    db.session.rollback()
+                    logger.error("后台清理过期黑名单记录失败: {}", e)
+
+    thread = threading.Thread(target=run, name="blocklist-pruner", daemon=True)
+    thread.stop_event = stop_event  # 便于测试或关闭时停止线程
+    thread.start()
+    logger.info("后台黑名单清理任务已启动，间隔 {} 秒，每批 {} 行。", interval, batch_size)
+    return thread
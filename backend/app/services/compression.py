@@ -0,0 +1,49 @@
+# backend/app/services/compression.py
+import gzip
+
+from flask import Flask, Response, request
+
+# 只压缩文本类响应；图片等已压缩的格式再压缩没有收益
+DEFAULT_MIMETYPES = ("application/json", "text/html", "text/plain", "text/css", "application/javascript")
+
+
+class ResponseCompressor:
+    """
+    响应压缩 (COMPRESSION_ENABLED=True 时启用)：客户端接受gzip且响应体不小于 COMPRESSION_MIN_SIZE 字节时压缩。
+    小响应 (例如 /api/me) 压缩后节省的字节很少，反而多花CPU，因此不压缩。
+    压缩后的强ETag改为弱ETag：同一内容的不同编码不能共用强校验器，但If-None-Match按弱比较仍可命中。
+    流式响应 (生成器) 和文件直传响应不压缩：读取完整响应体会把流式输出变成一次性缓冲。
+    """
+
+    def __init__(self):
+        self.enabled: bool = False
+        self.min_size: int = 1024
+        self.level: int = 6
+        self.mimetypes: tuple[str, ...] = DEFAULT_MIMETYPES
+
+    def init_app(self, app: Flask) -> None:
+        self.enabled = app.config.get("COMPRESSION_ENABLED", True)
+        self.min_size = app.config.get("COMPRESSION_MIN_SIZE", 1024)
+        self.level = app.config.get("COMPRESSION_LEVEL", 6)
+        self.mimetypes = tuple(app.config.get("COMPRESSION_MIMETYPES") or DEFAULT_MIMETYPES)
+        if self.enabled:
+            app.after_request(self._after_request)
+
+    def _after_request(self, response: Response) -> Response:
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or response.is_streamed or response.direct_passthrough or request.method == "HEAD"
+                or "Content-Encoding" in response.headers
+                or response.mimetype not in self.mimetypes):
+            return response
+        response.vary.add("Accept-Encoding")
+        if "gzip" not in request.accept_encodings:
+            return response
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+        response.set_data(gzip.compress(data, compresslevel=self.level))
+        response.headers["Content-Encoding"] = "gzip"
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,118 @@
+# backend/app/services/db_routing.py
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import current_app, has_app_context
+from flask_sqlalchemy.session import Session
+from loguru import logger
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+
+# 当前上下文是否处于"只读"区域。只在 replica_reads() 包裹的代码中为True
+_read_only: ContextVar[bool] = ContextVar("replica_read_only", default=False)
+
+
+@contextmanager
+def replica_reads():
+    """
+    将包裹区域内的只读查询路由到只读副本，例如:
+        with replica_reads():
+            user = User.query.filter_by(username=username).first()
+    没有配置副本或副本全部不可用时自动回退到主库。
+    注意副本存在复制延迟：刚写入主库的数据可能短时间内在副本上不可见。
+    """
+    token = _read_only.set(True)
+    try:
+        yield
+    finally:
+        _read_only.reset(token)
+
+
+class RoutingSession(Session):
+    """
+    支持读写分离的Session：处于 replica_reads() 区域且当前不是flush(写入)时，查询发往只读副本；
+    其余情况 (包括所有INSERT/UPDATE/DELETE) 一律发往主库。
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _read_only.get() and not self._flushing and has_app_context():
+            router: ReplicaRouter | None = current_app.extensions.get("replica_router")
+            if router is not None:
+                replica = router.choose()
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class _Replica:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.down_until: float = 0.0
+        self.checked_at: float = 0.0
+
+
+class ReplicaRouter:
+    """
+    管理只读副本的Engine，按轮询选择健康的副本。
+    每个副本每隔 DB_REPLICA_HEALTHCHECK_INTERVAL 秒做一次 SELECT 1 探活，
+    探活失败的副本在 DB_REPLICA_RETRY_INTERVAL 秒内不再被选中 (期间请求回退到其他副本或主库)。
+    """
+
+    def __init__(self):
+        self._replicas: list[_Replica] = []
+        self._cycle = None
+        self._lock = threading.Lock()
+        self.healthcheck_interval: float = 5.0
+        self.retry_interval: float = 30.0
+
+    def init_app(self, app) -> None:
+        self.dispose()
+        uris: list[str] = app.config.get("SQLALCHEMY_REPLICA_URIS") or []
+        engine_options: dict = app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}
+        self.healthcheck_interval = app.config.get("DB_REPLICA_HEALTHCHECK_INTERVAL", 5.0)
+        self.retry_interval = app.config.get("DB_REPLICA_RETRY_INTERVAL", 30.0)
+        self._replicas = [_Replica(create_engine(uri, **engine_options)) for uri in uris]
+        self._cycle = itertools.cycle(self._replicas) if self._replicas else None
+        app.extensions["replica_router"] = self
+        if self._replicas:
+            logger.info("已配置 {} 个只读副本，只读查询将路由到副本。", len(self._replicas))
+
+    @property
+    def engines(self) -> list[Engine]:
+        return [replica.engine for replica in self._replicas]
+
+    def _is_healthy(self, replica: _Replica, now: float) -> bool:
+        if replica.down_until > now:
+            return False
+        if now - replica.checked_at < self.healthcheck_interval:
+            return True
+        replica.checked_at = now
+        try:
+            with replica.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return True
+        except Exception as e:
+            replica.down_until = now + self.retry_interval
+            logger.warning("只读副本 {} 探活失败，{} 秒内不再使用: {}",
+                           replica.engine.url.render_as_string(hide_password=True), self.retry_interval, e)
+            return False
+
+    def choose(self) -> Engine | None:
+        """返回一个健康的副本Engine；没有可用副本时返回None (由调用方回退到主库)。"""
+        if self._cycle is None:
+            return None
+        now = time.monotonic()
+        for _ in range(len(self._replicas)):
+            with self._lock:
+                replica = next(self._cycle)
+            if self._is_healthy(replica, now):
+                return replica.engine
+        return None
+
+    def dispose(self) -> None:
+        """释放所有副本连接 (例如fork之后在子进程中重建连接池前调用)。"""
+        for replica in self._replicas:
+            replica.engine.dispose()
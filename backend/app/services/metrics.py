@@ -0,0 +1,231 @@
+# backend/app/services/metrics.py
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from flask import Flask, Response, g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+
+# 默认直方图桶 (秒)，覆盖从亚毫秒级的缓存命中到数百毫秒的密码哈希
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_NOOP_SPAN = nullcontext()
+
+
+class Histogram:
+    """固定桶的累计直方图，输出格式与Prometheus histogram一致。"""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+    def render(self, name: str, labels: dict[str, str]) -> list[str]:
+        lines = []
+        cumulative = 0
+        for upper, bucket_count in zip(self.buckets, self.counts):
+            cumulative += bucket_count
+            lines.append(f"{name}_bucket{_labels({**labels, 'le': repr(upper)})} {cumulative}")
+        lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {self.count}")
+        lines.append(f"{name}_sum{_labels(labels)} {self.total:.6f}")
+        lines.append(f"{name}_count{_labels(labels)} {self.count}")
+        return lines
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        escaped.append(f'{key}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+def span(stage: str):
+    """
+    记录当前请求中某个阶段的耗时，例如:
+        with span("password_hash"):
+            ...
+    未启用指标或不在请求上下文中时返回空上下文管理器，几乎没有额外开销。
+    """
+    if not has_request_context():
+        return _NOOP_SPAN
+    spans = g.get("_metrics_spans")
+    if spans is None:
+        return _NOOP_SPAN
+    return _timed_span(spans, stage)
+
+
+@contextmanager
+def _timed_span(spans: dict[str, float], stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans[stage] = spans.get(stage, 0.0) + time.perf_counter() - start
+
+
+def add_span_time(stage: str, seconds: float) -> None:
+    """累加一段已测得的耗时到当前请求 (用于无法用with包裹的阶段，例如SQL执行)。"""
+    if has_request_context():
+        spans = g.get("_metrics_spans")
+        if spans is not None:
+            spans[stage] = spans.get(stage, 0.0) + seconds
+
+
+class InstrumentedJSONProvider(DefaultJSONProvider):
+    """记录jsonify序列化耗时的JSON提供者，仅在启用指标时替换默认实现。"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        with span("json_serialize"):
+            return super().dumps(obj, **kwargs)
+
+
+class RequestMetrics:
+    """
+    请求级别的耗时统计：每个端点的延迟直方图，以及JWT校验、黑名单检查、数据库查询、
+    密码哈希、JSON序列化等子阶段的耗时直方图，并通过 /metrics 以Prometheus文本格式输出。
+    METRICS_ENABLED=False 时不注册任何钩子。
+    """
+
+    def __init__(self):
+        self.enabled: bool = False
+        self._lock = threading.Lock()
+        self._latency: dict[tuple[str, str], Histogram] = {}
+        self._stages: dict[tuple[str, str], Histogram] = {}
+        self._requests_total: dict[tuple[str, str, str], int] = {}
+        self._gauge_providers: list = []
+
+    def init_app(self, app: Flask) -> None:
+        self.enabled = app.config.get("METRICS_ENABLED", False)
+        with self._lock:
+            self._latency.clear()
+            self._stages.clear()
+            self._requests_total.clear()
+        self._gauge_providers = []
+        if not self.enabled:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.json = InstrumentedJSONProvider(app)
+        app.add_url_rule(app.config.get("METRICS_PATH", "/metrics"), "metrics", self.metrics_view,
+                         methods=["GET"])
+        self.add_gauge_provider(runtime_gauges)
+
+        from ..extensions import db, jwt, replica_router
+
+        # 所有JWT校验步骤 (解码、类型检查、黑名单检查) 完成后Flask-JWT-Extended会调用此回调
+        @jwt.token_verification_loader
+        def _mark_jwt_verified(jwt_header: dict, jwt_payload: dict) -> bool:
+            started = g.get("_metrics_start")
+            if started is not None:
+                add_span_time("jwt_verify", time.perf_counter() - started)
+            return True
+
+        # 开始时间记在本次执行的上下文上：语句执行出错时不会触发after_cursor_execute，
+        # 记在连接上会留下残留的开始时间，使之后的查询耗时错位
+        def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                context._metrics_query_start = time.perf_counter()
+
+        def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            started = getattr(context, "_metrics_query_start", None)
+            if started is not None:
+                add_span_time("db_query", time.perf_counter() - started)
+
+        with app.app_context():
+            engines = [db.engine, *replica_router.engines]
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    def add_gauge_provider(self, provider) -> None:
+        """注册一个返回 [(指标名, 标签字典, 数值, 说明)] 的函数，在输出/metrics时调用。"""
+        self._gauge_providers.append(provider)
+
+    def _before_request(self) -> None:
+        g._metrics_spans = {}
+        g._metrics_start = time.perf_counter()
+
+    def _after_request(self, response: Response) -> Response:
+        start = g.get("_metrics_start")
+        if start is None or request.endpoint == "metrics":
+            return response
+        elapsed = time.perf_counter() - start
+        endpoint = request.endpoint or "unknown"
+        with self._lock:
+            self._latency.setdefault((endpoint, request.method), Histogram()).observe(elapsed)
+            key = (endpoint, request.method, str(response.status_code))
+            self._requests_total[key] = self._requests_total.get(key, 0) + 1
+            for stage, seconds in g._metrics_spans.items():
+                self._stages.setdefault((endpoint, stage), Histogram()).observe(seconds)
+        return response
+
+    def render(self) -> str:
+        lines = [
+            "# HELP auth_request_duration_seconds 请求处理耗时",
+            "# TYPE auth_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            for (endpoint, method), hist in sorted(self._latency.items()):
+                lines += hist.render("auth_request_duration_seconds", {"endpoint": endpoint, "method": method})
+            lines += ["# HELP auth_request_stage_duration_seconds 请求内各阶段耗时",
+                      "# TYPE auth_request_stage_duration_seconds histogram"]
+            for (endpoint, stage), hist in sorted(self._stages.items()):
+                lines += hist.render("auth_request_stage_duration_seconds", {"endpoint": endpoint, "stage": stage})
+            lines += ["# HELP auth_requests_total 请求总数", "# TYPE auth_requests_total counter"]
+            for (endpoint, method, status), count in sorted(self._requests_total.items()):
+                lines.append(f"auth_requests_total{_labels({'endpoint': endpoint, 'method': method, 'status': status})}"
+                             f" {count}")
+
+        seen_help: set[str] = set()
+        for provider in self._gauge_providers:
+            for name, labels, value, help_text in provider():
+                if name not in seen_help:
+                    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+                    seen_help.add(name)
+                lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def metrics_view(self) -> Response:
+        return Response(self.render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+
+def runtime_gauges() -> list[tuple[str, dict, float, str]]:
+    """数据库连接池、密码哈希队列以及各类进程内缓存的实时状态。"""
+    from ..extensions import db, password_hasher, principal_cache, revocation_index, revocation_writer, shared_revocations
+
+    gauges = []
+    pool = db.engine.pool
+    # 只有QueuePool等带连接数统计的连接池才提供这些方法 (内存SQLite使用的连接池没有)
+    for name, method, help_text in (
+        ("auth_db_pool_size", "size", "连接池大小"),
+        ("auth_db_pool_checked_out", "checkedout", "已借出的连接数"),
+        ("auth_db_pool_checked_in", "checkedin", "池中空闲的连接数"),
+        ("auth_db_pool_overflow", "overflow", "当前溢出连接数"),
+    ):
+        if hasattr(pool, method):
+            gauges.append((name, {}, getattr(pool, method)(), help_text))
+    gauges += [
+        ("auth_hashing_pending", {}, password_hasher.pending, "在途的密码哈希任务数"),
+        ("auth_hashing_max_pending", {}, password_hasher.max_pending, "密码哈希在途任务上限"),
+        ("auth_hashing_workers", {}, password_hasher.workers, "密码哈希进程数"),
+    ]
+    for key, value in principal_cache.stats().items():
+        gauges.append(("auth_principal_cache", {"stat": key}, value, "Principal缓存统计"))
+    gauges.append(("auth_revocation_index_entries", {}, revocation_index.entry_count, "吊销索引中的JTI数量"))
+    if shared_revocations.enabled:
+        gauges.append(("auth_shared_revocation_entries", {}, shared_revocations.entry_count, "主机共享吊销表中的记录数"))
+    gauges.append(("auth_revocation_write_behind_pending", {}, revocation_writer.pending, "尚未写入数据库的吊销记录数"))
+    return gauges
@@ -0,0 +1,119 @@
+# backend/app/services/password_hasher.py
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from loguru import logger
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from .metrics import span
+from .password_policy import HashPolicy
+
+
+class HashingOverloaded(Exception):
+    """哈希任务排队已满时抛出，调用方应快速返回503并附带Retry-After。"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("密码哈希任务繁忙")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """
+    密码哈希执行器。
+    scrypt/pbkdf2 每次需要数十毫秒的纯CPU计算，直接在请求线程中执行会长时间占用GIL，
+    拖慢同一Worker中的其他请求。这里把计算交给独立的进程池完成，请求线程只是等待结果(等待期间释放GIL)，
+    并通过信号量限制同时在途的任务数：超过 HASHING_MAX_PENDING 时立即拒绝，而不是无限排队。
+    HASHING_POOL_WORKERS=0 时在当前线程内直接计算 (适用于测试和命令行工具)。
+    """
+
+    def __init__(self):
+        self.workers: int = 0
+        self.max_pending: int = 0
+        self.retry_after: int = 1
+        self.timeout: float | None = None
+        self.start_method: str = "spawn"
+        self.policy: HashPolicy = HashPolicy()
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_pid: int | None = None
+        self._pool_lock = threading.Lock()
+        self._slots: threading.BoundedSemaphore | None = None
+        self._pending: int = 0
+        self._pending_lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        workers = app.config.get("HASHING_POOL_WORKERS")
+        self.workers = (os.cpu_count() or 1) if workers is None else int(workers)
+        self.max_pending = int(app.config.get("HASHING_MAX_PENDING") or max(self.workers, 1) * 4)
+        self.retry_after = int(app.config.get("HASHING_RETRY_AFTER", 1))
+        self.timeout = app.config.get("HASHING_TIMEOUT", 10.0)
+        self.start_method = app.config.get("HASHING_POOL_START_METHOD", "spawn")
+        self.policy = HashPolicy.from_config(app.config)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self.shutdown()
+
+    @property
+    def pending(self) -> int:
+        """当前在途 (排队中+计算中) 的哈希任务数。"""
+        return self._pending
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # 进程池不能跨fork共享：如果当前进程不是创建进程池的进程 (例如预加载后fork出的Worker)，则重新创建
+        with self._pool_lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                )
+                self._pool_pid = os.getpid()
+                logger.info("密码哈希进程池已创建，进程数: {}", self.workers)
+            return self._pool
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self._pool_pid = None
+
+    def _run(self, func, *args):
+        with span("password_hash"):
+            return self._run_in_pool(func, *args)
+
+    def _run_in_pool(self, func, *args):
+        if self.workers <= 0:
+            return func(*args)
+        if self._slots is not None and not self._slots.acquire(blocking=False):
+            raise HashingOverloaded(self.retry_after)
+        with self._pending_lock:
+            self._pending += 1
+        try:
+            try:
+                return self._get_pool().submit(func, *args).result(timeout=self.timeout)
+            except BrokenProcessPool:
+                # 子进程意外退出时重建进程池并重试一次
+                logger.warning("密码哈希进程池已损坏，正在重建。")
+                self.shutdown()
+                return self._get_pool().submit(func, *args).result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # 等待超时说明进程池已严重积压，同样按过载处理
+            raise HashingOverloaded(self.retry_after)
+        finally:
+            with self._pending_lock:
+                self._pending -= 1
+            if self._slots is not None:
+                self._slots.release()
+
+    def hash(self, password: str) -> str:
+        """按当前哈希策略生成密码哈希。"""
+        return self._run(generate_password_hash, password, self.policy.method_string)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        """校验明文密码与哈希是否匹配。"""
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """已存储的哈希是否与当前策略不一致 (登录成功后应使用明文密码重新哈希)。"""
+        return self.policy.needs_rehash(password_hash)
@@ -0,0 +1,89 @@
+# backend/app/services/password_policy.py
+import statistics
+import time
+from dataclasses import dataclass, replace
+
+from werkzeug.security import generate_password_hash
+
+
+@dataclass(frozen=True)
+class HashPolicy:
+    """
+    密码哈希策略 (算法与代价参数)，对应 werkzeug 的 method 字符串，例如 "scrypt:32768:8:1"、"pbkdf2:sha256:600000"。
+    代价越高越能抵抗离线破解，但每次登录/注册消耗的CPU越多，直接决定登录延迟和单机吞吐。
+    """
+    method: str = "scrypt"
+    scrypt_n: int = 2 ** 15
+    scrypt_r: int = 8
+    scrypt_p: int = 1
+    pbkdf2_hash: str = "sha256"
+    pbkdf2_iterations: int = 1_000_000
+
+    @classmethod
+    def from_config(cls, config) -> "HashPolicy":
+        return cls(
+            method=config.get("PASSWORD_HASH_METHOD", "scrypt"),
+            scrypt_n=int(config.get("PASSWORD_SCRYPT_N", 2 ** 15)),
+            scrypt_r=int(config.get("PASSWORD_SCRYPT_R", 8)),
+            scrypt_p=int(config.get("PASSWORD_SCRYPT_P", 1)),
+            pbkdf2_iterations=int(config.get("PASSWORD_PBKDF2_ITERATIONS", 1_000_000)),
+        )
+
+    @property
+    def method_string(self) -> str:
+        """传给 generate_password_hash 的method参数，同时也是生成的哈希串中 "$" 之前的部分。"""
+        if self.method == "scrypt":
+            return f"scrypt:{self.scrypt_n}:{self.scrypt_r}:{self.scrypt_p}"
+        if self.method == "pbkdf2":
+            return f"pbkdf2:{self.pbkdf2_hash}:{self.pbkdf2_iterations}"
+        raise ValueError(f"不支持的密码哈希算法: {self.method}")
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """已存储的哈希是否使用了与当前策略不同的算法或参数。"""
+        return password_hash.split("$", 1)[0] != self.method_string
+
+    def to_env(self) -> dict[str, str]:
+        """转换为可写入 .env 的配置项。"""
+        if self.method == "scrypt":
+            return {"PASSWORD_HASH_METHOD": "scrypt", "PASSWORD_SCRYPT_N": str(self.scrypt_n),
+                    "PASSWORD_SCRYPT_R": str(self.scrypt_r), "PASSWORD_SCRYPT_P": str(self.scrypt_p)}
+        return {"PASSWORD_HASH_METHOD": "pbkdf2", "PASSWORD_PBKDF2_ITERATIONS": str(self.pbkdf2_iterations)}
+
+
+def measure(policy: HashPolicy, samples: int = 5) -> float:
+    """测量当前机器上按该策略计算一次哈希的耗时中位数 (毫秒)。"""
+    method = policy.method_string
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        generate_password_hash("calibration-password", method=method)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, method: str = "scrypt", samples: int = 5,
+              min_scrypt_n: int = 2 ** 14, min_pbkdf2_iterations: int = 600_000) -> tuple[HashPolicy, float]:
+    """
+    为目标延迟选择哈希参数：在不超过 target_ms 的前提下取代价最高的参数 (但不低于安全下限)。
+    - scrypt: 固定 r=8、p=1，N 按2的幂逐级翻倍 (N 同时决定内存占用: 约 128*N*r 字节)。
+    - pbkdf2: 耗时与迭代次数成正比，先测一个基准点再按比例换算并复核。
+    :return: (策略, 该策略实测的耗时中位数毫秒)
+    """
+    if method == "scrypt":
+        best = HashPolicy(method="scrypt", scrypt_n=min_scrypt_n)
+        best_ms = measure(best, samples)
+        candidate = replace(best, scrypt_n=best.scrypt_n * 2)
+        while best_ms < target_ms and candidate.scrypt_n <= 2 ** 20:
+            candidate_ms = measure(candidate, samples)
+            if candidate_ms > target_ms:
+                break
+            best, best_ms = candidate, candidate_ms
+            candidate = replace(candidate, scrypt_n=candidate.scrypt_n * 2)
+        return best, best_ms
+    if method == "pbkdf2":
+        probe = HashPolicy(method="pbkdf2", pbkdf2_iterations=100_000)
+        per_iteration_ms = measure(probe, samples) / probe.pbkdf2_iterations
+        iterations = int(target_ms / per_iteration_ms) // 10_000 * 10_000
+        policy = replace(probe, pbkdf2_iterations=max(iterations, min_pbkdf2_iterations))
+        return policy, measure(policy, samples)
+    raise ValueError(f"不支持的密码哈希算法: {method}")
@@ -0,0 +1,123 @@
+# backend/app/services/permissions.py
+import threading
+import time
+from enum import IntFlag
+from functools import reduce, wraps
+
+from flask import current_app, jsonify
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from loguru import logger
+from sqlalchemy import select
+
+from .db_routing import replica_reads
+from .query_profiler import maintenance_queries
+
+
+class Permission(IntFlag):
+    """
+    权限位定义。每个权限占一个二进制位，用户全部角色的权限按位或编译为Token中的 "perms" 声明。
+    只能追加新的位，不能修改已有位的含义 (已签发的Token中保存的是位值)。
+    """
+    PROFILE_READ = 1 << 0  # 读取自己的资料
+    SESSIONS_REVOKE = 1 << 1  # 注销自己的所有会话
+    USERS_READ = 1 << 2  # 查看其他用户
+    USERS_MANAGE = 1 << 3  # 禁用/修改其他用户
+    ROLES_MANAGE = 1 << 4  # 管理角色和权限
+
+
+ALL_PERMISSIONS = reduce(lambda a, b: a | b, Permission)
+
+# 内置角色，数据库roles表中的同名角色会覆盖这里的定义
+BUILTIN_ROLES: dict[str, int] = {
+    "user": Permission.PROFILE_READ | Permission.SESSIONS_REVOKE,
+    "admin": ALL_PERMISSIONS,
+}
+
+
+class RolePermissionCache:
+    """
+    进程内的 角色名 -> 权限位掩码 编译表，只在签发Token时使用:
+    - 整张roles表一次性加载 (角色数量很少)，之后编译用户权限只是内存中的按位或；
+    - 角色被修改时由SQLAlchemy事件显式失效 (见 role_model.py)，其他进程中的修改依赖TTL兜底。
+    受保护端点只对Token中的 "perms" 声明做位运算，不访问数据库。
+    """
+
+    def __init__(self):
+        self.ttl: float = 60.0
+        self.default_roles: list[str] = ["user"]
+        self._masks: dict[str, int] | None = None
+        self._loaded_at: float = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        self.ttl = app.config.get("ROLE_CACHE_TTL", 60.0)
+        self.default_roles = list(app.config.get("DEFAULT_ROLES") or ["user"])
+        self.invalidate()
+
+    @property
+    def stale(self) -> bool:
+        return self._masks is None or time.monotonic() - self._loaded_at >= self.ttl
+
+    def reload(self, model) -> dict[str, int]:
+        """
+        从roles表加载全部角色的权限位掩码 (与内置角色合并)。
+        与吊销索引同步一样按TTL周期执行，不计入触发它的请求的查询预算。
+        """
+        from ..extensions import db
+
+        with replica_reads(), maintenance_queries():
+            rows = db.session.execute(select(model.name, model.permissions)).all()
+        masks = dict(BUILTIN_ROLES)
+        masks.update((name, permissions) for name, permissions in rows)
+        with self._lock:
+            self._masks, self._loaded_at = masks, time.monotonic()
+        return masks
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._masks = None
+
+    def compile(self, role_names: list[str], model) -> int:
+        """把角色列表编译为权限位掩码。未知角色不授予任何权限。"""
+        masks = self._masks
+        if masks is None or self.stale:
+            masks = self.reload(model)
+        return reduce(lambda mask, name: mask | masks.get(name, 0), role_names, 0)
+
+    def token_claims(self, user, role_names: list[str], model) -> dict:
+        """
+        签发Token时附加的声明: 角色、编译后的权限位掩码、用户ID和安全版本号。
+        用户没有分配任何角色时使用 DEFAULT_ROLES。
+        """
+        roles = list(role_names) or self.default_roles
+        return {"roles": roles, "perms": self.compile(roles, model), "uid": user.id, "ver": user.security_version}
+
+
+def require_permissions(*permissions: Permission):
+    """
+    要求当前Access Token具备全部指定权限的装饰器 (包含 jwt_required 的校验)，例如:
+        @require_permissions(Permission.USERS_MANAGE)
+    只对Token中的 "perms" 声明做一次按位与，不访问数据库；
+    没有 "perms" 声明的旧Token按其 "roles" 声明通过进程内编译表换算。
+    """
+    required = reduce(lambda a, b: a | b, permissions, 0)
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request()
+            claims = get_jwt()
+            granted = claims.get("perms")
+            if granted is None:
+                from ..extensions import role_permissions
+                from ..models.role_model import Role
+                granted = role_permissions.compile(claims.get("roles") or [], Role)
+            if granted & required != required:
+                logger.warning("用户 '{}' 缺少权限 {!r}，拒绝访问 {}。", claims.get("sub"),
+                               Permission(required & ~granted), fn.__name__)
+                return jsonify(message="权限不足。"), 403
+            return current_app.ensure_sync(fn)(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,116 @@
+# backend/app/services/principal_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, NamedTuple
+
+
+class Principal(NamedTuple):
+    """认证路径所需的最小用户信息，不包含密码哈希等敏感字段。"""
+    id: int
+    username: str
+    is_active: bool
+    security_version: int = 1  # 安全版本号，禁用账户或修改密码时递增，签发Token时写入 "ver" 声明
+
+
+class PrincipalCache:
+    """
+    进程内的 用户名 -> Principal 缓存，带TTL和容量上限 (LRU淘汰)。
+    User行被更新或删除时通过SQLAlchemy事件显式失效 (见 user_model.py)；
+    其他进程中的修改无法感知，依赖TTL兜底，因此TTL不宜设置过长。
+    """
+
+    def __init__(self):
+        self.enabled: bool = True
+        self.ttl: float = 60.0
+        self.maxsize: int = 10000
+        self._entries: OrderedDict[str, tuple[float, Principal]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.invalidations: int = 0
+
+    def init_app(self, app) -> None:
+        self.enabled = app.config.get("PRINCIPAL_CACHE_ENABLED", True)
+        self.ttl = app.config.get("PRINCIPAL_CACHE_TTL", 60.0)
+        self.maxsize = app.config.get("PRINCIPAL_CACHE_MAXSIZE", 10000)
+        self.clear()
+
+    def get(self, identity: str, loader: Callable[[str], Principal | None]) -> Principal | None:
+        """
+        获取identity对应的Principal，未命中或已过期时调用loader从数据库加载。
+        不存在的用户不会被缓存，避免新注册用户需要额外失效。
+        """
+        if not self.enabled:
+            return loader(identity)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(identity)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(identity)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        principal = loader(identity)
+        if principal is not None:
+            self.put(principal)
+        return principal
+
+    def get_many(self, identities: list[str],
+                 loader: Callable[[list[str]], dict[str, Principal]]) -> dict[str, Principal]:
+        """批量版本的get：未命中的identity一次性交给loader加载 (例如一条IN查询)，不存在的用户不出现在结果中。"""
+        if not self.enabled:
+            return loader(list(identities))
+        now = time.monotonic()
+        found: dict[str, Principal] = {}
+        missing: list[str] = []
+        with self._lock:
+            for identity in dict.fromkeys(identities):
+                entry = self._entries.get(identity)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(identity)
+                    self.hits += 1
+                    found[identity] = entry[1]
+                else:
+                    self.misses += 1
+                    missing.append(identity)
+        if missing:
+            loaded = loader(missing)
+            for principal in loaded.values():
+                self.put(principal)
+            found.update(loaded)
+        return found
+
+    def put(self, principal: Principal) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[principal.username] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(principal.username)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, identity: str) -> None:
+        with self._lock:
+            if self._entries.pop(identity, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> dict:
+        """返回缓存命中统计，便于观察缓存效果。"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
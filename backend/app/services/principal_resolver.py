@@ -0,0 +1,44 @@
+# backend/app/services/principal_resolver.py
+from flask import current_app
+
+from .principal_cache import Principal
+
+# 受保护视图获取当前用户的方式 (AUTH_PRINCIPAL_MODE)：
+# - "version"  : 通过Principal缓存加载用户，并校验Token中的 "ver" 声明与当前安全版本号一致 (默认)
+# - "stateless": 完全基于Token声明构造Principal，不访问数据库；吊销只依赖黑名单与Token有效期
+PRINCIPAL_MODE_VERSION = "version"
+PRINCIPAL_MODE_STATELESS = "stateless"
+
+
+def principal_from_claims(claims: dict) -> Principal:
+    """仅根据JWT声明构造Principal (无数据库访问)。"""
+    return Principal(
+        id=claims.get("uid", 0),
+        username=claims["sub"],
+        is_active=True,  # 禁用账户会递增版本号，stateless模式下由Token短有效期兜底
+        security_version=claims.get("ver", 1),
+    )
+
+
+def resolve_principal(claims: dict, force_check: bool = False) -> tuple[Principal | None, str | None]:
+    """
+    根据当前Token的声明解析Principal。
+    :param claims: get_jwt() 返回的声明字典。
+    :param force_check: 为True时无论配置如何都执行版本校验 (例如刷新Token时)。
+    :return: (principal, 失败原因)。成功时原因为None；失败原因为 "not_found" 或 "stale"。
+    """
+    mode = current_app.config.get("AUTH_PRINCIPAL_MODE", PRINCIPAL_MODE_VERSION)
+    if mode == PRINCIPAL_MODE_STATELESS and not force_check:
+        return principal_from_claims(claims), None
+
+    from ..extensions import principal_cache
+    from ..models.user_model import load_principal
+
+    principal = principal_cache.get(claims["sub"], load_principal)
+    if principal is None:
+        return None, "not_found"
+    token_version = claims.get("ver")
+    # 没有 "ver" 声明的旧Token只校验账户状态，版本号不一致或账户已禁用均视为失效
+    if not principal.is_active or (token_version is not None and token_version != principal.security_version):
+        return None, "stale"
+    return principal, None
@@ -0,0 +1,182 @@
+# backend/app/services/query_profiler.py
+import hashlib
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import Flask, Response, g, has_request_context, request
+from loguru import logger
+from sqlalchemy import event
+
+# 为True时当前执行的查询属于后台维护 (吊销索引/会话时间戳等的增量同步)，不计入请求的查询预算
+_maintenance: ContextVar[bool] = ContextVar("query_profiler_maintenance", default=False)
+
+_WHITESPACE = re.compile(r"\s+")
+# IN (?, ?, ?) 等展开后的参数列表折叠为一个占位符，使不同长度的列表得到同一个指纹
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))+\s*\)")
+_EXPLAIN_PREFIX = {"sqlite": "EXPLAIN QUERY PLAN ", "mysql": "EXPLAIN ", "postgresql": "EXPLAIN "}
+
+
+@contextmanager
+def maintenance_queries():
+    """包裹后台维护查询，使其不计入当前请求的查询预算 (仍会被统计和记录慢查询)。"""
+    token = _maintenance.set(True)
+    try:
+        yield
+    finally:
+        _maintenance.reset(token)
+
+
+def fingerprint(statement: str) -> tuple[str, str]:
+    """规范化SQL语句 (合并空白、折叠参数列表)，返回 (指纹, 规范化后的语句)。"""
+    normalized = _PLACEHOLDER_LIST.sub("(?+)", _WHITESPACE.sub(" ", statement).strip())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=6).hexdigest(), normalized
+
+
+class QueryProfiler:
+    """
+    SQL查询分析器 (QUERY_PROFILER_ENABLED=True 时启用)，挂在数据库Engine的游标执行事件上:
+    - 按语句指纹统计执行次数和耗时 (进程级累计 + 每个请求的明细)；
+    - 超过 SLOW_QUERY_MS 的查询记录慢查询日志并附带 EXPLAIN 执行计划 (同一指纹每个间隔内只EXPLAIN一次)；
+    - 请求的查询次数超过 QUERY_BUDGETS 中为该端点设定的预算时记录警告 (QUERY_BUDGET_STRICT=True 时直接返回500，用于测试)。
+    """
+
+    def __init__(self):
+        self.enabled: bool = False
+        self.slow_query_seconds: float = 0.1
+        self.explain: bool = True
+        self.explain_interval: float = 300.0
+        self.budgets: dict[str, int] = {}
+        self.strict: bool = False
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict] = {}  # 指纹 -> {"statement", "count", "total", "max"}
+        self._budget_exceeded: dict[str, int] = {}  # 端点 -> 超出预算的请求数
+        self._explained_at: dict[str, float] = {}
+
+    def init_app(self, app: Flask) -> None:
+        self.enabled = app.config.get("QUERY_PROFILER_ENABLED", False)
+        self.slow_query_seconds = app.config.get("SLOW_QUERY_MS", 100) / 1000
+        self.explain = app.config.get("SLOW_QUERY_EXPLAIN", True)
+        self.explain_interval = app.config.get("SLOW_QUERY_EXPLAIN_INTERVAL", 300.0)
+        self.budgets = dict(app.config.get("QUERY_BUDGETS") or {})
+        self.strict = app.config.get("QUERY_BUDGET_STRICT", False)
+        with self._lock:
+            self._stats.clear()
+            self._budget_exceeded.clear()
+            self._explained_at.clear()
+        if not self.enabled:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+        from ..extensions import db, replica_router, request_metrics
+
+        with app.app_context():
+            engines = [db.engine, *replica_router.engines]
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        if request_metrics.enabled:
+            request_metrics.add_gauge_provider(self.gauges)
+
+    def budget_for(self, endpoint: str | None) -> int | None:
+        """端点的查询预算：先按完整端点名 (如 user_api.get_my_profile) 查找，再按视图函数名查找。"""
+        if endpoint is None:
+            return None
+        budget = self.budgets.get(endpoint)
+        if budget is None:
+            budget = self.budgets.get(endpoint.rpartition(".")[2])
+        return budget
+
+    def _before_request(self) -> None:
+        g._query_log = []
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # 记在执行上下文上而不是连接上，执行出错 (不触发after_cursor_execute) 时不会留下残留
+        if context is not None:
+            context._profiler_query_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_profiler_query_start", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        fp, normalized = fingerprint(statement)
+        with self._lock:
+            stats = self._stats.get(fp)
+            if stats is None:
+                stats = self._stats[fp] = {"statement": normalized, "count": 0, "total": 0.0, "max": 0.0}
+            stats["count"] += 1
+            stats["total"] += elapsed
+            stats["max"] = max(stats["max"], elapsed)
+        if has_request_context():
+            query_log = g.get("_query_log")
+            if query_log is not None:
+                query_log.append((fp, elapsed, _maintenance.get()))
+        if elapsed >= self.slow_query_seconds:
+            self._log_slow_query(conn, fp, normalized, statement, parameters, elapsed, executemany)
+
+    def _log_slow_query(self, conn, fp: str, normalized: str, statement: str, parameters, elapsed: float,
+                        executemany: bool) -> None:
+        plan = None
+        now = time.monotonic()
+        if (self.explain and not executemany and statement.lstrip()[:6].upper() == "SELECT"
+                and now - self._explained_at.get(fp, -self.explain_interval) >= self.explain_interval):
+            self._explained_at[fp] = now
+            plan = self._explain(conn, statement, parameters)
+        endpoint = request.endpoint if has_request_context() else None
+        logger.warning("慢查询 {:.1f} ms [{}] 端点={}: {}{}", elapsed * 1000, fp, endpoint, normalized,
+                       f"\n执行计划:\n{plan}" if plan else "")
+
+    @staticmethod
+    def _explain(conn, statement: str, parameters) -> str | None:
+        # 直接使用DBAPI游标执行EXPLAIN，不经过SQLAlchemy，避免再次触发游标事件
+        prefix = _EXPLAIN_PREFIX.get(conn.dialect.name)
+        if prefix is None:
+            return None
+        try:
+            cursor = conn.connection.dbapi_connection.cursor()
+            try:
+                cursor.execute(prefix + statement, parameters)
+                return "\n".join(" | ".join(str(col) for col in row) for row in cursor.fetchall())
+            finally:
+                cursor.close()
+        except Exception as e:
+            return f"(EXPLAIN失败: {e})"
+
+    def _after_request(self, response: Response) -> Response:
+        query_log = g.get("_query_log")
+        if query_log is None:
+            return response
+        counted = [entry for entry in query_log if not entry[2]]
+        response.headers["X-Query-Count"] = str(len(counted))
+        budget = self.budget_for(request.endpoint)
+        if budget is not None and len(counted) > budget:
+            with self._lock:
+                self._budget_exceeded[request.endpoint] = self._budget_exceeded.get(request.endpoint, 0) + 1
+                statements = [self._stats[fp]["statement"] for fp, _, _ in counted]
+            logger.warning("端点 {} 执行了 {} 条查询，超出预算 {} 条 (耗时 {:.1f} ms):\n{}", request.endpoint,
+                           len(counted), budget, sum(entry[1] for entry in counted) * 1000, "\n".join(statements))
+            if self.strict:
+                raise AssertionError(f"端点 {request.endpoint} 执行了 {len(counted)} 条查询，超出预算 {budget} 条")
+        return response
+
+    def top(self, limit: int = 20, key: str = "total") -> list[dict]:
+        """按累计耗时 (或执行次数 key="count") 排序的指纹统计。"""
+        with self._lock:
+            items = [{"fingerprint": fp, **stats} for fp, stats in self._stats.items()]
+        return sorted(items, key=lambda item: item[key], reverse=True)[:limit]
+
+    def gauges(self) -> list[tuple[str, dict, float, str]]:
+        """供 /metrics 输出的查询统计。"""
+        result = []
+        for item in self.top(50):
+            labels = {"fingerprint": item["fingerprint"]}
+            result.append(("auth_db_query_count", labels, item["count"], "按语句指纹统计的查询次数"))
+            result.append(("auth_db_query_seconds_total", labels, round(item["total"], 6), "按语句指纹统计的累计耗时"))
+        with self._lock:
+            for endpoint, count in sorted(self._budget_exceeded.items()):
+                result.append(("auth_query_budget_exceeded", {"endpoint": endpoint}, count, "超出查询预算的请求数"))
+        return result
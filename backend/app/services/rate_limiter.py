@@ -0,0 +1,133 @@
+# backend/app/services/rate_limiter.py
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+
+class RateLimited(Exception):
+    """请求超过限流阈值时抛出，调用方应返回429并附带Retry-After。"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("请求过于频繁")
+        self.retry_after = retry_after
+
+
+def parse_rate(rate: str) -> tuple[int, float]:
+    """解析 "次数/秒数" 格式的限流规则，例如 "5/60" 表示60秒内最多5次。"""
+    limit, _, window = rate.partition("/")
+    return int(limit), float(window or 1)
+
+
+class RateLimitBackend(Protocol):
+    """限流计数的存储后端。多进程/多主机部署时应使用共享后端 (如Redis)，否则每个进程各自计数。"""
+
+    def hit(self, key: str, limit: int, window: float) -> float:
+        """消耗一次配额。允许时返回0，超限时返回需要等待的秒数。"""
+        ...
+
+    def reset(self, key: str) -> None:
+        ...
+
+
+class MemoryBackend:
+    """
+    进程内令牌桶 (Token Bucket)：容量为limit，每秒补充 limit/window 个令牌。
+    键的数量有上限 (LRU淘汰)，防止撞库攻击使用海量不同用户名撑爆内存。
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window: float) -> float:
+        rate = limit / window
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (float(limit), now))
+            tokens = min(float(limit), tokens + (now - updated_at) * rate)
+            if tokens < 1.0:
+                self._buckets[key] = (tokens, now)
+                self._buckets.move_to_end(key)
+                return (1.0 - tokens) / rate
+            self._buckets[key] = (tokens - 1.0, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return 0.0
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+class RedisBackend:
+    """
+    基于Redis的共享固定窗口计数：首次计数时设置过期时间，窗口内超过limit即拒绝。
+    所有Worker和主机共享同一份计数。需要安装 redis 包。
+    """
+
+    def __init__(self, url: str):
+        import redis  # 仅在配置了Redis后端时才需要该依赖
+
+        self._client = redis.Redis.from_url(url)
+
+    def hit(self, key: str, limit: int, window: float) -> float:
+        redis_key = f"ratelimit:{key}"
+        pipe = self._client.pipeline()
+        pipe.incr(redis_key)
+        pipe.expire(redis_key, max(int(math.ceil(window)), 1), nx=True)
+        pipe.ttl(redis_key)
+        count, _, ttl = pipe.execute()
+        if count > limit:
+            return float(max(ttl, 1))
+        return 0.0
+
+    def reset(self, key: str) -> None:
+        self._client.delete(f"ratelimit:{key}")
+
+
+class RateLimiter:
+    """
+    登录限流：同时按用户名和客户端地址计数，在查询数据库和计算密码哈希之前拒绝超限请求，
+    让撞库/暴力破解流量无法消耗哈希CPU。
+    """
+
+    def __init__(self):
+        self.enabled: bool = False
+        self.backend: RateLimitBackend = MemoryBackend()
+        self.username_rate: tuple[int, float] = (5, 60.0)
+        self.client_rate: tuple[int, float] = (20, 60.0)
+
+    def init_app(self, app) -> None:
+        self.enabled = app.config.get("RATE_LIMIT_ENABLED", True)
+        self.username_rate = parse_rate(app.config.get("LOGIN_RATE_LIMIT_PER_USERNAME", "5/60"))
+        self.client_rate = parse_rate(app.config.get("LOGIN_RATE_LIMIT_PER_CLIENT", "20/60"))
+        backend_url: str = app.config.get("RATE_LIMIT_BACKEND", "memory")
+        if backend_url.startswith(("redis://", "rediss://", "unix://")):
+            self.backend = RedisBackend(backend_url)
+        else:
+            self.backend = MemoryBackend(app.config.get("RATE_LIMIT_MAX_KEYS", 100_000))
+
+    @staticmethod
+    def _username_key(username: str) -> str:
+        return f"login:user:{username.strip().lower()}"
+
+    def check_login(self, username: str, client_addr: str | None) -> None:
+        """消耗一次登录配额，超限时抛出 RateLimited。"""
+        if not self.enabled:
+            return
+        waits = [
+            self.backend.hit(f"login:client:{client_addr or 'unknown'}", *self.client_rate),
+            self.backend.hit(self._username_key(username), *self.username_rate),
+        ]
+        retry_after = max(waits)
+        if retry_after > 0:
+            raise RateLimited(max(int(math.ceil(retry_after)), 1))
+
+    def reset_login(self, username: str) -> None:
+        """登录成功后重置该用户名的计数，正常用户不会因之前输错密码而被持续限流。"""
+        if self.enabled:
+            self.backend.reset(self._username_key(username))
@@ -0,0 +1,261 @@
+# backend/app/services/revocation_index.py
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Callable
+
+from loguru import logger
+from sqlalchemy import func, or_, select
+
+from .db_routing import replica_reads
+from .query_profiler import maintenance_queries
+
+
+class BloomFilter:
+    """
+    一个紧凑的布隆过滤器 (Bloom Filter)。
+    "不在"的判断是确定的；"可能在"的判断存在一定的误判率 (由 error_rate 控制)。
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(int(capacity), 1)
+        # 根据期望容量n和误判率p计算位数组大小m与哈希函数个数k:
+        # m = -n * ln(p) / (ln2)^2,  k = m / n * ln2
+        self.num_bits: int = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.num_hashes: int = max(int(round(self.num_bits / capacity * math.log(2))), 1)
+        self.capacity: int = capacity
+        self.count: int = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: str):
+        # 双重哈希 (Kirsch-Mitzenmacher): 只计算一次摘要即可派生出k个位置
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+
+class RevocationIndex:
+    """
+    进程内的Token吊销索引，位于TokenBlocklist查询之前。
+    - 布隆过滤器: 绝大多数未吊销的JTI在这里就能直接判定为"未吊销"，无需访问数据库。
+    - LRU缓存: 缓存"可能吊销"的JTI经数据库确认后的结论，避免重复查询。
+    - 增量同步: 定期按自增ID拉取其他进程新写入的黑名单记录，保证多Worker之间的一致性。
+      自增ID的分配顺序与事务提交顺序不一定一致 (只读副本上也可能晚到)，因此每次同步都从
+      SYNC_OVERLAP_SECONDS 秒前的同步位置重新扫描，补上ID较小但较晚可见的记录。
+    """
+
+    # 增量同步时回看的时间窗口(秒)，容忍事务乱序提交和只读副本的复制延迟
+    SYNC_OVERLAP_SECONDS = 5.0
+    # 刚加载完、还没有足够早的检查点时，改为回看最近这么多个ID (避免对全表反复重扫)
+    SYNC_OVERLAP_ROWS = 1000
+
+    def __init__(self):
+        self.enabled: bool = False
+        self._bloom: BloomFilter | None = None
+        self._verdicts: OrderedDict[str, bool] = OrderedDict()
+        self._lru_size: int = 10000
+        self._error_rate: float = 0.001
+        self._sync_interval: float = 1.0
+        self._capacity: int = 1_000_000
+        self._last_synced_id: int = 0
+        self._last_synced_at: float = 0.0
+        # (同步完成时刻, 同步位置) 检查点，用于确定回看窗口起点
+        self._checkpoints: deque[tuple[float, int]] = deque()
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """从应用配置读取参数。真正的加载在首次同步时完成。"""
+        self.enabled = app.config.get("REVOCATION_INDEX_ENABLED", True)
+        self._lru_size = app.config.get("REVOCATION_INDEX_LRU_SIZE", 10000)
+        self._error_rate = app.config.get("REVOCATION_INDEX_ERROR_RATE", 0.001)
+        self._sync_interval = app.config.get("REVOCATION_INDEX_SYNC_INTERVAL", 1.0)
+        self._capacity = app.config.get("REVOCATION_INDEX_CAPACITY", 1_000_000)
+        self._bloom = None
+        self._verdicts.clear()
+        self._last_synced_id = 0
+        self._last_synced_at = 0.0
+        self._checkpoints.clear()
+
+    @property
+    def loaded(self) -> bool:
+        """布隆过滤器是否已构建 (预加载模式下在主进程中构建，fork出的Worker直接继承)。"""
+        return self._bloom is not None
+
+    @property
+    def entry_count(self) -> int:
+        """布隆过滤器中已加入的JTI数量。"""
+        return self._bloom.count if self._bloom is not None else 0
+
+    def load(self, model) -> None:
+        """
+        启动时从token_blocklist表构建索引。
+        容量按表的最大ID估算(主键索引上取MAX几乎无开销，比COUNT(*)便宜得多)，并预留增长空间。
+        """
+        from ..extensions import db
+
+        with replica_reads(), maintenance_queries():
+            max_id = db.session.execute(select(func.max(model.id))).scalar() or 0
+        capacity = max(self._capacity, int(max_id * 1.5))
+        with self._lock:
+            self._bloom = BloomFilter(capacity, self._error_rate)
+            self._verdicts.clear()
+            self._last_synced_id = 0
+            self._checkpoints.clear()
+        self.sync(model)
+        logger.info(
+            "吊销索引已加载: {} 条记录, 布隆过滤器 {:.1f} MB, 哈希函数 {} 个",
+            self._bloom.count, self._bloom.size_bytes / 1024 / 1024, self._bloom.num_hashes,
+        )
+
+    def sync(self, model, batch_size: int = 10000) -> int:
+        """
+        增量拉取黑名单记录 (只选取id和jti两列，按主键分批流式读取，内存占用恒定)。
+        扫描起点是 SYNC_OVERLAP_SECONDS 秒前的同步位置而不是最新位置：窗口内重复读到的记录按幂等方式处理，
+        其中此前不可见的记录 (较小ID较晚提交) 会被补入过滤器，并覆盖LRU中"未吊销"的旧结论。
+        已过期的记录会被跳过：过期Token本身就会被拒绝，无需占用过滤器容量。
+        :return: 本次新增的记录数。
+        """
+        from ..extensions import db
+
+        if not self._sync_lock.acquire(blocking=False):
+            return 0  # 其他线程正在同步，直接返回
+        try:
+            added = 0
+            now = datetime.now(timezone.utc)
+            started = time.monotonic()
+            # 丢弃早于回看窗口的检查点，但保留窗口起点之前的最后一个作为扫描起点
+            horizon = started - self.SYNC_OVERLAP_SECONDS
+            checkpoints = self._checkpoints
+            while len(checkpoints) > 1 and checkpoints[1][0] <= horizon:
+                checkpoints.popleft()
+            if checkpoints and checkpoints[0][0] <= horizon:
+                cursor = checkpoints[0][1]
+            else:
+                cursor = max(self._last_synced_id - self.SYNC_OVERLAP_ROWS, 0)
+            while True:
+                with replica_reads(), maintenance_queries():
+                    rows = db.session.execute(
+                        select(model.id, model.jti)
+                        .where(model.id > cursor)
+                        .where(or_(model.expires_at.is_(None), model.expires_at >= now))
+                        .order_by(model.id)
+                        .limit(batch_size)
+                    ).all()
+                if not rows:
+                    break
+                for row_id, jti in rows:
+                    if row_id > self._last_synced_id:
+                        self.add(jti)
+                        added += 1
+                    elif self._add_late(jti):
+                        added += 1
+                cursor = rows[-1][0]
+                self._last_synced_id = max(self._last_synced_id, cursor)
+                if len(rows) < batch_size:
+                    break
+            checkpoints.append((started, self._last_synced_id))
+            self._last_synced_at = time.monotonic()
+            return added
+        finally:
+            self._sync_lock.release()
+
+    def _add_late(self, jti: str) -> bool:
+        """
+        处理回看窗口内重复读到的记录：已在过滤器中的只把LRU中的"未吊销"结论改正 (不重复计数)，
+        不在过滤器中的是此前同步时尚不可见的记录，正常加入。
+        :return: 是否为新加入的记录。
+        """
+        with self._lock:
+            if self._bloom is None:
+                return False
+            if jti in self._bloom:
+                if self._verdicts.get(jti) is False:
+                    self._remember(jti, True)
+                return False
+        self.add(jti)
+        return True
+
+    def add(self, jti: str) -> None:
+        """登出时调用：立即在本进程内标记该JTI为已吊销。"""
+        with self._lock:
+            if self._bloom is None:
+                return
+            self._bloom.add(jti)
+            self._remember(jti, True)
+            if self._bloom.count == self._bloom.capacity + 1:
+                logger.warning("吊销索引超过预估容量 {}，误判率将上升，建议重启以重建索引。", self._bloom.capacity)
+
+    def _remember(self, jti: str, verdict: bool) -> None:
+        self._verdicts[jti] = verdict
+        self._verdicts.move_to_end(jti)
+        if len(self._verdicts) > self._lru_size:
+            self._verdicts.popitem(last=False)
+
+    def candidates(self, jtis: list[str], model) -> tuple[set[str], list[str]]:
+        """
+        批量预筛选，供批量校验使用：
+        :return: (本进程已确认吊销的JTI, 布隆过滤器判定"可能在"且LRU中没有结论、需要回查数据库的JTI)。
+        """
+        if self._bloom is None:
+            self.load(model)
+        elif time.monotonic() - self._last_synced_at >= self._sync_interval:
+            self.sync(model)
+        revoked, unknown = set(), []
+        with self._lock:
+            for jti in jtis:
+                if jti not in self._bloom:
+                    continue
+                verdict = self._verdicts.get(jti)
+                if verdict is None:
+                    unknown.append(jti)
+                elif verdict:
+                    revoked.add(jti)
+        return revoked, unknown
+
+    def remember(self, verdicts: dict[str, bool]) -> None:
+        """记录数据库回查得到的结论 (已被 add() 标记为吊销的以吊销为准)。"""
+        with self._lock:
+            for jti, verdict in verdicts.items():
+                self._remember(jti, self._verdicts.get(jti, False) or verdict)
+
+    def is_revoked(self, jti: str, model, db_lookup: Callable[[str], bool]) -> bool:
+        """
+        判断JTI是否已被吊销。只有布隆过滤器给出"可能在"且LRU未命中时才会调用 db_lookup。
+        """
+        if self._bloom is None:
+            self.load(model)
+        elif time.monotonic() - self._last_synced_at >= self._sync_interval:
+            self.sync(model)
+
+        if jti not in self._bloom:
+            return False
+        with self._lock:
+            verdict = self._verdicts.get(jti)
+            if verdict is not None:
+                self._verdicts.move_to_end(jti)
+                return verdict
+        verdict = db_lookup(jti)
+        with self._lock:
+            # 期间可能已有其他线程通过 add() 将其标记为吊销，以"已吊销"为准
+            verdict = self._verdicts.get(jti, False) or verdict
+            self._remember(jti, verdict)
+        return verdict
@@ -0,0 +1,138 @@
+# backend/app/services/revocation_writer.py
+import atexit
+import os
+import threading
+import time
+from itertools import islice
+
+from loguru import logger
+
+
+class RevocationWriter:
+    """
+    Token吊销的写后缓冲 (write-behind)，REVOCATION_WRITE_BEHIND=True 时启用。
+    登出请求只把记录放入内存队列并立即在本进程内生效 (is_pending + 吊销索引)，
+    后台线程每隔 REVOCATION_FLUSH_INTERVAL 秒把队列中的记录合并为一条多行 INSERT ... IGNORE 写入数据库。
+    大量客户端同时登出时，数据库写入次数从"每次登出一次"降为"每个刷新周期一次"。
+    代价: 进程崩溃时最多丢失一个刷新周期内的吊销记录；其他进程在记录写入数据库并完成增量同步后才能感知。
+    数据库不可用时按指数退避重试 (最长 REVOCATION_FLUSH_MAX_BACKOFF 秒)，错误日志每 ERROR_LOG_INTERVAL 秒最多一条。
+    """
+
+    # 连续写入失败时两条错误日志之间的最小间隔(秒)，期间的失败只计数
+    ERROR_LOG_INTERVAL = 30.0
+
+    def __init__(self):
+        self.enabled: bool = False
+        self.flush_interval: float = 0.005
+        self.max_batch: int = 1000
+        self.max_backoff: float = 5.0
+        self._app = None
+        self._queue: dict[str, dict] = {}  # jti -> 待写入的记录 (按jti去重)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._thread_pid: int | None = None
+        self._failures: int = 0  # 连续写入失败次数
+        self._retry_at: float = 0.0  # 退避结束时间 (monotonic)
+        self._error_logged_at: float | None = None
+        self._suppressed_errors: int = 0
+        atexit.register(self.shutdown)
+
+    def init_app(self, app) -> None:
+        self.flush()  # 重新初始化前写出上一个应用遗留的记录
+        self.enabled = app.config.get("REVOCATION_WRITE_BEHIND", False)
+        self.flush_interval = app.config.get("REVOCATION_FLUSH_INTERVAL", 0.005)
+        self.max_batch = app.config.get("REVOCATION_FLUSH_MAX_BATCH", 1000)
+        self.max_backoff = app.config.get("REVOCATION_FLUSH_MAX_BACKOFF", 5.0)
+        self._app = app
+        self._failures, self._retry_at = 0, 0.0
+        self._error_logged_at, self._suppressed_errors = None, 0
+
+    @property
+    def pending(self) -> int:
+        """尚未写入数据库的吊销记录数。"""
+        return len(self._queue)
+
+    def is_pending(self, jti: str) -> bool:
+        return jti in self._queue
+
+    def submit(self, jti: str, token_type: str, user_identity: str, expires_at) -> bool:
+        """
+        登记一条吊销记录，立即返回。
+        :return: 该JTI是否是首次登记 (False表示它已在队列中)。
+        """
+        self._ensure_started()
+        with self._lock:
+            if jti in self._queue:
+                return False
+            self._queue[jti] = {"jti": jti, "token_type": token_type, "user_identity": user_identity,
+                                "expires_at": expires_at}
+            if len(self._queue) >= self.max_batch:
+                self._wakeup.set()  # 队列已满，不等到下一个周期
+        return True
+
+    def _ensure_started(self) -> None:
+        # 后台线程不会随fork复制：在fork出的Worker中首次使用时重新启动
+        if self._thread is not None and self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._thread_pid != os.getpid():
+                self._thread = threading.Thread(target=self._run, name="revocation-writer", daemon=True)
+                self._thread_pid = os.getpid()
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(max(self._retry_at - time.monotonic(), self.flush_interval))
+            self._wakeup.clear()
+            # 退避期间即使队列已满被唤醒也不重试
+            if self._queue and time.monotonic() >= self._retry_at:
+                self.flush()
+
+    def flush(self) -> int:
+        """把队列中的记录写入数据库 (每次最多max_batch条)，返回写入的记录数。写入失败的记录保留在队列中，退避后重试。"""
+        if self._app is None:
+            return 0
+        from ..extensions import db
+        from ..models.token_model import TokenBlocklist
+
+        written = 0
+        while self._queue:
+            with self._lock:
+                jtis = list(islice(self._queue, self.max_batch))
+                rows = [self._queue[jti] for jti in jtis]
+            start = time.perf_counter()
+            with self._app.app_context():
+                try:
+                    TokenBlocklist.revoke_many(rows)
+                except Exception as e:
+                    db.session.rollback()
+                    self._on_failure(len(rows), e)
+                    return written
+            with self._lock:
+                for jti in jtis:
+                    self._queue.pop(jti, None)
+            if self._failures:
+                logger.info("吊销记录写入已恢复 (此前连续失败 {} 次)。", self._failures)
+                self._failures, self._retry_at = 0, 0.0
+                self._error_logged_at, self._suppressed_errors = None, 0
+            written += len(rows)
+            logger.debug("批量写入 {} 条吊销记录，耗时 {:.1f} ms", len(rows), (time.perf_counter() - start) * 1000)
+        return written
+
+    def _on_failure(self, rows: int, error: Exception) -> None:
+        """记录一次写入失败：计算下次重试的退避时间，并限制错误日志的频率。"""
+        self._failures += 1
+        delay = min(self.flush_interval * 2 ** min(self._failures, 30), self.max_backoff)
+        now = time.monotonic()
+        self._retry_at = now + delay
+        if self._error_logged_at is not None and now - self._error_logged_at < self.ERROR_LOG_INTERVAL:
+            self._suppressed_errors += 1
+            return
+        logger.error("批量写入 {} 条吊销记录失败 (连续第 {} 次，上条日志之后另有 {} 次失败)，{:.2f} 秒后重试: {}",
+                     rows, self._failures, self._suppressed_errors, delay, error)
+        self._error_logged_at, self._suppressed_errors = now, 0
+
+    def shutdown(self) -> None:
+        """进程退出前调用，写出队列中剩余的记录。"""
+        self.flush()
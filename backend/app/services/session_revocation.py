@@ -0,0 +1,114 @@
+# backend/app/services/session_revocation.py
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from loguru import logger
+from sqlalchemy import select, update
+
+from .db_routing import replica_reads
+from .query_profiler import maintenance_queries
+
+
+def _to_timestamp(value: datetime) -> float:
+    # MySQL/SQLite的DATETIME列读回时不带时区，统一按UTC解释
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class SessionRevocationMap:
+    """
+    按用户的"会话吊销时间戳"(not-before) 内存映射。
+    每个用户在 users.tokens_valid_after 上记录一个时间点，签发时间(iat)早于该时间点的所有Token一律视为已吊销。
+    因此"注销该用户的所有会话"只需一次UPDATE，不必知道或逐个写入该用户所有未过期Token的JTI。
+    内存中只保留最近一个Token最长有效期内的时间戳 (更早的时间戳对应的Token都已自然过期)，
+    并定期按时间戳增量同步其他进程写入的新记录。
+    """
+
+    # 增量同步时回看的时间窗口(秒)，容忍不同进程之间的时钟偏差和事务提交延迟
+    SYNC_OVERLAP_SECONDS = 5.0
+
+    def __init__(self):
+        self._not_before: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._sync_interval: float = 1.0
+        self._max_token_lifetime: float = 14 * 24 * 3600
+        self._watermark: float = 0.0
+        self._last_synced_at: float | None = None
+
+    def init_app(self, app) -> None:
+        self._sync_interval = app.config.get("SESSION_REVOCATION_SYNC_INTERVAL", 1.0)
+        lifetimes = [app.config.get("JWT_ACCESS_TOKEN_EXPIRES"), app.config.get("JWT_REFRESH_TOKEN_EXPIRES")]
+        self._max_token_lifetime = max(
+            (t.total_seconds() for t in lifetimes if isinstance(t, timedelta)),
+            default=self._max_token_lifetime,
+        )
+        with self._lock:
+            self._not_before.clear()
+        self._watermark = 0.0
+        self._last_synced_at = None
+
+    def sync(self, model) -> int:
+        """从数据库拉取 tokens_valid_after 晚于上次水位线的用户 (启动时即为全量加载有效期内的记录)。"""
+        from ..extensions import db
+
+        if not self._sync_lock.acquire(blocking=False):
+            return 0
+        try:
+            horizon = time.time() - self._max_token_lifetime
+            since = max(self._watermark - self.SYNC_OVERLAP_SECONDS, horizon)
+            with replica_reads(), maintenance_queries():
+                rows = db.session.execute(
+                    select(model.username, model.tokens_valid_after)
+                    .where(model.tokens_valid_after > datetime.fromtimestamp(since, timezone.utc))
+                ).all()
+            with self._lock:
+                for username, valid_after in rows:
+                    stamp = _to_timestamp(valid_after)
+                    if stamp > self._not_before.get(username, 0.0):
+                        self._not_before[username] = stamp
+                    self._watermark = max(self._watermark, stamp)
+                # 清理已超过Token最长有效期的时间戳
+                for username in [u for u, stamp in self._not_before.items() if stamp < horizon]:
+                    del self._not_before[username]
+            self._last_synced_at = time.monotonic()
+            return len(rows)
+        finally:
+            self._sync_lock.release()
+
+    def revoke_users(self, model, usernames: list[str]) -> int:
+        """
+        吊销一批用户的全部现有会话：一条UPDATE语句，与这些用户持有多少Token无关。
+        :return: 受影响的用户数。
+        """
+        from ..extensions import db
+
+        if not usernames:
+            return 0
+        now = datetime.now(timezone.utc)
+        result = db.session.execute(
+            update(model).where(model.username.in_(usernames)).values(tokens_valid_after=now)
+        )
+        db.session.commit()
+        stamp = now.timestamp()
+        with self._lock:
+            for username in usernames:
+                self._not_before[username] = stamp
+        return result.rowcount
+
+    def is_revoked(self, identity: str, issued_at: float | None, model) -> bool:
+        """判断签发于issued_at的Token是否早于该用户的会话吊销时间戳。"""
+        if self._last_synced_at is None or time.monotonic() - self._last_synced_at >= self._sync_interval:
+            try:
+                self.sync(model)
+            except Exception as e:
+                from ..extensions import db
+                db.session.rollback()
+                logger.warning("会话吊销时间戳同步失败，暂时使用内存中的数据: {}", e)
+        stamp = self._not_before.get(identity)
+        if stamp is None or issued_at is None:
+            return False
+        # iat只精确到秒：与吊销时间戳同一秒内签发的Token也会被拒绝 (宁可让用户重新登录一次)
+        return issued_at <= int(stamp)
@@ -0,0 +1,283 @@
+# backend/app/services/shared_revocations.py
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from loguru import logger
+from sqlalchemy import func, or_, select
+
+from .db_routing import replica_reads
+from .query_profiler import maintenance_queries
+
+try:
+    import fcntl  # 仅类Unix系统提供，用于跨进程写锁
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+_MAGIC = b"JTIREV02"
+# 头部: 魔数, 槽位数, 已占用槽位数, 已同步的最大黑名单ID, 上次同步时间(Unix秒), 溢出标志,
+#       回看起点ID, 待生效的回看起点ID及其记录时间(Unix秒)
+_HEADER = struct.Struct("<8sQQQdQQQd")
+_HEADER_SIZE = 128
+# 槽位: JTI摘要(16字节，全零表示空槽) + 过期时间(Unix秒)
+_SLOT = struct.Struct("<16sq")
+_EMPTY = bytes(16)
+_NO_EXPIRY = 2 ** 63 - 1
+# 占用率超过该比例后不再占用新槽位 (仍可复用已过期的槽位)，保证线性探测的链长
+_MAX_LOAD = 0.7
+# 增量同步时回看的时间窗口(秒)，容忍事务乱序提交和只读副本的复制延迟 (与会话吊销映射相同)
+SYNC_OVERLAP_SECONDS = 5.0
+# 首次全量加载后还没有足够早的回看起点时，改为回看最近这么多个ID
+SYNC_OVERLAP_ROWS = 1000
+
+
+def _digest(jti: str) -> bytes:
+    digest = hashlib.blake2b(jti.encode("utf-8"), digest_size=16).digest()
+    return digest if digest != _EMPTY else b"\x01" + digest[1:]
+
+
+class SharedRevocationTable:
+    """
+    同一主机上所有Worker共享的吊销表 (SHARED_REVOCATION_ENABLED=True 时启用)。
+    一个内存映射文件 (默认位于 /dev/shm) 中的定长开放寻址哈希表，每个槽位保存JTI摘要和Token过期时间:
+    - 读: check_if_jti_in_blocklist 直接在映射内存上线性探测，不加锁，也不访问数据库；
+    - 写: 登出时加文件锁写入一个槽位，同一主机的所有Worker立即可见；已过期的槽位会被复用；
+    - 同步: 各Worker共享同一个同步水位线 (保存在文件头部)，每个间隔只有一个Worker增量拉取其他主机写入的黑名单记录；
+      每次都从至少 SYNC_OVERLAP_SECONDS 秒前的水位线开始重扫，补上ID较小但较晚提交 (或在副本上晚到) 的记录。
+      签发时间晚于"完全覆盖"时间点的Token在表中查不到时结果未知 (None)，不能据此判定为未吊销。
+    内存占用与Worker数量无关，只由 SHARED_REVOCATION_CAPACITY 决定 (每个槽位24字节)。
+    表已满 (溢出) 或平台不支持时返回None，由调用方回退到进程内吊销索引和数据库查询。
+    """
+
+    def __init__(self):
+        self.enabled: bool = False
+        self.path: Path | None = None
+        self.capacity: int = 1 << 20
+        self._sync_interval: float = 1.0
+        self._mmap: mmap.mmap | None = None
+        self._mask: int = 0
+        self._lock_fd: int | None = None
+        self._lock_pid: int | None = None
+        self._thread_lock = threading.Lock()
+        self._checked_pid: int | None = None
+
+    def init_app(self, app) -> None:
+        self.close()
+        self.enabled = app.config.get("SHARED_REVOCATION_ENABLED", False)
+        if not self.enabled:
+            return
+        if fcntl is None:
+            logger.warning("当前平台不支持文件锁，共享吊销表已禁用。")
+            self.enabled = False
+            return
+        capacity = int(app.config.get("SHARED_REVOCATION_CAPACITY", 1 << 20))
+        self.capacity = 1 << max(capacity - 1, 1).bit_length()  # 向上取整为2的幂，槽位下标可用位与计算
+        self._mask = self.capacity - 1
+        self._sync_interval = app.config.get("SHARED_REVOCATION_SYNC_INTERVAL", 1.0)
+        path = app.config.get("SHARED_REVOCATION_PATH")
+        if not path:
+            # 默认按数据库区分文件，同一主机上连接不同数据库的应用互不干扰
+            db_key = hashlib.blake2b(app.config["SQLALCHEMY_DATABASE_URI"].encode(), digest_size=6).hexdigest()
+            shm_dir = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+            path = os.path.join(shm_dir, f"flask_token_revocations_{db_key}")
+        self.path = Path(path)
+        self._open()
+
+    def _open(self) -> None:
+        size = _HEADER_SIZE + self.capacity * _SLOT.size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            header = os.pread(fd, _HEADER.size, 0)
+            valid = (len(header) == _HEADER.size and os.fstat(fd).st_size == size
+                     and _HEADER.unpack(header)[:2] == (_MAGIC, self.capacity))
+            if not valid:
+                # 新建或容量变化：重建空表 (由同步从数据库重新加载)
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+                os.pwrite(fd, _HEADER.pack(_MAGIC, self.capacity, 0, 0, 0.0, 0, 0, 0, 0.0), 0)
+            self._mmap = mmap.mmap(fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        logger.info("共享吊销表: {} ({} 个槽位, {:.1f} MB)", self.path, self.capacity, size / 1024 / 1024)
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._lock_fd is not None and self._lock_pid == os.getpid():
+            os.close(self._lock_fd)
+        self._lock_fd = self._lock_pid = None
+
+    @contextmanager
+    def _write_lock(self, blocking: bool = True):
+        """跨进程写锁。flock按打开的文件描述归属，fork后子进程需要重新打开文件，否则与父进程共享同一把锁。"""
+        with self._thread_lock:
+            if self._lock_fd is None or self._lock_pid != os.getpid():
+                self._lock_fd, self._lock_pid = os.open(self.path, os.O_RDWR), os.getpid()
+            try:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _header(self) -> tuple:
+        return _HEADER.unpack_from(self._mmap, 0)
+
+    def _write_header(self, count: int, last_synced_id: int, last_synced_at: float, overflow: int) -> None:
+        _HEADER.pack_into(self._mmap, 0, _MAGIC, self.capacity, count, last_synced_id, last_synced_at, overflow,
+                          *self._header()[6:])
+
+    def _write_overlap(self, floor_id: int, pending_id: int, pending_at: float) -> None:
+        struct.pack_into("<QQd", self._mmap, _HEADER.size - 24, floor_id, pending_id, pending_at)
+
+    @property
+    def entry_count(self) -> int:
+        return self._header()[2] if self._mmap is not None else 0
+
+    def is_revoked(self, jti: str, issued_at: float | None = None) -> bool | None:
+        """
+        无锁查询JTI是否已吊销。
+        :param issued_at: Token的签发时间 (iat)。晚于上次同步减去回看窗口的Token，
+                          其吊销记录可能还没有同步进来，查不到时返回None而不是False。
+        :return: True/False；表不可用、已溢出 (结果不完整) 或无法确定时返回None。
+        """
+        mm = self._mmap
+        if mm is None:
+            return None
+        header = _HEADER.unpack_from(mm, 0)
+        if header[5]:
+            return None
+        digest = _digest(jti)
+        index = int.from_bytes(digest[:8], "little") & self._mask
+        for _ in range(self.capacity):
+            slot_digest, expires = _SLOT.unpack_from(mm, _HEADER_SIZE + index * _SLOT.size)
+            if slot_digest == _EMPTY:
+                break
+            if slot_digest == digest:
+                if expires > time.time():
+                    return True
+                break
+            index = (index + 1) & self._mask
+        if issued_at is not None and issued_at > header[4] - SYNC_OVERLAP_SECONDS:
+            return None
+        return False
+
+    def add(self, jti: str, expires_at: float | None) -> bool:
+        """登出时调用：写入一条吊销记录，同一主机的所有Worker立即可见。"""
+        if self._mmap is None:
+            return False
+        with self._write_lock():
+            return self._insert(_digest(jti), int(expires_at) if expires_at else _NO_EXPIRY, time.time())
+
+    def _insert(self, digest: bytes, expires: int, now: float) -> bool:
+        # 调用方需持有写锁
+        mm = self._mmap
+        _, _, count, last_synced_id, last_synced_at, overflow = self._header()[:6]
+        index = int.from_bytes(digest[:8], "little") & self._mask
+        reusable = None
+        for _ in range(self.capacity):
+            offset = _HEADER_SIZE + index * _SLOT.size
+            slot_digest, slot_expires = _SLOT.unpack_from(mm, offset)
+            if slot_digest == digest:
+                _SLOT.pack_into(mm, offset, digest, max(slot_expires, expires))
+                return True
+            if slot_digest == _EMPTY:
+                break
+            if reusable is None and slot_expires <= now:
+                reusable = offset
+            index = (index + 1) & self._mask
+        else:
+            offset = None
+        if reusable is not None:
+            # 复用已过期的槽位：先写过期时间再写摘要，读者不会看到"新摘要 + 旧过期时间"
+            mm[reusable + 16:reusable + 24] = struct.pack("<q", expires)
+            mm[reusable:reusable + 16] = digest
+            return True
+        if offset is None or count + 1 > self.capacity * _MAX_LOAD:
+            if not overflow:
+                logger.warning("共享吊销表已满 ({} 个槽位)，回退到进程内索引，请调大 SHARED_REVOCATION_CAPACITY。",
+                               self.capacity)
+                self._write_header(count, last_synced_id, last_synced_at, 1)
+            return False
+        # 新槽位：先写过期时间，最后写摘要 (摘要非零即对读者可见)
+        mm[offset + 16:offset + 24] = struct.pack("<q", expires)
+        mm[offset:offset + 16] = digest
+        self._write_header(count + 1, last_synced_id, last_synced_at, overflow)
+        return True
+
+    def maybe_sync(self, model, batch_size: int = 10000) -> int:
+        """
+        距上次同步 (任一Worker) 超过间隔时，增量拉取 id > 回看起点 的未过期黑名单记录。
+        回看起点是至少 SYNC_OVERLAP_SECONDS 秒前的水位线 (最多回看两个窗口)，窗口内重复读到的记录按摘要去重。
+        同一时刻只有一个Worker执行同步，其他Worker直接跳过。
+        """
+        if self._mmap is None:
+            return 0
+        now = time.time()
+        if self._checked_pid == os.getpid() and now - self._header()[4] < self._sync_interval:
+            return 0
+        with self._write_lock(blocking=False) as acquired:
+            if not acquired:
+                return 0
+            _, _, count, last_synced_id, last_synced_at, overflow, floor_id, pending_id, pending_at = self._header()
+            first_check = self._checked_pid != os.getpid()
+            if not first_check and now - last_synced_at < self._sync_interval:
+                return 0
+            from ..extensions import db
+
+            with replica_reads(), maintenance_queries():
+                if first_check:
+                    # 文件可能来自之前连接的另一个数据库实例 (例如测试库被重建)：水位线超过当前最大ID则清空重建
+                    max_id = db.session.execute(select(func.max(model.id))).scalar() or 0
+                    if last_synced_id > max_id:
+                        logger.warning("共享吊销表的同步水位线 {} 超过数据库最大ID {}，重建共享吊销表。",
+                                       last_synced_id, max_id)
+                        self._mmap[_HEADER_SIZE:] = bytes(len(self._mmap) - _HEADER_SIZE)
+                        count = last_synced_id = overflow = floor_id = pending_id = 0
+                        last_synced_at = pending_at = 0.0
+                        self._write_header(0, 0, 0.0, 0)
+                        self._write_overlap(0, 0, 0.0)
+                    self._checked_pid = os.getpid()
+                added = 0
+                current = datetime.now(timezone.utc)
+                cursor = floor_id
+                while True:
+                    rows = db.session.execute(
+                        select(model.id, model.jti, model.expires_at)
+                        .where(model.id > cursor)
+                        .where(or_(model.expires_at.is_(None), model.expires_at >= current))
+                        .order_by(model.id)
+                        .limit(batch_size)
+                    ).all()
+                    for _, jti, expires_at in rows:
+                        if expires_at is not None and expires_at.tzinfo is None:
+                            expires_at = expires_at.replace(tzinfo=timezone.utc)
+                        self._insert(_digest(jti), int(expires_at.timestamp()) if expires_at else _NO_EXPIRY, now)
+                    if rows:
+                        cursor = rows[-1][0]
+                        added += sum(row_id > last_synced_id for row_id, _, _ in rows)
+                        last_synced_id = max(last_synced_id, cursor)
+                    if len(rows) < batch_size:
+                        break
+            _, _, count, _, _, overflow = self._header()[:6]
+            self._write_header(count, last_synced_id, now, overflow)
+            if last_synced_at == 0.0:
+                # 首次全量加载：暂时只回看最近的ID，避免在第一个窗口内反复全表重扫
+                self._write_overlap(max(last_synced_id - SYNC_OVERLAP_ROWS, 0), last_synced_id, now)
+            elif now - pending_at >= SYNC_OVERLAP_SECONDS:
+                # 待生效的水位线已超过一个窗口，提升为回看起点，并记录本次的水位线
+                self._write_overlap(pending_id, last_synced_id, now)
+            return added
@@ -0,0 +1,134 @@
+# backend/app/services/signing_keys.py
+import hashlib
+import json
+from pathlib import Path
+
+from loguru import logger
+
+# 支持的非对称签名算法。HS256等对称算法仍由 JWT_SECRET_KEY 签名，不使用密钥环
+ASYMMETRIC_ALGORITHMS = ("RS256", "RS384", "RS512", "EdDSA")
+
+
+class SigningKeyRing:
+    """
+    JWT非对称签名密钥环。
+    JWT_KEYS_DIR 目录下每个 `<kid>.pem` 是一把私钥 (或 `<kid>.pub.pem` 只含公钥，用于仍需校验但已不再签名的旧密钥)。
+    - 签名: 使用 JWT_ACTIVE_KID 对应的私钥，并在Token头部写入 kid。
+    - 校验: 按Token头部的 kid 选择公钥，目录中的所有公钥都被接受。
+    - 发布: 所有公钥以JWKS格式通过 /.well-known/jwks.json 发布，下游服务可在本地校验Token。
+    密钥轮换 (新旧密钥重叠):
+      1. 生成新密钥放入目录并重启 (此时新公钥已发布，但仍用旧密钥签名)；
+      2. 等待超过JWKS缓存时间后，把 JWT_ACTIVE_KID 切换为新kid；
+      3. 再等待超过Token最长有效期后，删除旧密钥文件。
+    """
+
+    def __init__(self):
+        self.enabled: bool = False
+        self.algorithm: str = "HS256"
+        self.active_kid: str | None = None
+        self._private_keys: dict = {}
+        self._public_keys: dict = {}
+        self.jwks_json: bytes = b'{"keys": []}'
+        self.jwks_etag: str = ""
+
+    def init_app(self, app) -> None:
+        self.algorithm = app.config.get("JWT_ALGORITHM", "HS256")
+        self.enabled = self.algorithm in ASYMMETRIC_ALGORITHMS
+        self._private_keys, self._public_keys = {}, {}
+        self.active_kid = None
+        if not self.enabled:
+            self._build_jwks()
+            self._reset_loaders()
+            return
+
+        keys_dir = Path(app.config.get("JWT_KEYS_DIR") or "keys")
+        self.load_dir(keys_dir)
+        self.active_kid = app.config.get("JWT_ACTIVE_KID")
+        if not self.active_kid and self._private_keys:
+            self.active_kid = sorted(self._private_keys)[-1]
+        if self.active_kid not in self._private_keys:
+            raise ValueError(f"JWT签名密钥 '{self.active_kid}' 不存在于 {keys_dir}，"
+                             f"请使用 `flask generate-signing-key` 生成或检查 JWT_ACTIVE_KID 配置。")
+        # Flask-JWT-Extended 根据这些配置选择签名/校验算法
+        app.config["JWT_DECODE_ALGORITHMS"] = [self.algorithm]
+        self._register_loaders()
+        logger.info("JWT使用 {} 签名，当前kid: {}，已发布 {} 把公钥。",
+                    self.algorithm, self.active_kid, len(self._public_keys))
+
+    def load_dir(self, keys_dir: Path) -> None:
+        from cryptography.hazmat.primitives import serialization
+
+        for path in sorted(keys_dir.glob("*.pem")):
+            data = path.read_bytes()
+            if path.name.endswith(".pub.pem"):
+                kid = path.name[:-len(".pub.pem")]
+                self._public_keys[kid] = serialization.load_pem_public_key(data)
+            else:
+                kid = path.stem
+                private_key = serialization.load_pem_private_key(data, password=None)
+                self._private_keys[kid] = private_key
+                self._public_keys[kid] = private_key.public_key()
+        self._build_jwks()
+
+    def _build_jwks(self) -> None:
+        """预先序列化JWKS文档并计算ETag，请求时直接返回字节串。"""
+        keys = []
+        if self._public_keys:
+            from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+            to_jwk = OKPAlgorithm.to_jwk if self.algorithm == "EdDSA" else RSAAlgorithm.to_jwk
+            for kid, public_key in sorted(self._public_keys.items()):
+                jwk = to_jwk(public_key, as_dict=True)
+                # PyJWT会附带 key_ops，RFC 7517 §4.3 不建议与 use 同时出现，只保留 use: "sig"
+                jwk.pop("key_ops", None)
+                jwk.update({"kid": kid, "use": "sig", "alg": self.algorithm})
+                keys.append(jwk)
+        self.jwks_json = json.dumps({"keys": keys}, separators=(",", ":")).encode("utf-8")
+        self.jwks_etag = hashlib.sha256(self.jwks_json).hexdigest()[:32]
+
+    def _register_loaders(self) -> None:
+        from ..extensions import jwt
+
+        @jwt.encode_key_loader
+        def _encode_key(identity):
+            return self._private_keys[self.active_kid]
+
+        @jwt.decode_key_loader
+        def _decode_key(jwt_header: dict, jwt_payload: dict):
+            public_key = self._public_keys.get(jwt_header.get("kid"))
+            if public_key is None:
+                # 未知kid：返回一个不匹配的公钥，让签名校验失败 (按无效Token处理)
+                return self._public_keys[self.active_kid]
+            return public_key
+
+        @jwt.additional_headers_loader
+        def _kid_header(identity) -> dict:
+            return {"kid": self.active_kid}
+
+    @staticmethod
+    def _reset_loaders() -> None:
+        # 对称签名模式下恢复Flask-JWT-Extended的默认回调 (使用JWT_SECRET_KEY)
+        from flask_jwt_extended.default_callbacks import (
+            default_decode_key_callback, default_encode_key_callback, default_jwt_headers_callback,
+        )
+        from ..extensions import jwt
+
+        jwt.encode_key_loader(default_encode_key_callback)
+        jwt.decode_key_loader(default_decode_key_callback)
+        jwt.additional_headers_loader(default_jwt_headers_callback)
+
+
+def generate_private_key_pem(algorithm: str) -> bytes:
+    """生成一把新的私钥 (PEM格式，未加密)。"""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+    if algorithm == "EdDSA":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
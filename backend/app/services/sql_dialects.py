@@ -0,0 +1,17 @@
+# backend/app/services/sql_dialects.py
+from sqlalchemy import Table, insert
+
+
+def insert_ignore(table: Table, dialect_name: str):
+    """
+    构造"遇到唯一约束冲突则跳过"的INSERT (单行或多行)，重复数据交给数据库的唯一索引处理，无需预先查询。
+    执行结果的 rowcount 即实际插入的行数。
+    """
+    if dialect_name == "mysql":
+        return insert(table).prefix_with("IGNORE")
+    if dialect_name == "sqlite":
+        return insert(table).prefix_with("OR IGNORE")
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(table).on_conflict_do_nothing()
+    raise ValueError(f"不支持的数据库方言: {dialect_name}")
@@ -0,0 +1,145 @@
+# backend/app/services/user_import.py
+import csv
+import json
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Iterator
+
+from loguru import logger
+from werkzeug.security import generate_password_hash
+
+from .sql_dialects import insert_ignore
+
+
+@dataclass
+class ImportStats:
+    """批量导入的统计结果。"""
+    processed: int = 0  # 已处理的输入记录数 (包含跳过的无效记录)
+    inserted: int = 0  # 实际插入的用户数
+    duplicates: int = 0  # 因用户名/邮箱已存在而被唯一约束忽略的记录数
+    invalid: int = 0  # 被拒绝的无效记录数 (用户名或密码缺失、为空或不是字符串)
+
+
+def iter_records(path: Path, file_format: str) -> Iterator[dict]:
+    """流式读取CSV或JSON Lines文件，每次只在内存中保留一条记录。"""
+    with path.open("r", encoding="utf-8", newline="") as f:
+        if file_format == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+# 与 /api/auth/register 相同的校验规则
+MIN_PASSWORD_LENGTH = 6
+
+
+def normalize_record(record: dict) -> dict | None:
+    """
+    按注册接口的规则校验一条输入记录: 用户名去除首尾空白后不能为空，
+    明文密码不少于 MIN_PASSWORD_LENGTH 个字符 (已有的 password_hash 原样使用)。
+    :return: 规范化后的记录 (username已去除空白)；无效时返回None。
+    """
+    username, password, password_hash = record.get("username"), record.get("password"), record.get("password_hash")
+    if not isinstance(username, str) or not username.strip():
+        return None
+    if isinstance(password_hash, str) and password_hash:
+        password = None
+    elif isinstance(password, str) and len(password) >= MIN_PASSWORD_LENGTH:
+        password_hash = None
+    else:
+        return None
+    email = record.get("email")
+    return {"username": username.strip(), "password": password, "password_hash": password_hash,
+            "email": (email.strip() or None) if isinstance(email, str) else None}
+
+
+def _hash_chunk(passwords: list[str], method: str) -> list[str]:
+    # 在子进程中执行：一个任务处理一批密码，减少进程间通信次数
+    return [generate_password_hash(password, method=method) for password in passwords]
+
+
+class Checkpoint:
+    """记录已提交的输入记录数，导入中断后可从该位置继续。写入时先写临时文件再原子替换。"""
+
+    def __init__(self, path: Path | None):
+        self.path = path
+
+    def load(self) -> int:
+        if self.path is None or not self.path.exists():
+            return 0
+        return int(json.loads(self.path.read_text(encoding="utf-8"))["processed"])
+
+    def save(self, processed: int) -> None:
+        if self.path is None:
+            return
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps({"processed": processed}), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+def import_users(path: Path, file_format: str, batch_size: int = 1000, workers: int | None = None,
+                 checkpoint_path: Path | None = None) -> ImportStats:
+    """
+    从CSV/JSON Lines文件批量导入用户。
+    - 内存占用恒定：按batch_size分批读取，同一时刻最多两批记录在内存中。
+    - 并行哈希：密码在进程池中哈希，当前批次写库的同时下一批次已在计算哈希。
+    - 批量写入：每批一条多行INSERT并提交一次，重复用户名由唯一约束忽略。
+    - 断点续传：每批提交后保存检查点，重新运行时跳过已提交的记录。
+    记录字段: username (必填)、password 或 password_hash (二选一，后者为已有的werkzeug格式哈希)、email (可选)。
+    无效记录 (见 normalize_record) 计入 invalid，不写入数据库。
+    """
+    from ..extensions import db, password_hasher
+    from ..models.user_model import User
+
+    checkpoint = Checkpoint(checkpoint_path)
+    stats = ImportStats(processed=checkpoint.load())
+    if stats.processed:
+        logger.info("从检查点继续导入，跳过前 {} 条记录。", stats.processed)
+    records = islice(iter_records(path, file_format), stats.processed, None)
+    statement = insert_ignore(User.__table__, db.engine.dialect.name)
+    workers = workers or os.cpu_count() or 1
+    method = password_hasher.policy.method_string  # 与注册使用相同的哈希策略
+
+    def next_batch(pool: ProcessPoolExecutor) -> tuple[list[dict], list[Future], int] | None:
+        raw = list(islice(records, batch_size))
+        if not raw:
+            return None
+        valid = [record for record in map(normalize_record, raw) if record is not None]
+        to_hash = [r["password"] for r in valid if not r["password_hash"]]
+        # 把一批密码平均切分给所有子进程
+        chunk_size = max(-(-len(to_hash) // workers), 1)
+        futures = [pool.submit(_hash_chunk, to_hash[i:i + chunk_size], method)
+                   for i in range(0, len(to_hash), chunk_size)]
+        return valid, futures, len(raw)
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pending = next_batch(pool)
+        while pending is not None:
+            valid, futures, raw_count = pending
+            pending = next_batch(pool)  # 提前提交下一批的哈希任务，与本批写库并行
+            hashes = (password_hash for future in futures for password_hash in future.result())
+            rows = [{
+                "username": r["username"],
+                "email": r["email"],
+                "password_hash": r["password_hash"] or next(hashes),
+            } for r in valid]
+            if rows:
+                # 通过Core连接执行 (绕过ORM单元工作)，驱动会将其改写为多行INSERT
+                result = db.session.connection().execute(statement, rows)
+                db.session.commit()
+                inserted = max(result.rowcount, 0)
+            else:
+                inserted = 0
+            stats.processed += raw_count
+            stats.inserted += inserted
+            stats.duplicates += len(rows) - inserted
+            stats.invalid += raw_count - len(valid)
+            checkpoint.save(stats.processed)
+            logger.info("已处理 {} 条记录，插入 {} 个用户。", stats.processed, stats.inserted)
+    return stats
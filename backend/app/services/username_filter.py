@@ -0,0 +1,141 @@
+# backend/app/services/username_filter.py
+import threading
+import time
+from collections import deque
+
+from loguru import logger
+from sqlalchemy import func, select
+
+from .db_routing import replica_reads
+from .query_profiler import maintenance_queries
+from .revocation_index import BloomFilter, RevocationIndex
+
+
+class UsernameFilter:
+    """
+    已占用用户名的进程内布隆过滤器 (USERNAME_FILTER_ENABLED=True 时启用)。
+    - "一定未被占用"的判断不访问数据库：用户名可用性检查 (含注册前的检查和前端实时校验) 绝大多数在内存中完成。
+    - "可能已被占用"时由调用方回查数据库确认。
+    - 按自增ID增量同步其他进程新注册的用户名。同步间隔内其他进程刚注册的用户名可能被判为可用，
+      但注册最终由 users.username 的唯一索引兜底，不会产生重复用户。
+      与吊销索引相同，每次同步都从 SYNC_OVERLAP_SECONDS 秒前的同步位置重新扫描，补上ID较小但较晚提交 (或较晚复制到副本) 的用户名。
+    - 用户名按 casefold() 后的形式存入和查询，与 users.username 在MySQL默认 *_ci 排序规则下大小写不敏感的唯一性一致。
+    """
+
+    # 增量同步时回看的时间窗口(秒)，与 RevocationIndex 一致
+    SYNC_OVERLAP_SECONDS = RevocationIndex.SYNC_OVERLAP_SECONDS
+    # 还没有足够早的检查点时，改为回看最近这么多个ID
+    SYNC_OVERLAP_ROWS = RevocationIndex.SYNC_OVERLAP_ROWS
+
+    def __init__(self):
+        self.enabled: bool = False
+        self._bloom: BloomFilter | None = None
+        self._capacity: int = 1_000_000
+        self._error_rate: float = 0.001
+        self._sync_interval: float = 5.0
+        self._last_synced_id: int = 0
+        self._last_synced_at: float = 0.0
+        self._checkpoints: deque[tuple[float, int]] = deque()  # (同步开始时间, 同步到的ID)，用于确定回看起点
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        self.enabled = app.config.get("USERNAME_FILTER_ENABLED", False)
+        self._capacity = app.config.get("USERNAME_FILTER_CAPACITY", 1_000_000)
+        self._error_rate = app.config.get("USERNAME_FILTER_ERROR_RATE", 0.001)
+        self._sync_interval = app.config.get("USERNAME_FILTER_SYNC_INTERVAL", 5.0)
+        self._bloom = None
+        self._last_synced_id = 0
+        self._last_synced_at = 0.0
+        self._checkpoints.clear()
+
+    def load(self, model) -> None:
+        """启动时从users表构建过滤器，容量按最大ID估算并预留增长空间。"""
+        from ..extensions import db
+
+        with replica_reads(), maintenance_queries():
+            max_id = db.session.execute(select(func.max(model.id))).scalar() or 0
+        with self._lock:
+            self._bloom = BloomFilter(max(self._capacity, int(max_id * 1.5)), self._error_rate)
+            self._last_synced_id = 0
+            self._checkpoints.clear()
+        self.sync(model)
+        logger.info("用户名过滤器已加载: {} 个用户名, {:.1f} MB", self._bloom.count, self._bloom.size_bytes / 1024 / 1024)
+
+    def sync(self, model, batch_size: int = 10000) -> int:
+        """
+        增量拉取用户名 (只选取id和username两列，按批读取)。
+        扫描起点是 SYNC_OVERLAP_SECONDS 秒前的同步位置，回看窗口内重复读到的用户名已在过滤器中时不重复加入。
+        """
+        from ..extensions import db
+
+        if not self._sync_lock.acquire(blocking=False):
+            return 0
+        try:
+            added = 0
+            started = time.monotonic()
+            horizon = started - self.SYNC_OVERLAP_SECONDS
+            checkpoints = self._checkpoints
+            while len(checkpoints) > 1 and checkpoints[1][0] <= horizon:
+                checkpoints.popleft()
+            if checkpoints and checkpoints[0][0] <= horizon:
+                cursor = checkpoints[0][1]
+            else:
+                cursor = max(self._last_synced_id - self.SYNC_OVERLAP_ROWS, 0)
+            while True:
+                with replica_reads(), maintenance_queries():
+                    rows = db.session.execute(
+                        select(model.id, model.username)
+                        .where(model.id > cursor)
+                        .order_by(model.id)
+                        .limit(batch_size)
+                    ).all()
+                if not rows:
+                    break
+                for row_id, username in rows:
+                    if row_id > self._last_synced_id or not self._contains(username):
+                        self.add(username)
+                        added += 1
+                cursor = rows[-1][0]
+                self._last_synced_id = max(self._last_synced_id, cursor)
+                if len(rows) < batch_size:
+                    break
+            checkpoints.append((started, self._last_synced_id))
+            self._last_synced_at = time.monotonic()
+            return added
+        finally:
+            self._sync_lock.release()
+
+    @staticmethod
+    def _key(username: str) -> str:
+        return username.casefold()
+
+    def _contains(self, username: str) -> bool:
+        with self._lock:
+            return self._bloom is not None and self._key(username) in self._bloom
+
+    def add(self, username: str) -> None:
+        """注册成功后调用：立即在本进程内标记该用户名为已占用。"""
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(self._key(username))
+
+    def might_be_taken(self, username: str, model) -> bool:
+        """
+        :return: False表示用户名一定未被占用 (无需查询数据库)；True表示可能已被占用，需回查数据库确认。
+        过滤器未启用或尚未能加载时一律返回True。
+        """
+        if not self.enabled:
+            return True
+        try:
+            if self._bloom is None:
+                self.load(model)
+            elif time.monotonic() - self._last_synced_at >= self._sync_interval:
+                self.sync(model)
+        except Exception as e:
+            from ..extensions import db
+            db.session.rollback()
+            logger.warning("用户名过滤器同步失败，回退到数据库查询: {}", e)
+            if self._bloom is None:
+                return True
+        return self._key(username) in self._bloom
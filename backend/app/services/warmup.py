@@ -0,0 +1,100 @@
+# backend/app/services/warmup.py
+import time
+import uuid
+
+from flask import Flask
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
+
+
+def reinit_after_fork(app: Flask) -> None:
+    """
+    在fork出的Worker进程中调用：丢弃从主进程继承的数据库连接，让每个Worker建立自己的连接池。
+    close=False 表示不关闭父进程仍可能在使用的底层连接，只是让本进程不再使用它们。
+    """
+    from ..extensions import db, replica_router
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    for engine in replica_router.engines:
+        engine.dispose(close=False)
+
+
+def _open_pool_connections(app: Flask) -> int:
+    """预先建立连接池中的常驻连接，避免首批请求承担建连开销。"""
+    from ..extensions import db
+
+    size = (app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}).get("pool_size", 1)
+    connections = []
+    try:
+        for _ in range(size):
+            connections.append(db.engine.connect())
+    finally:
+        for conn in connections:
+            conn.close()  # 归还到连接池，连接本身保持打开
+    return len(connections)
+
+
+def warmup(app: Flask) -> dict:
+    """
+    在开始接收流量之前预热：建立数据库连接、执行一遍热点查询 (编译并缓存SQL)、
+    加载 (或增量同步) 吊销索引和会话吊销时间戳、预热Principal缓存、启动密码哈希进程池并初始化JWT编解码。
+    :return: 各步骤耗时 (毫秒)，便于在部署日志中观察。
+    """
+    from flask_jwt_extended import create_access_token, decode_token
+
+    from ..extensions import (db, password_hasher, principal_cache, revocation_index, session_revocations,
+                              shared_revocations)
+    from ..models.token_model import TokenBlocklist
+    from ..models.user_model import LOGIN_COLUMNS, PRINCIPAL_COLUMNS, User, load_principal
+    from .principal_cache import Principal
+
+    timings: dict[str, float] = {}
+
+    def step(name: str, func) -> None:
+        start = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning("预热步骤 {} 失败: {}", name, e)
+        timings[name] = round((time.perf_counter() - start) * 1000, 2)
+
+    def hot_queries() -> None:
+        # 执行一次各热点查询，使SQLAlchemy编译缓存命中，首个真实请求不再承担编译开销
+        TokenBlocklist.query.filter_by(jti=str(uuid.uuid4())).one_or_none()
+        User.query.options(load_only(*LOGIN_COLUMNS)).filter_by(username=f"warmup-{uuid.uuid4()}").first()
+        load_principal(f"warmup-{uuid.uuid4()}")
+
+    def prime_principals() -> None:
+        count = app.config.get("WARMUP_PRINCIPALS", 0)
+        if count:
+            # 按主键倒序取最近注册的用户：走主键索引，不需要在updated_at上额外建索引
+            rows = db.session.execute(
+                select(*PRINCIPAL_COLUMNS).where(User.is_active.is_(True)).order_by(User.id.desc()).limit(count)
+            ).all()
+            for row in rows:
+                principal_cache.put(Principal(*row))
+
+    def jwt_roundtrip() -> None:
+        with app.test_request_context():
+            decode_token(create_access_token(identity="warmup"))
+
+    with app.app_context():
+        step("db_connections", lambda: _open_pool_connections(app))
+        step("hot_queries", hot_queries)
+        if shared_revocations.enabled:
+            step("shared_revocations", lambda: shared_revocations.maybe_sync(TokenBlocklist))
+        if revocation_index.enabled:
+            # 预加载模式下主进程已构建好索引：Worker只增量同步，保留写时复制共享的过滤器，不再全表扫描
+            step("revocation_index", lambda: revocation_index.sync(TokenBlocklist) if revocation_index.loaded
+                 else revocation_index.load(TokenBlocklist))
+        step("session_revocations", lambda: session_revocations.sync(User))
+        step("principal_cache", prime_principals)
+        step("password_hasher", lambda: password_hasher.verify(password_hasher.hash("warmup"), "warmup"))
+        step("jwt", jwt_roundtrip)
+        db.session.remove()
+    logger.info("预热完成，各步骤耗时(ms): {}", timings)
+    return timings
@@ -0,0 +1,7 @@
+# backend/benchmarks/__init__.py
+# 认证热路径的微基准测试。运行方式 (在backend目录下):
+#   python -m benchmarks --output results.json
+#   python -m benchmarks --baseline results.json --threshold 0.2   # 与上次结果对比，退化超过20%时以非零状态退出
+# 端到端压测 (真实蓝图 + 会话组合，输出各端点的延迟分位数和错误率):
+#   python -m benchmarks.load_generator --duration 30 --concurrency 16
+#   python -m benchmarks.load_generator --url http://127.0.0.1:5000 --rate 200 --poisson
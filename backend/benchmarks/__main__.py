@@ -0,0 +1,42 @@
+# backend/benchmarks/__main__.py
+import argparse
+import json
+import sys
+
+from .auth_benchmarks import compare, run_all
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="认证热路径微基准测试，结果以JSON输出。")
+    parser.add_argument("--iterations", type=int, default=2000, help="每个基准项的执行次数")
+    parser.add_argument("--hash-iterations", type=int, default=20, help="密码哈希/校验的执行次数 (单次耗时较长)")
+    parser.add_argument("--blocklist-sizes", default="0,10000,1000000",
+                        help="黑名单表的预置行数，逗号分隔")
+    parser.add_argument("--output", default=None, help="结果输出文件，不指定则输出到标准输出")
+    parser.add_argument("--baseline", default=None, help="用于对比的历史结果JSON文件")
+    parser.add_argument("--threshold", type=float, default=0.2, help="p50耗时相对基线的最大允许退化比例")
+    args = parser.parse_args()
+
+    blocklist_sizes = [int(size) for size in args.blocklist_sizes.split(",") if size.strip()]
+    report = run_all(args.iterations, args.hash_iterations, blocklist_sizes)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        report["regressions"] = [r["name"] for r in regressions]
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    for r in regressions:
+        print(f"性能退化: {r['name']} {r['params']} p50变化 {r['p50_change_vs_baseline']:+.1%}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
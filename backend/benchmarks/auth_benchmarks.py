@@ -0,0 +1,191 @@
+# backend/benchmarks/auth_benchmarks.py
+import json
+import platform
+import statistics
+import subprocess
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
+
+import jwt as pyjwt
+from flask import Flask
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token
+from flask_jwt_extended.exceptions import RevokedTokenError
+from flask_jwt_extended.internal_utils import verify_token_not_blocklisted
+from sqlalchemy import insert
+
+from app import create_app
+from app.extensions import db, password_hasher, revocation_index
+from app.models import TokenBlocklist, User
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def measure(name: str, func: Callable[[], object], iterations: int, warmup: int = 10, **params) -> dict:
+    """
+    多次执行func并统计耗时分布 (单位: 微秒)。
+    :param name: 基准项名称。
+    :param params: 附加在结果中的参数 (例如黑名单行数)，便于对比时区分同名基准项。
+    """
+    for _ in range(warmup):
+        func()
+    samples: list[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        func()
+        samples.append((time.perf_counter_ns() - start) / 1000)
+    samples.sort()
+
+    def percentile(p: float) -> float:
+        return samples[min(int(len(samples) * p), len(samples) - 1)]
+
+    mean = statistics.fmean(samples)
+    return {
+        "name": name,
+        "params": params,
+        "iterations": iterations,
+        "mean_us": round(mean, 3),
+        "p50_us": round(percentile(0.50), 3),
+        "p95_us": round(percentile(0.95), 3),
+        "p99_us": round(percentile(0.99), 3),
+        "min_us": round(samples[0], 3),
+        "max_us": round(samples[-1], 3),
+        "ops_per_sec": round(1_000_000 / mean, 1) if mean else None,
+    }
+
+
+def seed_blocklist(rows: int, batch_size: int = 50_000) -> None:
+    """清空并写入rows条未过期的黑名单记录 (批量多行插入)。"""
+    db.session.execute(TokenBlocklist.__table__.delete())
+    expires_at = datetime.now(timezone.utc) + timedelta(days=1)
+    for start in range(0, rows, batch_size):
+        db.session.execute(insert(TokenBlocklist), [
+            {"jti": str(uuid.uuid4()), "token_type": "access", "user_identity": "bench", "expires_at": expires_at}
+            for _ in range(min(batch_size, rows - start))
+        ])
+    db.session.commit()
+
+
+def bench_password_hashing(iterations: int) -> list[dict]:
+    stored_hash = password_hasher.hash("benchmark-password")
+    return [
+        measure("password_hash", lambda: password_hasher.hash("benchmark-password"), iterations, warmup=2),
+        measure("password_verify", lambda: password_hasher.verify(stored_hash, "benchmark-password"),
+                iterations, warmup=2),
+    ]
+
+
+def bench_token_creation(iterations: int) -> list[dict]:
+    claims = {"roles": ["user"], "uid": 1, "ver": 1}
+    return [
+        measure("create_access_token",
+                lambda: create_access_token(identity="bench", fresh=True, additional_claims=claims), iterations),
+        measure("create_refresh_token",
+                lambda: create_refresh_token(identity="bench", additional_claims=claims), iterations),
+    ]
+
+
+def bench_token_verification(app: Flask, iterations: int, blocklist_sizes: list[int]) -> list[dict]:
+    """JWT解码 + 黑名单检查，分别在不同的黑名单规模、开启/关闭吊销索引下测量。"""
+    results = []
+    for size in blocklist_sizes:
+        seed_blocklist(size)
+        # TestingConfig中的Token有效期只有几秒，大黑名单的预置和测量会超过它，因此显式指定较长的有效期
+        active_token = create_access_token(identity="bench", expires_delta=timedelta(hours=1))
+        revoked_token = create_access_token(identity="bench", expires_delta=timedelta(hours=1))
+        revoked_jti = decode_token(revoked_token)["jti"]
+        db.session.add(TokenBlocklist(jti=revoked_jti, token_type="access", user_identity="bench",
+                                      expires_at=datetime.now(timezone.utc) + timedelta(days=1)))
+        db.session.commit()
+
+        for index_enabled in (True, False):
+            revocation_index.enabled = index_enabled
+            if index_enabled:
+                revocation_index.load(TokenBlocklist)
+
+            def verify(token: str) -> bool:
+                payload = decode_token(token)
+                try:
+                    verify_token_not_blocklisted(pyjwt.get_unverified_header(token), payload)
+                    return False
+                except RevokedTokenError:
+                    return True
+
+            assert verify(active_token) is False and verify(revoked_token) is True
+            for label, token in (("active", active_token), ("revoked", revoked_token)):
+                results.append(measure(
+                    "decode_and_check_blocklist", lambda: verify(token), iterations,
+                    blocklist_rows=size, revocation_index=index_enabled, token=label,
+                ))
+    revocation_index.enabled = app.config.get("REVOCATION_INDEX_ENABLED", True)
+    return results
+
+
+def bench_user_lookup(iterations: int, users: int = 1000) -> list[dict]:
+    db.session.execute(insert(User), [
+        {"username": f"bench_user_{i}", "password_hash": "x"} for i in range(users)
+    ])
+    db.session.commit()
+    target = f"bench_user_{users // 2}"
+
+    def lookup():
+        user = User.query.filter_by(username=target).first()
+        db.session.expunge_all()  # 避免命中会话的identity map，测量真实的查询与对象构造开销
+        return user
+
+    return [measure("user_lookup_by_username", lookup, iterations, users=users)]
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_all(iterations: int, hash_iterations: int, blocklist_sizes: list[int]) -> dict:
+    """在TestingConfig (内存SQLite) 下运行全部基准项，返回可序列化为JSON的结果。"""
+    app = create_app('test')
+    with app.app_context():
+        db.create_all()
+        results = []
+        results += bench_password_hashing(hash_iterations)
+        results += bench_token_creation(iterations)
+        results += bench_user_lookup(iterations)
+        results += bench_token_verification(app, iterations, blocklist_sizes)
+        db.drop_all()
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": "test",
+        },
+        "results": results,
+    }
+
+
+def result_key(result: dict) -> str:
+    return json.dumps([result["name"], result["params"]], sort_keys=True)
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[dict]:
+    """
+    与基线结果逐项对比p50耗时。
+    :return: 退化超过threshold (例如0.2表示慢了20%) 的基准项列表。
+    """
+    baseline_by_key = {result_key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        previous = baseline_by_key.get(result_key(result))
+        if not previous or not previous["p50_us"]:
+            continue
+        change = result["p50_us"] / previous["p50_us"] - 1
+        result["p50_change_vs_baseline"] = round(change, 4)
+        if change > threshold:
+            regressions.append(result)
+    return regressions
@@ -0,0 +1,476 @@
+# backend/benchmarks/load_generator.py
+"""
+端到端压测：按可配置的会话组合驱动真实的认证蓝图，输出每个端点的延迟分位数和错误率。
+运行方式 (在backend目录下):
+  python -m benchmarks.load_generator --duration 30 --concurrency 16                  # 进程内 (Flask测试客户端)
+  python -m benchmarks.load_generator --url http://127.0.0.1:5000 --rate 200          # 压测已启动的服务 (python run.py)
+  python -m benchmarks.load_generator --spawn-server --mix me=8,login=1,logout=1      # 自动用run.py启动本地服务
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SCENARIOS = ("register", "login", "me", "refresh", "logout")
+DEFAULT_MIX = "register=1,login=2,me=12,refresh=3,logout=2"
+PASSWORD = "load-test-password"
+
+
+class LatencyHistogram:
+    """
+    HDR风格的对数-线性直方图 (单位: 微秒)：每个2的幂区间再等分为 2**sub_bucket_bits 个子桶，
+    记录耗时O(1)、内存与样本数无关，分位数的相对误差不超过 1/2**sub_bucket_bits (默认约0.8%)。
+    """
+
+    def __init__(self, sub_bucket_bits: int = 7):
+        self._bits = sub_bucket_bits
+        self._counts: Counter[int] = Counter()
+        self.count: int = 0
+        self.total: int = 0
+        self.min: int | None = None
+        self.max: int = 0
+
+    def _key(self, value: int) -> int:
+        shift = max(value.bit_length() - self._bits - 1, 0)
+        return (shift << (self._bits + 1)) | (value >> shift)
+
+    def _highest_equivalent(self, key: int) -> int:
+        shift, mantissa = key >> (self._bits + 1), key & ((1 << (self._bits + 1)) - 1)
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value_us: float) -> None:
+        value = max(int(value_us), 0)
+        self._counts[self._key(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, p: float) -> int:
+        if not self.count:
+            return 0
+        target = max(int(self.count * p / 100 + 0.5), 1)
+        seen = 0
+        for key in sorted(self._counts):
+            seen += self._counts[key]
+            if seen >= target:
+                return min(self._highest_equivalent(key), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        ms = lambda us: round(us / 1000, 3)  # noqa: E731
+        return {
+            "mean_ms": ms(self.total / self.count) if self.count else 0.0,
+            "p50_ms": ms(self.percentile(50)),
+            "p90_ms": ms(self.percentile(90)),
+            "p99_ms": ms(self.percentile(99)),
+            "p99_9_ms": ms(self.percentile(99.9)),
+            "min_ms": ms(self.min or 0),
+            "max_ms": ms(self.max),
+        }
+
+
+class EndpointStats:
+    """单个端点 (或会话类型) 的延迟直方图、状态码分布和错误数。"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.statuses: Counter[str] = Counter()
+        self.errors: int = 0
+
+    def summary(self, duration: float) -> dict:
+        count = self.latency.count
+        return {
+            "count": count,
+            "per_sec": round(count / duration, 1) if duration else None,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "statuses": dict(sorted(self.statuses.items())),
+            **self.latency.summary(),
+        }
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints: dict[str, EndpointStats] = {}
+        self.sessions: dict[str, EndpointStats] = {}
+        self.queue_delay = LatencyHistogram()
+
+    def record(self, table: dict[str, EndpointStats], name: str, latency_us: float, status: str, ok: bool) -> None:
+        with self._lock:
+            stats = table.get(name)
+            if stats is None:
+                stats = table[name] = EndpointStats()
+            stats.latency.record(latency_us)
+            stats.statuses[status] += 1
+            if not ok:
+                stats.errors += 1
+
+
+class InProcessTransport:
+    """通过Flask测试客户端在本进程内调用视图 (不经过网络，每个线程一个客户端)。"""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, body: dict | None, headers: dict) -> tuple[int, dict | None]:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, json=body, headers=headers)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HttpTransport:
+    """通过HTTP访问已启动的服务，每个线程保持一个keep-alive连接。"""
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        parts = urlsplit(base_url)
+        self.host, self.port, self.prefix = parts.hostname, parts.port or 80, parts.path.rstrip("/")
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, body: dict | None, headers: dict) -> tuple[int, dict | None]:
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {**headers, "Content-Type": "application/json"} if payload is not None else headers
+        attempt = 0
+        while True:
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                conn.request(method, self.prefix + path, body=payload, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (ConnectionError, http.client.HTTPException):
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+                attempt += 1  # 服务端关闭了空闲连接，重连一次
+                continue
+            try:
+                return response.status, json.loads(data) if data else None
+            except ValueError:
+                return response.status, None
+
+
+class LoadGenerator:
+    """
+    会话类型 (均只访问公开API):
+    - register: 注册新用户 -> 登录 -> /me
+    - login:    预置用户登录 -> /me
+    - me:       复用预置会话的Access Token连续访问 /me
+    - refresh:  用预置会话的Refresh Token刷新 -> 用新Token访问 /me
+    - logout:   登录 -> /me -> 登出 -> /me (预期401)
+    """
+
+    def __init__(self, transport, mix: dict[str, float], me_per_session: int = 3, seed: int | None = None):
+        self.transport = transport
+        self.mix = mix
+        self.me_per_session = me_per_session
+        self.recorder = Recorder()
+        self.run_id = uuid.uuid4().hex[:8]
+        self.pool: list[dict] = []  # 预置会话: {"username", "access_token", "refresh_token"}
+        self._random = random.Random(seed)
+        self._counter = 0
+        self._lock = threading.Lock()
+        self._scenarios = {name: getattr(self, f"_session_{name}") for name in SCENARIOS}
+
+    # --- 请求与会话 ---
+    def call(self, endpoint: str, method: str, path: str, body: dict | None = None, token: str | None = None,
+             expect: tuple[int, ...] = (200,)) -> tuple[int, dict | None]:
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        start = time.perf_counter()
+        try:
+            status, data = self.transport.request(method, path, body, headers)
+        except Exception as e:
+            self.recorder.record(self.recorder.endpoints, endpoint, (time.perf_counter() - start) * 1e6,
+                                 type(e).__name__, False)
+            raise
+        ok = status in expect
+        self.recorder.record(self.recorder.endpoints, endpoint, (time.perf_counter() - start) * 1e6, str(status), ok)
+        if not ok:
+            raise AssertionError(f"{endpoint} 返回 {status}")
+        return status, data
+
+    def _next_username(self) -> str:
+        with self._lock:
+            self._counter += 1
+            return f"load_{self.run_id}_{self._counter}"
+
+    def _login(self, username: str) -> dict:
+        _, data = self.call("login", "POST", "/api/auth/login", {"username": username, "password": PASSWORD})
+        return data
+
+    def _pooled(self) -> dict:
+        with self._lock:
+            return self._random.choice(self.pool)
+
+    def _session_register(self) -> None:
+        username = self._next_username()
+        self.call("register", "POST", "/api/auth/register", {"username": username, "password": PASSWORD}, expect=(201,))
+        self.call("me", "GET", "/api/me", token=self._login(username)["access_token"])
+
+    def _session_login(self) -> None:
+        self.call("me", "GET", "/api/me", token=self._login(self._pooled()["username"])["access_token"])
+
+    def _session_me(self) -> None:
+        token = self._pooled()["access_token"]
+        for _ in range(self.me_per_session):
+            self.call("me", "GET", "/api/me", token=token)
+
+    def _session_refresh(self) -> None:
+        _, data = self.call("refresh", "POST", "/api/auth/refresh", token=self._pooled()["refresh_token"])
+        self.call("me", "GET", "/api/me", token=data["access_token"])
+
+    def _session_logout(self) -> None:
+        token = self._login(self._pooled()["username"])["access_token"]
+        self.call("me", "GET", "/api/me", token=token)
+        self.call("logout", "DELETE", "/api/auth/logout", token=token)
+        self.call("me_after_logout", "GET", "/api/me", token=token, expect=(401,))
+
+    def run_session(self, scenario: str, scheduled_at: float | None = None) -> None:
+        start = time.perf_counter()
+        if scheduled_at is not None:
+            self.recorder.queue_delay.record((start - scheduled_at) * 1e6)
+        ok = True
+        try:
+            self._scenarios[scenario]()
+        except Exception:
+            ok = False
+        # 开环模式下会话延迟从计划到达时间算起，包含排队时间 (避免协调遗漏低估尾延迟)
+        origin = scheduled_at if scheduled_at is not None else start
+        self.recorder.record(self.recorder.sessions, scenario, (time.perf_counter() - origin) * 1e6,
+                             "ok" if ok else "error", ok)
+
+    def pick_scenario(self) -> str:
+        with self._lock:
+            return self._random.choices(list(self.mix), weights=list(self.mix.values()))[0]
+
+    # --- 预置与执行 ---
+    def prepare(self, users: int, concurrency: int) -> None:
+        """注册并登录预置用户 (不计入结果)，供login/me/refresh/logout会话复用。"""
+        def prepare_one(_) -> dict:
+            username = self._next_username()
+            self.transport.request("POST", "/api/auth/register", {"username": username, "password": PASSWORD}, {})
+            status, data = self.transport.request("POST", "/api/auth/login",
+                                                  {"username": username, "password": PASSWORD}, {})
+            if status != 200:
+                raise RuntimeError(f"预置用户登录失败 ({status}): {data}")
+            return {"username": username, "access_token": data["access_token"],
+                    "refresh_token": data["refresh_token"]}
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            self.pool = list(executor.map(prepare_one, range(users)))
+
+    def run_closed(self, concurrency: int, duration: float, max_sessions: int | None) -> float:
+        """闭环: concurrency个虚拟用户各自连续执行会话，直到时长或会话数达到上限。"""
+        deadline = time.perf_counter() + duration
+        remaining = [max_sessions]
+
+        def worker() -> None:
+            while time.perf_counter() < deadline:
+                with self._lock:
+                    if remaining[0] is not None:
+                        if remaining[0] <= 0:
+                            return
+                        remaining[0] -= 1
+                self.run_session(self.pick_scenario())
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start
+
+    def run_open(self, rate: float, concurrency: int, duration: float, poisson: bool) -> float:
+        """开环: 按固定到达率 (或泊松到达) 发起会话，与服务端响应快慢无关；最多concurrency个会话同时执行。"""
+        start = time.perf_counter()
+        scheduled = start
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            while scheduled < start + duration:
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self.run_session, self.pick_scenario(), scheduled)
+                scheduled += self._random.expovariate(rate) if poisson else 1 / rate
+        return time.perf_counter() - start
+
+    def report(self, duration: float) -> dict:
+        recorder = self.recorder
+        sessions = sum(stats.latency.count for stats in recorder.sessions.values())
+        requests = sum(stats.latency.count for stats in recorder.endpoints.values())
+        errors = sum(stats.errors for stats in recorder.endpoints.values())
+        result = {
+            "throughput": {
+                "duration_s": round(duration, 3),
+                "sessions": sessions,
+                "sessions_per_sec": round(sessions / duration, 1) if duration else None,
+                "requests": requests,
+                "requests_per_sec": round(requests / duration, 1) if duration else None,
+                "errors": errors,
+                "error_rate": round(errors / requests, 4) if requests else 0.0,
+            },
+            "endpoints": {name: stats.summary(duration) for name, stats in sorted(recorder.endpoints.items())},
+            "sessions": {name: stats.summary(duration) for name, stats in sorted(recorder.sessions.items())},
+        }
+        if recorder.queue_delay.count:
+            result["queue_delay"] = recorder.queue_delay.summary()
+        return result
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"未知的会话类型 '{name}'，可选: {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError("会话组合的权重之和必须大于0")
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def create_in_process_app(config_name: str, keep_rate_limit: bool):
+    """创建进程内压测用的应用。测试配置默认改用临时SQLite文件 (内存库只有一个连接，无法并发)。"""
+    if config_name == "test" and not os.getenv("TEST_DATABASE_URI"):
+        os.environ["TEST_DATABASE_URI"] = f"sqlite:///{tempfile.mkdtemp(prefix='flask_token_load_')}/load.db"
+    from app import create_app
+    from app.extensions import db, rate_limiter
+
+    app = create_app(config_name)
+    # 测试配置的Token有效期只有几秒，压测期间预置会话需要一直有效
+    app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=1)
+    app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(hours=2)
+    if not keep_rate_limit:
+        rate_limiter.enabled = False  # 预置用户被反复登录，不关闭限流会很快触发429
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def spawn_server(config_name: str, keep_rate_limit: bool) -> tuple[subprocess.Popen, str]:
+    """用run.py在空闲端口上启动本地服务，等待其可以接受请求。"""
+    if config_name == "test":
+        create_in_process_app(config_name, keep_rate_limit)  # 建好临时SQLite库的表，子进程继承TEST_DATABASE_URI
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    # 关闭调试模式：重载器和调试器会让测得的吞吐量失真
+    env = {**os.environ, "FLASK_CONFIG": config_name, "FLASK_RUN_HOST": "127.0.0.1", "FLASK_RUN_PORT": str(port),
+           "FLASK_DEBUG": "0"}
+    if not keep_rate_limit:
+        env["RATE_LIMIT_ENABLED"] = "false"
+    process = subprocess.Popen([sys.executable, "run.py"], cwd=BACKEND_DIR, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"run.py 启动失败，退出码 {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("等待run.py启动超时")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="认证服务端到端压测，结果以JSON输出。")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", default=None, help="压测已启动的服务，例如 http://127.0.0.1:5000 (默认在进程内压测)")
+    target.add_argument("--spawn-server", action="store_true", help="用run.py在本地启动服务后通过HTTP压测")
+    parser.add_argument("--config", default="test", help="进程内或--spawn-server时使用的配置名 (FLASK_CONFIG)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"会话组合及权重，默认 {DEFAULT_MIX}")
+    parser.add_argument("--concurrency", type=int, default=8, help="并发虚拟用户数 (开环模式下为最多同时执行的会话数)")
+    parser.add_argument("--rate", type=float, default=None, help="开环模式: 每秒发起的会话数；不指定则为闭环模式")
+    parser.add_argument("--poisson", action="store_true", help="开环模式下按泊松过程到达 (默认匀速)")
+    parser.add_argument("--duration", type=float, default=10.0, help="压测时长(秒)")
+    parser.add_argument("--sessions", type=int, default=None, help="闭环模式下最多执行的会话数")
+    parser.add_argument("--users", type=int, default=50, help="预置用户数 (login/me/refresh/logout会话复用)")
+    parser.add_argument("--me-per-session", type=int, default=3, help="me会话中连续访问/me的次数")
+    parser.add_argument("--keep-rate-limit", action="store_true",
+                        help="保留登录限流 (默认关闭；压测外部服务时需以 RATE_LIMIT_ENABLED=false 启动)")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子，使会话序列可复现")
+    parser.add_argument("--output", default=None, help="结果输出文件，不指定则输出到标准输出")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn_server:
+        server, base_url = spawn_server(args.config, args.keep_rate_limit)
+        transport, target_label = HttpTransport(base_url), base_url
+    elif args.url:
+        transport, target_label = HttpTransport(args.url), args.url
+    else:
+        transport, target_label = InProcessTransport(create_in_process_app(args.config, args.keep_rate_limit)), \
+            "in-process"
+
+    try:
+        generator = LoadGenerator(transport, args.mix, args.me_per_session, args.seed)
+        generator.prepare(args.users, args.concurrency)
+        if args.rate:
+            duration = generator.run_open(args.rate, args.concurrency, args.duration, args.poisson)
+        else:
+            duration = generator.run_closed(args.concurrency, args.duration, args.sessions)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    from .auth_benchmarks import git_revision  # 导入时会加载应用，需在进程内应用按压测配置创建之后
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "target": target_label,
+            "config": args.config if target_label == "in-process" or args.spawn_server else None,
+            "mode": "open" if args.rate else "closed",
+            "concurrency": args.concurrency,
+            "rate": args.rate,
+            "mix": args.mix,
+            "users": args.users,
+        },
+        **generator.report(duration),
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+    else:
+        print(output)
+
+    throughput = report["throughput"]
+    print(f"{throughput['sessions_per_sec']} 会话/秒, {throughput['requests_per_sec']} 请求/秒, "
+          f"错误率 {throughput['error_rate']:.2%}", file=sys.stderr)
+    for name, stats in report["endpoints"].items():
+        print(f"  {name:<16} n={stats['count']:<7} p50={stats['p50_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms "
+              f"p99.9={stats['p99_9_ms']:.2f}ms 错误率={stats['error_rate']:.2%}", file=sys.stderr)
+    return 1 if throughput["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+# backend/gunicorn.conf.py
+"""
+Gunicorn生产部署配置:
+    cd backend && gunicorn -c gunicorn.conf.py wsgi:app
+- 预加载 (preload_app): 主进程只执行一次 create_app 和模块导入，Worker通过fork共享这部分内存 (写时复制)。
+- 进程/线程数: 默认按CPU核数计算，可通过环境变量覆盖；每个Worker的密码哈希进程数默认按Worker数均分CPU。
+- fork之后: 每个Worker丢弃继承自主进程的数据库连接，建立自己的连接池 (数据库连接不能跨进程共享)。
+- 预热: 每个Worker在开始接收请求之前建立连接、执行热点查询并加载吊销索引/Principal缓存，首批请求不再承担冷启动开销。
+"""
+import multiprocessing
+import os
+
+# 监听地址
+bind = os.getenv("GUNICORN_BIND", f"{os.getenv('FLASK_RUN_HOST', '0.0.0.0')}:{os.getenv('FLASK_RUN_PORT', '5000')}")
+
+# Worker进程数: 默认 2*CPU+1；线程数: 每个Worker处理并发请求的线程数 (等待数据库I/O时可以让出GIL)
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count() * 2 + 1)))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = "gthread" if threads > 1 else "sync"
+
+# 每个Worker各自创建密码哈希进程池：未显式配置时按Worker数均分CPU (至少1个进程)，
+# 避免 Worker数 x CPU核数 个哈希进程争抢CPU。HASHING_MAX_PENDING 同样是每个Worker各自的上限。
+# 需要在加载应用 (读取configs.py) 之前设置
+os.environ.setdefault("HASHING_POOL_WORKERS", str(max(1, multiprocessing.cpu_count() // workers)))
+
+# 主进程加载应用后再fork，Worker之间共享已导入的代码和只读数据
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# 每个Worker处理一定数量的请求后重启，防止内存缓慢增长；抖动避免所有Worker同时重启
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+
+# 日志输出到标准输出/错误，由loguru和容器日志统一采集
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+
+def post_worker_init(worker):
+    """Worker进程加载完应用、开始接收请求之前调用 (此时已完成fork)。"""
+    from app.services.warmup import reinit_after_fork, warmup
+
+    app = worker.wsgi  # 即 wsgi.py 中的 Flask 应用
+    reinit_after_fork(app)
+    if app.config.get("WARMUP_ENABLED", True):
+        warmup(app)
+
+
+def worker_exit(server, worker):
+    """Worker退出时写出尚未落库的吊销记录，并关闭密码哈希进程池，避免遗留子进程。"""
+    from app.extensions import password_hasher, revocation_writer
+
+    revocation_writer.shutdown()
+    password_hasher.shutdown()
@@ -8,6 +8,7 @@ config_name = os.getenv('FLASK_CONFIG')
 app = create_app(config_name)
 
 if __name__ == '__main__':
+    # 仅用于开发调试。生产环境请使用 Gunicorn: `gunicorn -c gunicorn.conf.py wsgi:app`
     # `flask run` 命令会使用 FLASK_DEBUG, FLASK_RUN_HOST, FLASK_RUN_PORT 环境变量。
     # 如果直接通过 `python run.py` 运行，这些需要在 app.run() 中明确指定或从配置读取。
     # app.config['DEBUG'] 会根据 FLASK_CONFIG (例如 'dev') 从 DevelopmentConfig 设置。
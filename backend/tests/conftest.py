@@ -0,0 +1,34 @@
+# backend/tests/conftest.py
+import pytest
+
+from app import create_app
+from app.extensions import db
+
+
+@pytest.fixture
+def app():
+    """每个测试使用一个新的TestingConfig应用 (内存SQLite)，并创建全部数据表。"""
+    app = create_app("test")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def register_and_login(client, username: str = "alice", password: str = "Password123") -> dict:
+    """注册并登录一个用户，返回登录响应的JSON (包含access_token和refresh_token)。"""
+    response = client.post("/api/auth/register", json={"username": username, "password": password})
+    assert response.status_code == 201, response.get_json()
+    response = client.post("/api/auth/login", json={"username": username, "password": password})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def auth_header(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
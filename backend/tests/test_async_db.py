@@ -0,0 +1,47 @@
+# backend/tests/test_async_db.py
+import pytest
+
+from app import create_app
+from app.configs import TestingConfig
+from app.extensions import async_db, db
+from app.services.async_db import is_memory_sqlite
+
+from .conftest import auth_header
+
+
+def test_is_memory_sqlite():
+    assert is_memory_sqlite("sqlite:///:memory:")
+    assert is_memory_sqlite("sqlite+aiosqlite://")
+    assert not is_memory_sqlite("sqlite:////tmp/auth.db")
+    assert not is_memory_sqlite("mysql+pymysql://user:pw@localhost/auth")
+
+
+@pytest.fixture
+def async_app(monkeypatch):
+    monkeypatch.setattr(TestingConfig, "AUTH_ASYNC_ENABLED", True)
+    monkeypatch.setattr(TestingConfig, "SQLALCHEMY_DATABASE_URI", "sqlite:///:memory:")
+    app = create_app("test")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+    async_db.shutdown()
+
+
+def test_testing_async_mode_uses_shared_file_database(async_app):
+    assert not is_memory_sqlite(async_app.config["SQLALCHEMY_DATABASE_URI"])
+    client = async_app.test_client()
+    # 注册走异步Engine，登录后的 /api/me 走同步Engine：两者必须看到同一个数据库
+    assert client.post("/api/auth/register", json={"username": "alice", "password": "Password123"}).status_code == 201
+    response = client.post("/api/auth/login", json={"username": "alice", "password": "Password123"})
+    assert response.status_code == 200
+    assert client.get("/api/me", headers=auth_header(response.get_json()["access_token"])).status_code == 200
+
+
+def test_async_mode_refuses_memory_sqlite_outside_testing(monkeypatch):
+    monkeypatch.setattr(TestingConfig, "AUTH_ASYNC_ENABLED", True)
+    monkeypatch.setattr(TestingConfig, "TESTING", False)
+    monkeypatch.setattr(TestingConfig, "SQLALCHEMY_DATABASE_URI", "sqlite:///:memory:")
+    with pytest.raises(ValueError):
+        create_app("test")
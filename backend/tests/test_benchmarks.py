@@ -0,0 +1,17 @@
+# backend/tests/test_benchmarks.py
+from datetime import timedelta
+
+from app.configs import TestingConfig
+from benchmarks.auth_benchmarks import run_all
+
+
+def test_benchmark_suite_smoke(monkeypatch):
+    """
+    用很小的黑名单规模和迭代次数完整跑一遍基准测试，防止基准脚本本身失效。
+    把配置中的Token有效期压到1微秒 (签发即过期)：基准项必须自己指定有效期，不能依赖测量在配置的有效期内完成。
+    """
+    monkeypatch.setattr(TestingConfig, "JWT_ACCESS_TOKEN_EXPIRES", timedelta(microseconds=1))
+    report = run_all(iterations=5, hash_iterations=1, blocklist_sizes=[0, 100])
+    rows = {result["params"]["blocklist_rows"] for result in report["results"]
+            if result["name"] == "decode_and_check_blocklist"}
+    assert rows == {0, 100}
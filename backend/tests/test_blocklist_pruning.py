@@ -0,0 +1,40 @@
+# backend/tests/test_blocklist_pruning.py
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.extensions import db
+from app.models import TokenBlocklist
+
+from .conftest import auth_header, register_and_login
+
+
+def _add_rows(count: int, expires_in: timedelta | None) -> None:
+    now = datetime.now(timezone.utc)
+    db.session.add_all(TokenBlocklist(jti=str(uuid.uuid4()), token_type="access", user_identity="alice",
+                                      expires_at=now + expires_in if expires_in is not None else None)
+                       for _ in range(count))
+    db.session.commit()
+
+
+def test_logout_records_token_expiry(client):
+    tokens = register_and_login(client)
+    assert client.delete("/api/auth/logout", headers=auth_header(tokens["access_token"])).status_code == 200
+    row = TokenBlocklist.query.one()
+    assert row.expires_at is not None
+
+
+def test_prune_removes_only_expired_rows(app):
+    _add_rows(5, timedelta(hours=-1))
+    _add_rows(2, timedelta(hours=1))
+    _add_rows(1, None)  # 旧数据没有过期时间，保留
+    result = app.test_cli_runner().invoke(args=["prune-blocklist", "--batch-size", "2"])
+    assert result.exit_code == 0, result.output
+    assert "已删除 5 条" in result.output
+    assert TokenBlocklist.query.count() == 3
+
+
+def test_prune_respects_max_batches(app):
+    _add_rows(5, timedelta(hours=-1))
+    assert TokenBlocklist.prune_expired(batch_size=2, max_batches=1) == 2
+    assert TokenBlocklist.prune_expired(batch_size=2) == 3
+    assert TokenBlocklist.prune_expired(batch_size=2) == 0
@@ -0,0 +1,76 @@
+# backend/tests/test_compression_etag.py
+import gzip
+
+import pytest
+from flask import Response
+
+from app import create_app
+from app.configs import TestingConfig
+from app.extensions import db
+
+from .conftest import auth_header, register_and_login
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(TestingConfig, "COMPRESSION_ENABLED", True)
+    monkeypatch.setattr(TestingConfig, "COMPRESSION_MIN_SIZE", 100)
+    app = create_app("test")
+
+    @app.get("/test/large")
+    def large():
+        return {"items": ["x" * 20] * 50}
+
+    @app.get("/test/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/test/stream")
+    def stream():
+        return Response((f'{{"chunk": {i}}}' * 50 for i in range(3)), mimetype="application/json")
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_me_returns_etag_and_304(client):
+    headers = auth_header(register_and_login(client)["access_token"])
+    response = client.get("/api/me", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    assert "Authorization" in response.headers["Vary"]
+
+    not_modified = client.get("/api/me", headers={**headers, "If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b""
+    assert not_modified.headers["ETag"] == etag
+    # 弱比较: 压缩后返回的弱ETag同样命中
+    assert client.get("/api/me", headers={**headers, "If-None-Match": f"W/{etag}"}).status_code == 304
+    assert client.get("/api/me", headers={**headers, "If-None-Match": '"other"'}).status_code == 200
+
+
+def test_etag_changes_with_token(client):
+    tokens = register_and_login(client)
+    first = client.get("/api/me", headers=auth_header(tokens["access_token"])).headers["ETag"]
+    second_token = client.post("/api/auth/login", json={"username": "alice", "password": "Password123"})
+    second = client.get("/api/me", headers=auth_header(second_token.get_json()["access_token"])).headers["ETag"]
+    assert first != second
+
+
+def test_large_response_is_gzipped(client):
+    response = client.get("/test/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert b"items" in gzip.decompress(response.data)
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert "Content-Encoding" not in client.get("/test/large").headers
+
+
+def test_small_and_streamed_responses_are_not_compressed(client):
+    assert "Content-Encoding" not in client.get("/test/small", headers={"Accept-Encoding": "gzip"}).headers
+    response = client.get("/test/stream", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert response.data.startswith(b'{"chunk": 0}')
@@ -0,0 +1,68 @@
+# backend/tests/test_introspection.py
+import base64
+
+import pytest
+
+from app import create_app
+from app.configs import TestingConfig
+from app.extensions import db
+
+from .conftest import auth_header, register_and_login
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(TestingConfig, "INTROSPECTION_CLIENTS", "gateway:s3cret")
+    monkeypatch.setattr(TestingConfig, "INTROSPECTION_MAX_BATCH", 3)
+    app = create_app("test")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _basic(client_id: str = "gateway", secret: str = "s3cret") -> dict:
+    credentials = base64.b64encode(f"{client_id}:{secret}".encode()).decode()
+    return {"Authorization": f"Basic {credentials}"}
+
+
+@pytest.mark.parametrize("headers", [{}, _basic(secret="wrong"), _basic(client_id="other")])
+def test_requires_client_credentials(client, headers):
+    response = client.post("/api/auth/introspect", json={"token": "x"}, headers=headers)
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == 'Basic realm="introspect"'
+
+
+def test_single_token_by_json_and_form(client):
+    access_token = register_and_login(client)["access_token"]
+    for kwargs in ({"json": {"token": access_token}}, {"data": {"token": access_token}}):
+        response = client.post("/api/auth/introspect", headers=_basic(), **kwargs)
+        assert response.status_code == 200
+        result = response.get_json()
+        assert result["active"] is True
+        assert result["username"] == "alice"
+        assert result["token_type"] == "access"
+
+
+def test_batch_preserves_order_and_marks_revoked_tokens_inactive(client):
+    tokens = register_and_login(client)
+    revoked = register_and_login(client, username="bob")["access_token"]
+    assert client.delete("/api/auth/logout", headers=auth_header(revoked)).status_code == 200
+
+    response = client.post("/api/auth/introspect", headers=_basic(),
+                           json={"tokens": [tokens["access_token"], "not-a-jwt", revoked]})
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [result["active"] for result in results] == [True, False, False]
+    assert results[1] == {"active": False}
+    assert results[2] == {"active": False}
+
+
+def test_batch_size_limit(client):
+    response = client.post("/api/auth/introspect", headers=_basic(), json={"tokens": ["a", "b", "c", "d"]})
+    assert response.status_code == 400
+
+
+def test_missing_token_returns_400(client):
+    assert client.post("/api/auth/introspect", headers=_basic(), json={}).status_code == 400
@@ -0,0 +1,45 @@
+# backend/tests/test_jwks.py
+import jwt as pyjwt
+import pytest
+
+from app import create_app
+from app.configs import TestingConfig
+from app.extensions import db
+from app.services.signing_keys import generate_private_key_pem
+
+from .conftest import auth_header, register_and_login
+
+
+@pytest.fixture(params=["RS256", "EdDSA"])
+def app(request, monkeypatch, tmp_path):
+    (tmp_path / "k1.pem").write_bytes(generate_private_key_pem(request.param))
+    monkeypatch.setattr(TestingConfig, "JWT_ALGORITHM", request.param)
+    monkeypatch.setattr(TestingConfig, "JWT_KEYS_DIR", str(tmp_path))
+    monkeypatch.setattr(TestingConfig, "JWT_ACTIVE_KID", "k1")
+    app = create_app("test")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_jwks_publishes_signing_keys(app, client):
+    response = client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    (jwk,) = response.get_json()["keys"]
+    assert jwk["kid"] == "k1" and jwk["use"] == "sig" and jwk["alg"] == app.config["JWT_ALGORITHM"]
+    assert "key_ops" not in jwk
+
+    assert client.get("/.well-known/jwks.json",
+                      headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def test_tokens_verify_against_published_jwk(app, client):
+    token = register_and_login(client)["access_token"]
+    assert pyjwt.get_unverified_header(token)["kid"] == "k1"
+    (jwk,) = client.get("/.well-known/jwks.json").get_json()["keys"]
+    key = pyjwt.PyJWK(jwk)
+    claims = pyjwt.decode(token, key=key.key, algorithms=[jwk["alg"]])
+    assert claims["sub"] == "alice"
+    assert client.get("/api/me", headers=auth_header(token)).status_code == 200
@@ -0,0 +1,56 @@
+# backend/tests/test_load_generator.py
+import argparse
+
+import pytest
+
+from app.configs import TestingConfig
+from benchmarks.load_generator import (DEFAULT_MIX, InProcessTransport, LatencyHistogram, LoadGenerator,
+                                       create_in_process_app, parse_mix)
+
+
+@pytest.fixture
+def generator(monkeypatch, tmp_path):
+    # 并发会话需要多个数据库连接，改用临时SQLite文件 (同时避免create_in_process_app改写进程的环境变量)
+    uri = f"sqlite:///{tmp_path / 'load.db'}"
+    monkeypatch.setenv("TEST_DATABASE_URI", uri)
+    monkeypatch.setattr(TestingConfig, "SQLALCHEMY_DATABASE_URI", uri)
+    app = create_in_process_app("test", keep_rate_limit=False)
+    generator = LoadGenerator(InProcessTransport(app), parse_mix(DEFAULT_MIX), me_per_session=2, seed=1)
+    generator.prepare(users=4, concurrency=2)
+    return generator
+
+
+def test_closed_loop_smoke(generator):
+    duration = generator.run_closed(concurrency=2, duration=30.0, max_sessions=30)
+    report = generator.report(duration)
+    assert report["throughput"]["sessions"] == 30
+    assert report["throughput"]["errors"] == 0, report["endpoints"]
+    assert set(report["sessions"]) <= {"register", "login", "me", "refresh", "logout"}
+    if "logout" in report["sessions"]:
+        assert report["endpoints"]["me_after_logout"]["statuses"] == {"401": report["sessions"]["logout"]["count"]}
+
+
+def test_open_loop_records_queue_delay(generator):
+    duration = generator.run_open(rate=50.0, concurrency=2, duration=0.2, poisson=False)
+    report = generator.report(duration)
+    assert report["throughput"]["sessions"] in (10, 11)  # 匀速到达，0.2秒内约10个会话 (累加误差可能多一个)
+    assert report["throughput"]["errors"] == 0, report["endpoints"]
+    assert report["queue_delay"]["max_ms"] >= 0
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for value in range(1, 10001):
+        histogram.record(value)
+    assert histogram.count == 10000
+    for p in (50, 90, 99):
+        assert histogram.percentile(p) == pytest.approx(p * 100, rel=0.01)
+    assert histogram.percentile(100) == 10000
+
+
+def test_parse_mix_rejects_unknown_or_empty():
+    assert parse_mix("me=3,login") == {"me": 3.0, "login": 1.0}
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("me=1,unknown=1")
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("me=0")
@@ -0,0 +1,55 @@
+# backend/tests/test_logging.py
+import json
+
+import pytest
+from loguru import logger
+
+from app.extensions import configure_logging
+
+
+class _NotFormattable:
+    def __format__(self, spec):
+        raise AssertionError("低于日志级别的消息不应被格式化")
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    yield tmp_path / "app.log"
+    logger.remove()
+
+
+def _configure(log_file, **overrides):
+    config = {"LOG_LEVEL": "INFO", "LOG_TO_CONSOLE": False, "LOG_FILE": str(log_file), "LOG_JSON": True,
+              "LOG_ENQUEUE": False, "LOG_BUFFER_SIZE": 64 * 1024}
+    config.update(overrides)
+    configure_logging(config)
+
+
+def _records(log_file) -> list[dict]:
+    logger.remove()  # 关闭文件处理器，写出缓冲区
+    return [json.loads(line)["record"] for line in log_file.read_text(encoding="utf-8").splitlines()]
+
+
+def test_file_sink_writes_json_lines(log_file):
+    _configure(log_file)
+    logger.info("用户 '{}' 登录成功。", "alice")
+    messages = [record["message"] for record in _records(log_file)]
+    assert "用户 'alice' 登录成功。" in messages
+
+
+def test_messages_below_level_are_not_formatted(log_file):
+    _configure(log_file, LOG_LEVEL="WARNING")
+    logger.debug("调试信息 {}", _NotFormattable())
+    logger.warning("警告 {}", 1)
+    assert [record["message"] for record in _records(log_file)] == ["警告 1"]
+
+
+def test_sampling_drops_bound_records(log_file):
+    _configure(log_file, LOG_SAMPLE_RATES={"auth.login_success": 0.0})
+    sampled = logger.bind(sample="auth.login_success")
+    for _ in range(10):
+        sampled.info("登录成功")
+    logger.info("其他日志")
+    messages = [record["message"] for record in _records(log_file)]
+    assert "登录成功" not in messages
+    assert "其他日志" in messages
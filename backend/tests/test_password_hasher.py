@@ -0,0 +1,39 @@
+# backend/tests/test_password_hasher.py
+import pytest
+
+from app import create_app
+from app.configs import TestingConfig
+from app.extensions import db, password_hasher
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(TestingConfig, "HASHING_POOL_WORKERS", 1)
+    monkeypatch.setattr(TestingConfig, "HASHING_MAX_PENDING", 1)
+    monkeypatch.setattr(TestingConfig, "HASHING_RETRY_AFTER", 3)
+    app = create_app("test")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+    password_hasher.shutdown()
+
+
+def test_register_and_login_hash_in_pool(client):
+    payload = {"username": "alice", "password": "Password123"}
+    assert client.post("/api/auth/register", json=payload).status_code == 201
+    assert client.post("/api/auth/login", json=payload).status_code == 200
+    assert client.post("/api/auth/login", json={**payload, "password": "wrong-password"}).status_code == 401
+    assert password_hasher.pending == 0
+
+
+def test_full_pool_sheds_load_with_503(client):
+    password_hasher._slots.acquire()  # 占满唯一的在途名额
+    try:
+        response = client.post("/api/auth/register", json={"username": "alice", "password": "Password123"})
+    finally:
+        password_hasher._slots.release()
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+    assert client.post("/api/auth/register", json={"username": "alice", "password": "Password123"}).status_code == 201
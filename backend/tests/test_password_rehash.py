@@ -0,0 +1,57 @@
+# backend/tests/test_password_rehash.py
+from app.extensions import db, password_hasher
+from app.models.user_model import User
+from app.services.password_policy import HashPolicy
+
+from .conftest import auth_header, register_and_login
+
+NEW_POLICY = HashPolicy(method="pbkdf2", pbkdf2_iterations=1000)
+
+
+def _user() -> User:
+    db.session.expire_all()
+    return User.query.filter_by(username="alice").one()
+
+
+def test_login_upgrades_outdated_hash_without_bumping_security_version(app, client, monkeypatch):
+    tokens = register_and_login(client)
+    old_hash, old_version = _user().password_hash, _user().security_version
+    assert old_hash.startswith("scrypt:")
+
+    monkeypatch.setattr(password_hasher, "policy", NEW_POLICY)
+    response = client.post("/api/auth/login", json={"username": "alice", "password": "Password123"})
+    assert response.status_code == 200
+
+    user = _user()
+    assert user.password_hash.startswith(f"{NEW_POLICY.method_string}$")
+    assert user.check_password("Password123")
+    assert user.security_version == old_version
+    # 重新哈希不是修改密码，此前签发的Token仍然有效
+    assert client.get("/api/me", headers=auth_header(tokens["access_token"])).status_code == 200
+
+
+def test_current_hash_is_not_rewritten(app, client, monkeypatch):
+    monkeypatch.setattr(password_hasher, "policy", NEW_POLICY)
+    register_and_login(client)
+    stored = _user().password_hash
+    assert not password_hasher.needs_rehash(stored)
+    assert client.post("/api/auth/login", json={"username": "alice", "password": "Password123"}).status_code == 200
+    assert _user().password_hash == stored
+
+
+def test_failed_login_does_not_rehash(app, client, monkeypatch):
+    register_and_login(client)
+    stored = _user().password_hash
+    monkeypatch.setattr(password_hasher, "policy", NEW_POLICY)
+    response = client.post("/api/auth/login", json={"username": "alice", "password": "wrong-password"})
+    assert response.status_code == 401
+    assert _user().password_hash == stored
+
+
+def test_calibrate_command_prints_env_settings(app):
+    result = app.test_cli_runner().invoke(args=["calibrate-password-hash", "--target-ms", "1", "--samples", "1",
+                                                "--method", "scrypt"])
+    assert result.exit_code == 0, result.output
+    assert "PASSWORD_HASH_METHOD=scrypt" in result.output
+    assert f"PASSWORD_SCRYPT_N={2 ** 14}" in result.output  # 目标耗时低于安全下限时取下限
+    assert "已达到安全下限" in result.output
@@ -0,0 +1,72 @@
+# backend/tests/test_permissions.py
+from flask_jwt_extended import create_access_token, decode_token
+
+from app.extensions import role_permissions
+from app.models.role_model import Role
+from app.models.user_model import User
+from app.services.permissions import Permission
+
+from .conftest import auth_header, register_and_login
+
+
+def _login(client, username: str = "alice") -> str:
+    response = client.post("/api/auth/login", json={"username": username, "password": "Password123"})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()["access_token"]
+
+
+def _cli(app, *args):
+    return app.test_cli_runner().invoke(args=list(args))
+
+
+def test_default_role_grants_profile_read(app, client):
+    access_token = register_and_login(client)["access_token"]
+    claims = decode_token(access_token)
+    assert claims["roles"] == ["user"]
+    assert claims["perms"] & Permission.PROFILE_READ
+    assert client.get("/api/me", headers=auth_header(access_token)).status_code == 200
+
+
+def test_missing_permission_returns_403(app, client):
+    register_and_login(client)
+    result = _cli(app, "set-role", "user", "-p", "sessions_revoke")
+    assert result.exit_code == 0, result.output
+
+    response = client.get("/api/me", headers=auth_header(_login(client)))
+    assert response.status_code == 403
+    assert response.get_json() == {"message": "权限不足。"}
+
+
+def test_assign_and_remove_role(app, client):
+    register_and_login(client)
+    assert _cli(app, "set-role", "user", "-p", "sessions_revoke").exit_code == 0
+    assert _cli(app, "set-role", "auditor", "-p", "profile_read", "-p", "users_read").exit_code == 0
+
+    result = _cli(app, "assign-role", "alice", "auditor")
+    assert result.exit_code == 0, result.output
+    access_token = _login(client)
+    assert decode_token(access_token)["roles"] == ["auditor"]
+    assert client.get("/api/me", headers=auth_header(access_token)).status_code == 200
+
+    assert _cli(app, "assign-role", "alice", "auditor", "--remove").exit_code == 0
+    assert client.get("/api/me", headers=auth_header(_login(client))).status_code == 403
+
+
+def test_assign_unknown_role_fails(app, client):
+    register_and_login(client)
+    result = _cli(app, "assign-role", "alice", "missing")
+    assert result.exit_code != 0
+    assert "不存在" in result.output
+
+
+def test_token_without_perms_falls_back_to_roles(app, client):
+    register_and_login(client)
+    user = User.query.filter_by(username="alice").one()
+
+    def token_for(roles: list[str]) -> str:
+        claims = role_permissions.token_claims(user, roles, Role)
+        claims.pop("perms")  # 模拟引入权限位之前签发的Token
+        return create_access_token(identity="alice", additional_claims=claims)
+
+    assert client.get("/api/me", headers=auth_header(token_for(["user"]))).status_code == 200
+    assert client.get("/api/me", headers=auth_header(token_for(["nobody"]))).status_code == 403
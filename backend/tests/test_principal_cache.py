@@ -0,0 +1,50 @@
+# backend/tests/test_principal_cache.py
+import time
+
+from app.extensions import db, principal_cache
+from app.models import User
+from app.services.principal_cache import Principal, PrincipalCache
+
+from .conftest import auth_header, register_and_login
+
+
+def _principal(username: str) -> Principal:
+    return Principal(id=1, username=username, is_active=True, security_version=1)
+
+
+def test_cache_hit_skips_loader():
+    cache = PrincipalCache()
+    calls = []
+
+    def loader(identity):
+        calls.append(identity)
+        return _principal(identity)
+
+    assert cache.get("alice", loader).username == "alice"
+    assert cache.get("alice", loader).username == "alice"
+    assert calls == ["alice"]
+    assert cache.get("nobody", lambda identity: None) is None
+    assert cache.get("nobody", loader) is not None  # 不存在的用户不会被缓存
+
+
+def test_ttl_and_lru_eviction():
+    cache = PrincipalCache()
+    cache.ttl, cache.maxsize = 0.05, 2
+    for name in ("a", "b", "c"):
+        cache.put(_principal(name))
+    assert cache.evictions == 1
+    assert cache.get("a", lambda identity: None) is None
+    time.sleep(0.06)
+    assert cache.get("b", lambda identity: None) is None  # 已过期，重新加载
+
+
+def test_user_update_invalidates_cached_principal(client):
+    headers = auth_header(register_and_login(client)["access_token"])
+    assert client.get("/api/me", headers=headers).status_code == 200
+    assert principal_cache.stats()["size"] == 1
+
+    user = User.query.filter_by(username="alice").one()
+    user.is_active = False
+    db.session.commit()
+    # 禁用账户使缓存立即失效，已签发的Token随即不能再使用
+    assert client.get("/api/me", headers=headers).status_code == 401
@@ -0,0 +1,69 @@
+# backend/tests/test_principal_loading.py
+import pytest
+from sqlalchemy import event
+
+from app.extensions import db, principal_cache
+from app.models.user_model import User, load_principal, load_principals
+from app.services.principal_cache import Principal
+
+from .conftest import auth_header, register_and_login
+
+
+@pytest.fixture
+def users(app):
+    for username in ("alice", "bob"):
+        db.session.add(User(username=username, password_hash="x", email=f"{username}@example.com"))
+    db.session.commit()
+    db.session.expunge_all()
+
+
+@pytest.fixture
+def statements(app):
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            captured.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    yield captured
+    event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _user_entities() -> list:
+    return [obj for obj in db.session.identity_map.values() if isinstance(obj, User)]
+
+
+def test_load_principal_selects_only_principal_columns(users, statements):
+    principal = load_principal("alice")
+    assert type(principal) is Principal
+    assert principal.username == "alice" and principal.is_active and principal.security_version == 1
+    assert load_principal("nobody") is None
+    assert _user_entities() == []  # 没有构造ORM实体，也不会进入Session的标识映射
+    assert len(statements) == 2
+    for column in ("password_hash", "email", "created_at", "tokens_valid_after"):
+        assert column not in statements[0]
+
+
+def test_load_principals_uses_one_query(users, statements):
+    principals = load_principals(["alice", "bob", "nobody", "alice"])
+    assert set(principals) == {"alice", "bob"}
+    assert all(type(principal) is Principal for principal in principals.values())
+    assert _user_entities() == []
+    assert len(statements) == 1
+    assert "password_hash" not in statements[0]
+    assert load_principals([]) == {}
+    assert len(statements) == 1
+
+
+def test_protected_view_loads_principal_without_entity(app, client, statements):
+    access_token = register_and_login(client)["access_token"]
+    principal_cache.clear()
+    db.session.expunge_all()
+    statements.clear()
+    assert client.get("/api/me", headers=auth_header(access_token)).status_code == 200
+    # 除会话吊销时间戳的周期同步外，只有一条按用户名加载Principal列的查询
+    loads = [statement for statement in statements if "users.security_version" in statement]
+    assert len(loads) == 1
+    assert "password_hash" not in loads[0]
+    assert _user_entities() == []
@@ -0,0 +1,41 @@
+# backend/tests/test_query_budget.py
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.configs import TestingConfig
+from app.extensions import db, principal_cache, role_permissions
+
+from .conftest import auth_header, register_and_login
+
+
+@pytest.fixture(params=[True, False], ids=["index", "no_index"])
+def app(request, monkeypatch):
+    """严格检查查询预算：吊销索引开启和关闭 (每次校验都回查黑名单) 两种情况下都不能超出预算。"""
+    monkeypatch.setattr(TestingConfig, "QUERY_PROFILER_ENABLED", True)
+    monkeypatch.setattr(TestingConfig, "QUERY_BUDGET_STRICT", True)
+    monkeypatch.setattr(TestingConfig, "REVOCATION_INDEX_ENABLED", request.param)
+    app = create_app("test")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_me_worst_case_fits_budget(app, client):
+    register_and_login(client)
+    # 没有 "perms" 声明的旧Token + 角色编译表过期 + Principal缓存未命中
+    with app.test_request_context():
+        token = create_access_token(identity="alice", additional_claims={"roles": ["user"]})
+    principal_cache.clear()
+    role_permissions.invalidate()
+    assert client.get("/api/me", headers=auth_header(token)).status_code == 200
+
+
+def test_refresh_and_logout_fit_budget(client):
+    tokens = register_and_login(client)
+    principal_cache.clear()
+    response = client.post("/api/auth/refresh", headers=auth_header(tokens["refresh_token"]))
+    assert response.status_code == 200
+    assert client.delete("/api/auth/logout", headers=auth_header(tokens["access_token"])).status_code == 200
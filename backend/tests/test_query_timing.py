@@ -0,0 +1,39 @@
+# backend/tests/test_query_timing.py
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from app.configs import TestingConfig
+from app.extensions import db, query_profiler
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(TestingConfig, "QUERY_PROFILER_ENABLED", True)
+    monkeypatch.setattr(TestingConfig, "METRICS_ENABLED", True)
+    app = create_app("test")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_failed_statement_leaves_no_stale_start_time(app):
+    with db.engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM no_such_table"))
+        conn.execute(text("SELECT 1"))
+        assert not any(key.endswith("_query_start") for key in conn.info)
+    stats = {item["statement"]: item for item in query_profiler.top(100)}
+    assert "SELECT ?" in stats or "SELECT 1" in stats
+    assert not any("no_such_table" in statement for statement in stats)
+
+
+def test_metrics_still_time_queries(app):
+    client = app.test_client()
+    assert client.get("/api/auth/username-available?username=alice").status_code == 200
+    body = client.get("/metrics").get_data(as_text=True)
+    assert "auth_db_query_count" in body
+    assert 'stage="db_query"' in body
@@ -0,0 +1,50 @@
+# backend/tests/test_rate_limit.py
+import pytest
+
+from app import create_app
+from app.configs import TestingConfig
+from app.extensions import db
+
+
+def _login(client, username: str, forwarded_for: str | None = None):
+    headers = {"X-Forwarded-For": forwarded_for} if forwarded_for else {}
+    return client.post("/api/auth/login", json={"username": username, "password": "wrong-password"},
+                       headers=headers, environ_base={"REMOTE_ADDR": "10.0.0.1"})
+
+
+def test_login_is_limited_per_username(client):
+    responses = [_login(client, "victim") for _ in range(6)]
+    assert [r.status_code for r in responses[:5]] == [401] * 5
+    assert responses[5].status_code == 429
+    assert int(responses[5].headers["Retry-After"]) >= 1
+
+
+def test_login_is_limited_per_client_address(client):
+    responses = [_login(client, f"user_{i}") for i in range(21)]
+    assert responses[19].status_code == 401
+    assert responses[20].status_code == 429
+
+
+def test_forwarded_for_is_ignored_without_proxy_fix(client):
+    # 未配置 PROXY_FIX_X_FOR 时伪造的 X-Forwarded-For 不能绕过按客户端地址的限流
+    responses = [_login(client, f"user_{i}", forwarded_for=f"203.0.113.{i}") for i in range(21)]
+    assert responses[20].status_code == 429
+
+
+@pytest.fixture
+def proxied_client(monkeypatch):
+    monkeypatch.setattr(TestingConfig, "PROXY_FIX_X_FOR", 1)
+    app = create_app("test")
+    with app.app_context():
+        db.create_all()
+        yield app.test_client()
+        db.session.remove()
+        db.drop_all()
+
+
+def test_proxy_fix_limits_by_forwarded_client(proxied_client):
+    # 代理地址相同，按 X-Forwarded-For 中的真实客户端分别计数
+    for i in range(20):
+        assert _login(proxied_client, f"user_{i}", forwarded_for="203.0.113.1").status_code == 401
+    assert _login(proxied_client, "user_x", forwarded_for="203.0.113.1").status_code == 429
+    assert _login(proxied_client, "user_y", forwarded_for="203.0.113.2").status_code == 401
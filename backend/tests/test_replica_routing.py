@@ -0,0 +1,73 @@
+# backend/tests/test_replica_routing.py
+import pytest
+from sqlalchemy import create_engine
+
+from app import create_app
+from app.configs import TestingConfig
+from app.extensions import db, replica_router
+from app.models.user_model import User
+from app.services.db_routing import replica_reads
+
+from .conftest import register_and_login
+
+
+@pytest.fixture
+def replica_uri(tmp_path):
+    uri = f"sqlite:///{tmp_path / 'replica.db'}"
+    engine = create_engine(uri)
+    db.metadata.create_all(engine)  # 副本上有表结构但没有数据，用于区分查询发往了哪个库
+    engine.dispose()
+    return uri
+
+
+def _make_app(monkeypatch, uris):
+    monkeypatch.setattr(TestingConfig, "SQLALCHEMY_REPLICA_URIS", uris)
+    monkeypatch.setattr(TestingConfig, "DB_REPLICA_HEALTHCHECK_INTERVAL", 0.0)
+    return create_app("test")
+
+
+@pytest.fixture
+def app(monkeypatch, replica_uri):
+    app = _make_app(monkeypatch, [replica_uri])
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+        replica_router.dispose()
+
+
+def test_reads_inside_replica_reads_go_to_replica(app, client):
+    response = client.post("/api/auth/register", json={"username": "alice", "password": "Password123"})
+    assert response.status_code == 201
+    assert User.query.filter_by(username="alice").first() is not None  # 主库
+    with replica_reads():
+        assert User.query.filter_by(username="alice").first() is None  # 副本上没有该用户
+
+
+def test_login_lookup_is_routed_to_replica(client):
+    response = client.post("/api/auth/register", json={"username": "alice", "password": "Password123"})
+    assert response.status_code == 201
+    # 用户只存在于主库：登录查询发往副本，因此找不到该用户
+    response = client.post("/api/auth/login", json={"username": "alice", "password": "Password123"})
+    assert response.status_code == 401
+
+
+def test_writes_inside_replica_reads_go_to_primary(app):
+    with replica_reads():
+        db.session.add(User(username="bob", password_hash="x"))
+        db.session.commit()
+    assert User.query.filter_by(username="bob").first() is not None
+
+
+def test_unreachable_replica_falls_back_to_primary(monkeypatch, tmp_path):
+    app = _make_app(monkeypatch, [f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"])
+    with app.app_context():
+        db.create_all()
+        try:
+            register_and_login(app.test_client())  # 副本探活失败，登录查询回退到主库
+            assert replica_router.choose() is None
+        finally:
+            db.session.remove()
+            db.drop_all()
+            replica_router.dispose()
@@ -0,0 +1,78 @@
+# backend/tests/test_revocation_index.py
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.extensions import db, revocation_index
+from app.models import TokenBlocklist
+from app.services.revocation_index import BloomFilter
+
+from .conftest import auth_header, register_and_login
+
+
+def _blocklist_row(jti: str, row_id: int | None = None) -> TokenBlocklist:
+    return TokenBlocklist(id=row_id, jti=jti, token_type="access", user_identity="alice",
+                          expires_at=datetime.now(timezone.utc) + timedelta(hours=1))
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    keys = [str(uuid.uuid4()) for _ in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    assert bloom.count == 1000
+
+
+def test_logout_revokes_token_through_index(client):
+    tokens = register_and_login(client)
+    headers = auth_header(tokens["access_token"])
+    assert client.get("/api/me", headers=headers).status_code == 200
+    assert client.delete("/api/auth/logout", headers=headers).status_code == 200
+    assert client.get("/api/me", headers=headers).status_code == 401
+
+
+def test_bloom_negative_skips_database(app):
+    revocation_index.load(TokenBlocklist)
+    lookups = []
+    assert revocation_index.is_revoked(str(uuid.uuid4()), TokenBlocklist, lookups.append) is False
+    assert lookups == []
+
+
+def test_database_verdict_is_cached(app):
+    jti = str(uuid.uuid4())
+    db.session.add(_blocklist_row(jti))
+    db.session.commit()
+    revocation_index.load(TokenBlocklist)
+    lookups = []
+
+    def lookup(target: str) -> bool:
+        lookups.append(target)
+        return True
+
+    # add() 已把同步到的JTI记为吊销，不需要回查
+    assert revocation_index.is_revoked(jti, TokenBlocklist, lookup) is True
+    assert lookups == []
+
+
+def test_sync_picks_up_rows_committed_below_watermark(app):
+    """较小ID较晚提交 (或在只读副本上晚到) 的记录，在回看窗口内的下一次同步中被补上。"""
+    db.session.add(_blocklist_row(str(uuid.uuid4()), row_id=10))
+    db.session.commit()
+    revocation_index.load(TokenBlocklist)
+
+    late_jti = str(uuid.uuid4())
+    revocation_index.remember({late_jti: False})  # 模拟此前已缓存的"未吊销"结论
+    db.session.add(_blocklist_row(late_jti, row_id=5))
+    db.session.commit()
+
+    assert revocation_index.sync(TokenBlocklist) == 1
+    assert revocation_index.is_revoked(late_jti, TokenBlocklist, lambda _: False) is True
+
+
+def test_overlap_rescan_does_not_double_count(app):
+    db.session.add(_blocklist_row(str(uuid.uuid4())))
+    db.session.commit()
+    revocation_index.load(TokenBlocklist)
+    count = revocation_index.entry_count
+    assert revocation_index.sync(TokenBlocklist) == 0
+    assert revocation_index.entry_count == count
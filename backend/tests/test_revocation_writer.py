@@ -0,0 +1,70 @@
+# backend/tests/test_revocation_writer.py
+import time
+
+import pytest
+from loguru import logger
+
+from app import create_app
+from app.configs import TestingConfig
+from app.extensions import db, revocation_writer
+from app.models import TokenBlocklist
+
+from .conftest import auth_header, register_and_login
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(TestingConfig, "REVOCATION_WRITE_BEHIND", True)
+    monkeypatch.setattr(TestingConfig, "REVOCATION_FLUSH_INTERVAL", 60.0)  # 由测试手动调用flush
+    app = create_app("test")
+    with app.app_context():
+        db.create_all()
+        yield app
+        revocation_writer.flush()
+        db.session.remove()
+        db.drop_all()
+
+
+def test_logout_takes_effect_before_flush(client):
+    tokens = register_and_login(client)
+    headers = auth_header(tokens["access_token"])
+    assert client.delete("/api/auth/logout", headers=headers).status_code == 200
+    assert revocation_writer.pending == 1
+    assert client.get("/api/me", headers=headers).status_code == 401
+    assert revocation_writer.flush() == 1
+    assert TokenBlocklist.query.count() == 1
+
+
+def test_failed_flush_backs_off_and_rate_limits_errors(app, monkeypatch):
+    revoke_many = TokenBlocklist.revoke_many
+    database_down = True
+
+    def flaky_revoke_many(rows):
+        if database_down:
+            raise RuntimeError("database is down")
+        return revoke_many(rows)
+
+    errors = []
+    sink = logger.add(lambda message: errors.append(message), level="ERROR")
+    monkeypatch.setattr(revocation_writer, "_ensure_started", lambda: None)  # 不启动后台线程，由测试驱动flush
+    monkeypatch.setattr(revocation_writer, "flush_interval", 0.01)
+    monkeypatch.setattr(revocation_writer, "max_backoff", 1.0)
+    monkeypatch.setattr(TokenBlocklist, "revoke_many", flaky_revoke_many)
+    try:
+        revocation_writer.submit("jti-1", "access", "alice", None)
+        delays = []
+        for _ in range(10):
+            assert revocation_writer.flush() == 0
+            delays.append(revocation_writer._retry_at - time.monotonic())
+    finally:
+        logger.remove(sink)
+    assert revocation_writer.pending == 1
+    assert len(errors) == 1
+    # 退避时间按指数增长 (0.02, 0.04, ...)，并以 max_backoff 为上限
+    assert 0.01 < delays[0] <= 0.02
+    assert delays[1] > delays[0] * 1.5
+    assert 0.9 < delays[-1] <= 1.0
+
+    database_down = False
+    assert revocation_writer.flush() == 1
+    assert revocation_writer._failures == 0
@@ -0,0 +1,60 @@
+# backend/tests/test_security_version.py
+import pytest
+
+from app import create_app
+from app.configs import TestingConfig
+from app.extensions import db, principal_cache
+from app.models import User
+
+from .conftest import auth_header, register_and_login
+
+
+def _change_password(username: str, password: str) -> None:
+    user = User.query.filter_by(username=username).one()
+    user.set_password(password)
+    db.session.commit()
+
+
+def test_password_change_bumps_version_and_rejects_old_tokens(client):
+    tokens = register_and_login(client)
+    headers = auth_header(tokens["access_token"])
+    assert client.get("/api/me", headers=headers).status_code == 200
+
+    _change_password("alice", "NewPassword456")
+    assert User.query.filter_by(username="alice").one().security_version == 2
+    assert client.get("/api/me", headers=headers).status_code == 401
+    assert client.post("/api/auth/refresh", headers=auth_header(tokens["refresh_token"])).status_code == 401
+
+    new_tokens = client.post("/api/auth/login", json={"username": "alice", "password": "NewPassword456"}).get_json()
+    assert client.get("/api/me", headers=auth_header(new_tokens["access_token"])).status_code == 200
+
+
+def test_unrelated_update_keeps_version(client):
+    register_and_login(client)
+    user = User.query.filter_by(username="alice").one()
+    user.email = "alice@example.com"
+    db.session.commit()
+    assert user.security_version == 1
+
+
+@pytest.fixture
+def stateless_app(monkeypatch):
+    monkeypatch.setattr(TestingConfig, "AUTH_PRINCIPAL_MODE", "stateless")
+    app = create_app("test")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_stateless_me_skips_principal_lookup(stateless_app):
+    client = stateless_app.test_client()
+    tokens = register_and_login(client)
+    principal_cache.clear()
+    assert client.get("/api/me", headers=auth_header(tokens["access_token"])).status_code == 200
+    assert principal_cache.stats()["misses"] == 0
+
+    # 刷新Token时无论模式如何都校验安全版本号
+    _change_password("alice", "NewPassword456")
+    assert client.post("/api/auth/refresh", headers=auth_header(tokens["refresh_token"])).status_code == 401
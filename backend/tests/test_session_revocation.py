@@ -0,0 +1,44 @@
+# backend/tests/test_session_revocation.py
+import time
+from datetime import datetime, timezone
+
+from app.extensions import db, session_revocations
+from app.models import User
+
+from .conftest import auth_header, register_and_login
+
+
+def test_revoke_all_sessions_rejects_existing_tokens(client):
+    tokens = register_and_login(client)
+    headers = auth_header(tokens["access_token"])
+    assert client.delete("/api/auth/sessions", headers=headers).status_code == 200
+    assert client.get("/api/me", headers=headers).status_code == 401
+    assert client.post("/api/auth/refresh", headers=auth_header(tokens["refresh_token"])).status_code == 401
+
+
+def test_issued_at_boundaries(app):
+    session_revocations._not_before["alice"] = 1000.5
+    session_revocations._last_synced_at = time.monotonic()  # 不触发同步
+    # iat只精确到秒：与吊销时间戳同一秒内签发的Token也被拒绝
+    assert session_revocations.is_revoked("alice", 999, User) is True
+    assert session_revocations.is_revoked("alice", 1000, User) is True
+    assert session_revocations.is_revoked("alice", 1001, User) is False
+    assert session_revocations.is_revoked("alice", None, User) is False
+    assert session_revocations.is_revoked("bob", 1000, User) is False
+
+
+def test_stamp_written_by_another_process_is_synced(client):
+    tokens = register_and_login(client)
+    # 模拟其他进程直接写库，不经过本进程的内存映射
+    db.session.execute(db.update(User).where(User.username == "alice")
+                       .values(tokens_valid_after=datetime.now(timezone.utc)))
+    db.session.commit()
+    session_revocations.sync(User)
+    assert client.get("/api/me", headers=auth_header(tokens["access_token"])).status_code == 401
+
+
+def test_revoke_sessions_command(app, client):
+    tokens = register_and_login(client)
+    result = app.test_cli_runner().invoke(args=["revoke-sessions", "alice", "nobody"])
+    assert "已吊销 1 个用户" in result.output
+    assert client.get("/api/me", headers=auth_header(tokens["access_token"])).status_code == 401
@@ -0,0 +1,64 @@
+# backend/tests/test_shared_revocations.py
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import create_app
+from app.configs import TestingConfig
+from app.extensions import db, shared_revocations
+from app.models import TokenBlocklist
+
+from .conftest import auth_header, register_and_login
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    monkeypatch.setattr(TestingConfig, "SHARED_REVOCATION_ENABLED", True, raising=False)
+    monkeypatch.setattr(TestingConfig, "SHARED_REVOCATION_PATH", str(tmp_path / "revocations"), raising=False)
+    monkeypatch.setattr(TestingConfig, "SHARED_REVOCATION_CAPACITY", 1024, raising=False)
+    app = create_app("test")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+    shared_revocations.close()
+
+
+def _blocklist_row(jti: str, row_id: int | None = None) -> TokenBlocklist:
+    return TokenBlocklist(id=row_id, jti=jti, token_type="access", user_identity="alice",
+                          expires_at=datetime.now(timezone.utc) + timedelta(hours=1))
+
+
+def test_logout_is_visible_in_shared_table(client):
+    tokens = register_and_login(client)
+    headers = auth_header(tokens["access_token"])
+    assert client.get("/api/me", headers=headers).status_code == 200
+    assert client.delete("/api/auth/logout", headers=headers).status_code == 200
+    assert client.get("/api/me", headers=headers).status_code == 401
+
+
+def test_negative_is_unknown_for_tokens_newer_than_covered_sync(app):
+    shared_revocations.maybe_sync(TokenBlocklist)
+    jti = str(uuid.uuid4())
+    assert shared_revocations.is_revoked(jti, time.time()) is None
+    assert shared_revocations.is_revoked(jti, time.time() - 3600) is False
+    shared_revocations.add(jti, time.time() + 3600)
+    assert shared_revocations.is_revoked(jti, time.time()) is True
+
+
+def test_sync_picks_up_rows_committed_below_watermark(app):
+    db.session.add(_blocklist_row(str(uuid.uuid4()), row_id=10))
+    db.session.commit()
+    shared_revocations.maybe_sync(TokenBlocklist)
+
+    late_jti = str(uuid.uuid4())
+    db.session.add(_blocklist_row(late_jti, row_id=5))
+    db.session.commit()
+    shared_revocations._checked_pid = None  # 跳过同步间隔，立即再同步一次
+    count = shared_revocations.entry_count
+    assert shared_revocations.maybe_sync(TokenBlocklist) == 0  # 水位线没有前进
+    assert shared_revocations.is_revoked(late_jti) is True
+    assert shared_revocations.entry_count == count + 1
@@ -0,0 +1,51 @@
+# backend/tests/test_user_import.py
+import json
+
+from app.extensions import db
+from app.models import User
+from app.services.user_import import Checkpoint, normalize_record
+
+RECORDS = [
+    {"username": " alice ", "password": "Password123"},
+    {"username": "bob", "password_hash": "scrypt:32768:8:1$salt$hash", "email": "bob@example.com"},
+    {"username": "   ", "password": "Password123"},  # 去除空白后为空
+    {"username": 42, "password": "Password123"},  # 不是字符串
+    {"username": "carol"},  # 缺少密码
+    {"username": "dave", "password": "short"},  # 密码过短
+    {"username": "alice", "password": "Password123"},  # 与第一条重复
+]
+
+
+def _write_jsonl(path, records):
+    path.write_text("\n".join(json.dumps(record) for record in records), encoding="utf-8")
+    return path
+
+
+def test_normalize_record_applies_register_rules():
+    assert normalize_record(RECORDS[0])["username"] == "alice"
+    assert normalize_record(RECORDS[1])["password_hash"].startswith("scrypt:")
+    assert [normalize_record(record) for record in RECORDS[2:6]] == [None] * 4
+
+
+def test_import_counts_rejected_rows(app, tmp_path):
+    source = _write_jsonl(tmp_path / "users.jsonl", RECORDS)
+    result = app.test_cli_runner().invoke(args=["import-users", str(source), "--workers", "1"])
+    assert result.exit_code == 0, result.output
+    assert "插入 2 个用户，重复 1 条，无效 4 条" in result.output
+    assert sorted(db.session.scalars(db.select(User.username))) == ["alice", "bob"]
+
+
+def test_import_resumes_from_checkpoint(app, tmp_path):
+    source = _write_jsonl(tmp_path / "users.jsonl", RECORDS)
+    checkpoint = tmp_path / "import.checkpoint"
+    Checkpoint(checkpoint).save(1)  # 模拟第一条记录所在的批次已提交后中断
+    runner = app.test_cli_runner()
+    args = ["import-users", str(source), "--workers", "1", "--batch-size", "2", "--checkpoint", str(checkpoint)]
+    result = runner.invoke(args=args)
+    assert result.exit_code == 0, result.output
+    assert "处理 7 条，插入 2 个用户" in result.output  # 跳过的alice不再插入，最后一条alice也因此插入
+    assert Checkpoint(checkpoint).load() == len(RECORDS)
+
+    # 已全部完成：再次运行不会重复处理
+    result = runner.invoke(args=args)
+    assert "处理 7 条，插入 0 个用户" in result.output
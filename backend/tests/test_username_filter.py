@@ -0,0 +1,97 @@
+# backend/tests/test_username_filter.py
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.configs import TestingConfig
+from app.extensions import db, username_filter
+from app.models.user_model import User, username_taken
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(TestingConfig, "USERNAME_FILTER_ENABLED", True, raising=False)
+    monkeypatch.setattr(TestingConfig, "USERNAME_FILTER_CAPACITY", 1000, raising=False)
+    monkeypatch.setattr(TestingConfig, "USERNAME_FILTER_SYNC_INTERVAL", 3600.0, raising=False)
+    app = create_app("test")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _register(client, username: str):
+    return client.post("/api/auth/register", json={"username": username, "password": "Password123"})
+
+
+def _count_user_queries(app):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    return statements, lambda: event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_username_available_endpoint(client):
+    assert _register(client, "alice").status_code == 201
+    response = client.get("/api/auth/username-available", query_string={"username": " alice "})
+    assert response.status_code == 200
+    assert response.get_json() == {"username": "alice", "available": False}
+    response = client.get("/api/auth/username-available", query_string={"username": "bob"})
+    assert response.get_json() == {"username": "bob", "available": True}
+    assert client.get("/api/auth/username-available").status_code == 400
+
+
+def test_unseen_username_does_not_query_database(app, client):
+    assert _register(client, "alice").status_code == 201
+    statements, stop = _count_user_queries(app)
+    try:
+        for i in range(20):
+            assert client.get("/api/auth/username-available", query_string={"username": f"user{i}"}).get_json()["available"]
+    finally:
+        stop()
+    assert statements == []
+
+
+def test_duplicate_registration_returns_409(client):
+    assert _register(client, "alice").status_code == 201
+    response = _register(client, "alice")
+    assert response.status_code == 409
+    assert "已被注册" in response.get_json()["message"]
+
+
+def test_unsynced_username_is_rejected_by_unique_index(app, client):
+    client.get("/api/auth/username-available", query_string={"username": "warmup"})  # 加载过滤器
+    # 模拟其他进程刚注册、本进程过滤器尚未同步的用户名
+    db.session.add(User(username="carol", password_hash="x"))
+    db.session.commit()
+    assert not username_filter.might_be_taken("carol", User)
+
+    response = _register(client, "carol")
+    assert response.status_code == 409
+    assert username_filter.might_be_taken("carol", User)  # 冲突后立即标记为已占用
+
+
+def test_sync_picks_up_rows_committed_out_of_id_order(app):
+    db.session.add(User(id=10, username="late10", password_hash="x"))
+    db.session.commit()
+    username_filter.load(User)
+    assert username_filter.might_be_taken("late10", User)
+
+    # 较小的ID较晚提交 (或较晚复制到只读副本)
+    db.session.add(User(id=5, username="late5", password_hash="x"))
+    db.session.commit()
+    assert username_filter.sync(User) == 1
+    assert username_filter.might_be_taken("late5", User)
+    assert username_taken("late5")
+    assert username_filter.sync(User) == 0  # 回看窗口内重复读到的用户名不重复加入
+
+
+def test_filter_is_case_insensitive(client):
+    assert _register(client, "alice").status_code == 201
+    assert username_filter.might_be_taken("Alice", User)
+    assert username_filter.might_be_taken("ALICE", User)
@@ -0,0 +1,72 @@
+# backend/tests/test_warmup.py
+import multiprocessing
+import os
+import runpy
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import insert
+
+from app.extensions import db, principal_cache, revocation_index
+from app.models import User
+from app.models.token_model import TokenBlocklist
+from app.services.warmup import warmup
+
+GUNICORN_CONF = Path(__file__).resolve().parent.parent / "gunicorn.conf.py"
+
+
+def test_warmup_primes_newest_principals(app):
+    db.session.execute(insert(User), [{"username": f"user_{i}", "password_hash": "x"} for i in range(5)])
+    db.session.commit()
+    app.config["WARMUP_PRINCIPALS"] = 2
+    warmup(app)
+
+    def missing(identity):
+        raise AssertionError(f"{identity} 应已在预热时载入")
+
+    assert principal_cache.get("user_4", missing).username == "user_4"
+    assert principal_cache.get("user_3", missing).username == "user_3"
+    assert principal_cache.get("user_0", lambda identity: None) is None
+
+
+def test_gunicorn_splits_hashing_pool_between_workers(monkeypatch):
+    environ = {key: value for key, value in os.environ.items() if key != "HASHING_POOL_WORKERS"}
+    environ["WEB_CONCURRENCY"] = "2"
+    monkeypatch.setattr(os, "environ", environ)
+    monkeypatch.setattr(multiprocessing, "cpu_count", lambda: 8)
+    runpy.run_path(str(GUNICORN_CONF))
+    assert environ["HASHING_POOL_WORKERS"] == "4"
+
+    environ["WEB_CONCURRENCY"] = "17"
+    del environ["HASHING_POOL_WORKERS"]
+    runpy.run_path(str(GUNICORN_CONF))
+    assert environ["HASHING_POOL_WORKERS"] == "1"
+
+
+def _revoke(jti: str) -> None:
+    TokenBlocklist.revoke_many([{"jti": jti, "token_type": "access", "user_identity": "alice",
+                                 "expires_at": datetime.now(timezone.utc) + timedelta(hours=1)}])
+
+
+def test_warmup_syncs_inherited_revocation_index(app, monkeypatch):
+    _revoke("before-fork")
+    revocation_index.load(TokenBlocklist)  # 预加载模式下由主进程的create_app构建
+    bloom = revocation_index._bloom
+    _revoke("after-fork")
+
+    def full_load(model):
+        raise AssertionError("已构建的吊销索引不应在Worker中重新全量加载")
+
+    monkeypatch.setattr(revocation_index, "load", full_load)
+    warmup(app)
+    assert revocation_index._bloom is bloom  # 保留从主进程继承的过滤器
+    assert revocation_index.entry_count == 2
+
+
+def test_warmup_loads_revocation_index_when_not_built(app):
+    _revoke("jti-1")
+    revocation_index.init_app(app)
+    assert not revocation_index.loaded
+    warmup(app)
+    assert revocation_index.loaded
+    assert revocation_index.entry_count == 1
@@ -0,0 +1,11 @@
+# backend/wsgi.py
+"""
+生产环境WSGI入口，供Gunicorn等WSGI服务器加载:
+    gunicorn -c gunicorn.conf.py wsgi:app
+与开发用的 run.py 不同，这里默认使用生产配置 ('prod')，不启动Flask自带的开发服务器。
+"""
+import os
+
+from app import create_app
+
+app = create_app(os.getenv('FLASK_CONFIG', 'prod'))